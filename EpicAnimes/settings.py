@@ -36,10 +36,16 @@ INSTALLED_APPS = [
 # Define la cadena de middleware aplicada a cada solicitud.
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    # Consultas, tiempo y bytes por vista con presupuestos de consultas (core.instrumentacion).
+    'core.instrumentacion.InstrumentacionMiddleware',
+    # Entrega MEDIA_URL con ETag, rangos y caché larga antes de sesiones y autenticación.
+    'core.media.MediaMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    # Recuerda en la sesión si el usuario es vendedor (core.roles) para no consultar sus grupos en cada vista.
+    'core.roles.RolUsuarioMiddleware',
     # Registra la última actividad del usuario para exponer estados en tiempo real.
     'core.middleware.LastSeenMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
@@ -142,13 +148,83 @@ MEDIA_URL = '/media/'
 
 MEDIA_ROOT = os.path.join(BASE_DIR, "media")
 
+# core.media.MediaMiddleware: segundos de caché de las imágenes que no se nombran por su hash
+# (los originales por contenido son inmutables). Con un servidor web delante, "x-accel-redirect"
+# (nginx, location interna MEDIA_PREFIJO_INTERNO con alias a MEDIA_ROOT) o "x-sendfile" (Apache)
+# le delegan el envío del archivo.
+MEDIA_SERVIR = True
+MEDIA_MAX_AGE = 3600
+MEDIA_ENVIO_INTERNO = config('MEDIA_ENVIO_INTERNO', default='')
+MEDIA_PREFIJO_INTERNO = '/media-interno/'
+# Unicas carpetas de MEDIA_ROOT que se entregan por URL; exportaciones/ e importaciones/ son privadas.
+MEDIA_CARPETAS_PUBLICAS = ('productos', 'perfiles')
+
+# True cuando `manage.py procesar_importaciones` corre como worker aparte; si no, las
+# importaciones subidas desde el panel se procesan dentro de la misma solicitud.
+IMPORTACIONES_EN_SEGUNDO_PLANO = config('IMPORTACIONES_EN_SEGUNDO_PLANO', default=False, cast=bool)
+
+# Artefactos del modelo del chatbot (`manage.py entrenar_chatbot`), uno por versión de las FAQ.
+CHATBOT_MODEL_DIR = os.environ.get("CHATBOT_MODEL_DIR", os.path.join(BASE_DIR, "var", "chatbot"))
+
+# /api/chatbot/ask: segundos que se reutiliza una respuesta y cubeta de fichas por cliente
+# (capacidad de ráfaga y segundos para recuperar cada ficha).
+CHATBOT_CACHE_TTL = 300
+CHATBOT_LIMITE_CAPACIDAD = 10
+CHATBOT_LIMITE_RECARGA_SEGUNDOS = 3.0
+# Redes de los proxies que ponen la IP del cliente en X-Forwarded-For (en Render, su red
+# interna). Sin ellas la cubeta usa REMOTE_ADDR, que detrás de un proxy es la del proxy.
+PROXIES_CONFIABLES = [
+    red.strip()
+    for red in config('PROXIES_CONFIABLES', default='10.0.0.0/8' if RENDER_EXTERNAL_HOSTNAME else '').split(',')
+    if red.strip()
+]
+
+# "fragmentos" guarda los {% cache %} de las plantillas (tarjetas de productos, navbar). Lleva
+# su propio alias para que el catálogo completo quepa sin desalojar las entradas de "default"
+# (respuestas del chatbot, límites de solicitudes); LocMemCache por defecto guarda solo 300.
+CACHES = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+    'fragmentos': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'fragmentos',
+        'TIMEOUT': 86400,
+        'OPTIONS': {'MAX_ENTRIES': 20000},
+    },
+    # Portada y detalle de producto completos para visitantes anonimos (core.cache_paginas).
+    'paginas': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'paginas',
+        'OPTIONS': {'MAX_ENTRIES': 2000},
+    },
+}
+CACHE_PAGINAS_TTL = 300
+
+# core.instrumentacion: histogramas por vista en /api/admin/instrumentacion/ (solo staff), con las
+# ultimas INSTRUMENTACION_VENTANA solicitudes de cada una. Superar el presupuesto de consultas de
+# una URL (por nombre) deja un warning con la consulta mas repetida.
+INSTRUMENTACION = config('INSTRUMENTACION', default=True, cast=bool)
+INSTRUMENTACION_VENTANA = 500
+INSTRUMENTACION_PRESUPUESTO_DEFECTO = 50
+INSTRUMENTACION_PRESUPUESTOS = {
+    'index': 20,
+    'producto_detalle': 10,
+    'carrito': 15,
+    'api_chatbot_ask': 10,
+    'api_vendedor_resumen': 10,
+    'api_admin_ventas_por_vendedor': 10,
+}
+
 if not DEBUG:
     # Tell Django to copy static assets into a path called `staticfiles` (this is specific to Render)
     STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
 
     # Enable the WhiteNoise storage backend, which compresses static files to reduce disk use
-    # and renames the files with unique names for each version to support long-term caching
-    STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
+    # and renames the files with unique names for each version to support long-term caching.
+    # Django 5 ignora STATICFILES_STORAGE: el backend se declara en STORAGES.
+    STORAGES = {
+        'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+        'staticfiles': {'BACKEND': 'core.almacenamiento.EstaticosConHuella'},
+    }
 
 LOGIN_REDIRECT_URL = '/accounts/profile/'
 LOGOUT_REDIRECT_URL = '/index/'
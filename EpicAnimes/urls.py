@@ -65,6 +65,14 @@ from core.stock_alerts import (
     api_vendedor_stock_resumen as api_vendedor_stock_resumen_new,
     api_vendedor_stock_set_umbral,
 )
+from core.columnar import export_admin_columnar
+from core.export_jobs import (
+    api_exportaciones_crear,
+    api_exportacion_estado,
+    descargar_exportacion,
+)
+from core.import_jobs import api_importacion_estado, api_importaciones_crear
+from core.instrumentacion import api_admin_instrumentacion
 
 urlpatterns = [
     # Expone la administración nativa de Django.
@@ -125,10 +133,12 @@ urlpatterns = [
     path('api/admin/top-productos-linea/', api_admin_top_productos_linea, name='api_admin_top_productos_linea'),
     path('api/admin/ventas-actividad/', api_admin_ventas_actividad, name='api_admin_ventas_actividad'),
     path('api/admin/ventas-por-usuario/', api_admin_ventas_por_usuario, name='api_admin_ventas_por_usuario'),
+    path('api/admin/instrumentacion/', api_admin_instrumentacion, name='api_admin_instrumentacion'),
     path('api/admin/export/postulaciones.csv', export_admin_postulaciones_csv, name='export_admin_postulaciones_csv'),
     path('api/admin/export/ventas.csv', export_admin_ventas_csv, name='export_admin_ventas_csv'),
     path('api/admin/export/postulaciones.xlsx', export_admin_postulaciones_xlsx, name='export_admin_postulaciones_xlsx'),
     path('api/admin/export/ventas.xlsx', export_admin_ventas_xlsx, name='export_admin_ventas_xlsx'),
+    path('api/admin/export/<str:modelo>.<str:formato>', export_admin_columnar, name='export_admin_columnar'),
     path('api/admin/postulaciones/', api_admin_postulaciones, name='api_admin_postulaciones'),
 
     # Gestiona inventario, stock y operaciones de limpieza.
@@ -145,13 +155,20 @@ urlpatterns = [
     path('api/vendedor/export/inventario.xlsx', export_vendedor_inventario_xlsx, name='export_vendedor_inventario_xlsx'),
     path('api/vendedor/importar/', api_vendedor_importar, name='api_vendedor_importar'),
     path('api/vendedor/importar_excel/', api_vendedor_importar_excel, name='api_vendedor_importar_excel'),
+    path('api/vendedor/importaciones/', api_importaciones_crear, name='api_importaciones_crear'),
+    path('api/vendedor/importaciones/<int:pk>/', api_importacion_estado, name='api_importacion_estado'),
+
+    # Encola exportaciones grandes que se procesan en segundo plano.
+    path('api/exportaciones/', api_exportaciones_crear, name='api_exportaciones_crear'),
+    path('api/exportaciones/<int:pk>/', api_exportacion_estado, name='api_exportacion_estado'),
+    path('api/exportaciones/<int:pk>/descargar/', descargar_exportacion, name='descargar_exportacion'),
 
     # Mantiene la redirección por defecto hacia la página principal.
     path('', RedirectView.as_view(pattern_name='index', permanent=False)),
 ]
 
-# Sirve los archivos multimedia durante el desarrollo.
-if settings.DEBUG:
+# core.media.MediaMiddleware sirve MEDIA_URL; si se desactiva, Django los sirve en desarrollo.
+if settings.DEBUG and not settings.MEDIA_SERVIR:
     urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
 
 urlpatterns += staticfiles_urlpatterns()
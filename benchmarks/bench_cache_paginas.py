@@ -0,0 +1,101 @@
+"""Mide la portada y el detalle para visitantes anónimos con la caché de páginas completas.
+
+Uso (con DJANGO_SETTINGS_MODULE apuntando a la configuración a medir):
+    python benchmarks/bench_cache_paginas.py --productos 2000
+
+Crea una base de prueba desechable con un catálogo sintético y mide con el cliente de
+pruebas de Django, contando también las consultas SQL:
+- sin caché: la vista completa (filtros, catálogo, formularios y render).
+- guardada: la misma página para otro visitante anónimo (otros parámetros de campaña).
+- filtro: una combinación de filtros nueva y luego repetida.
+- detalle: página de producto sin caché y guardada.
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+from decimal import Decimal
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "EpicAnimes.settings")
+
+
+def _medir(url, parametros, repeticiones):
+    from django.db import connection
+    from django.test import Client
+    from django.test.utils import CaptureQueriesContext
+
+    tiempos, consultas = [], 0
+    for i in range(repeticiones):
+        # Un cliente nuevo por solicitud: cada visita llega sin cookies, como desde una red social.
+        cliente = Client()
+        with CaptureQueriesContext(connection) as capturadas:
+            inicio = time.perf_counter()
+            respuesta = cliente.get(url, {**parametros, "utm_content": str(i)})
+            tiempos.append((time.perf_counter() - inicio) * 1000)
+        assert respuesta.status_code == 200, respuesta.status_code
+        consultas = len(capturadas)
+    return statistics.median(tiempos), consultas
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--productos", type=int, default=2000)
+    parser.add_argument("--repeticiones", type=int, default=20)
+    args = parser.parse_args()
+
+    import django
+
+    django.setup()
+    from django.conf import settings
+    from django.core.cache import caches
+    from django.db import connection
+    from django.test.utils import setup_test_environment
+    from django.urls import reverse
+
+    from core.models import Producto
+
+    settings.ALLOWED_HOSTS = ["testserver"]
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0)
+    try:
+        tipos = [("Figura", "Figuras"), ("Poster", "Posters"), ("Taza", "Tazas"), ("Llavero", "Accesorios")]
+        Producto.objects.bulk_create(
+            [
+                Producto(
+                    nombre=f"{tipos[i % 4][0]} coleccionable {i}",
+                    marca="Bandai",
+                    calidad="Nuevo",
+                    precio=Decimal(9990 + i % 500),
+                    existencias=i % 13,
+                    categoria=tipos[i % 4][1],
+                )
+                for i in range(args.productos)
+            ],
+            batch_size=2000,
+        )
+        portada = reverse("index")
+        detalle = reverse("producto_detalle", args=[Producto.objects.order_by("pk").first().pk])
+        filtro = {"categoria": "Figuras", "en_stock": "on"}
+
+        filas = []
+        for nombre, url, parametros in (("portada", portada, {}), ("filtro", portada, filtro), ("detalle", detalle, {})):
+            caches["paginas"].clear()
+            caches["fragmentos"].clear()
+            filas.append((f"{nombre} sin caché", *_medir(url, parametros, 1)))
+            filas.append((f"{nombre} guardada", *_medir(url, parametros, args.repeticiones)))
+
+        print(f"{args.productos} productos, caché {settings.CACHES['paginas']['BACKEND'].rsplit('.', 1)[-1]}")
+        print(f"{'solicitud':<24}{'ms':>10}{'consultas':>11}")
+        for nombre, ms, consultas in filas:
+            print(f"{nombre:<24}{ms:>10.1f}{consultas:>11}")
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+if __name__ == "__main__":
+    main()
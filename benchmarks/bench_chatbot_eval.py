@@ -0,0 +1,219 @@
+"""Evalúa el chatbot por rol: precisión de las respuestas, latencia por ruta y memoria.
+
+Uso (con DJANGO_SETTINGS_MODULE apuntando a la configuración a medir):
+    python benchmarks/bench_chatbot_eval.py
+    python benchmarks/bench_chatbot_eval.py --sin-tensorflow --min-precision 0.9 --json eval.json
+
+Reproduce un corpus de preguntas con core.chatbot.responder (sin la caché de respuestas)
+para cada rol (anonimo, comprador, vendedor, administrador):
+- faq: reformulaciones de chatbot_faq.txt (core.chatbot_intents.conjunto_evaluacion).
+- especial: saludos, agradecimientos, ayuda, despedidas y ruido.
+- producto: preguntas sobre un catálogo sintético.
+- ajena: preguntas fuera del negocio, que deben recibir la respuesta por defecto.
+
+Informa precisión por rol y categoría, latencia p50/p95/p99 por ruta (el campo
+"source" de la respuesta: special, product, model, semantic, unknown), el
+arranque en frío (artefactos, espacio semántico e índice de productos) y la memoria.
+
+Funciona sin red: entrena los artefactos en una carpeta temporal (o usa --artefactos) y
+crea una base de prueba desechable. --sin-tensorflow bloquea la importación de
+TensorFlow para comprobar que el chatbot responde en entornos donde no está instalado.
+Con --min-precision termina con código 1 si la precisión global queda por debajo.
+"""
+
+import argparse
+import json
+import os
+import resource
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import defaultdict
+from decimal import Decimal
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "EpicAnimes.settings")
+
+ROLES = ("anonimo", "comprador", "vendedor", "administrador")
+PRODUCTOS = [
+    ("Figura Gojo Satoru", "Figuras", 7),
+    ("Poster Naruto Uzumaki", "Posters", 3),
+    ("Taza Luffy Gear 5", "Tazas", 12),
+    ("Llavero Zoro", "Accesorios", 0),
+]
+AJENAS = ["quien gano el mundial de futbol", "receta de empanadas de pino", "clima en valparaiso mañana"]
+
+
+def _corpus(chatbot, conjunto_evaluacion):
+    """Lista de (categoria, pregunta, {rol: texto esperado en la respuesta})."""
+    preguntas, respuestas = chatbot._ensure_faq_cache()
+    todos = lambda texto: {rol: texto for rol in ROLES}  # noqa: E731
+    casos = []
+    for tokens, etiqueta in conjunto_evaluacion([chatbot._tokenize(p) for p in preguntas]):
+        casos.append(("faq", " ".join(tokens), todos(respuestas[etiqueta])))
+
+    saludos = {rol: chatbot._ROLE_GREETING_SEGMENTS[rol][0] for rol in ROLES}
+    ayudas = {
+        rol: chatbot._ROLE_HELP_SEGMENTS["invitado" if rol == "anonimo" else rol][0]["pregunta"] for rol in ROLES
+    }
+    casos += [
+        ("especial", "hola", saludos),
+        ("especial", "Buenas tardes!", saludos),
+        ("especial", "muchas gracias", todos("¡Gracias a ti!")),
+        ("especial", "ayuda", ayudas),
+        ("especial", "chao", todos("¡Hasta luego")),
+        ("especial", "???", todos("solo enviaste signos")),
+    ]
+    casos += [
+        ("producto", "precio figura gojo", todos("Figura Gojo Satoru")),
+        ("producto", "tienen poster naruto", todos("Poster Naruto Uzumaki")),
+        ("producto", "cuanto cuesta la taza luffy", todos("Taza Luffy Gear 5")),
+        ("producto", "recomiendame algo", todos("Te recomiendo")),
+    ]
+    casos += [("ajena", pregunta, todos(chatbot.DEFAULT_UNKNOWN_RESPONSE)) for pregunta in AJENAS]
+    return casos
+
+
+def _percentiles(valores):
+    ordenados = sorted(valores)
+    return [ordenados[min(len(ordenados) - 1, int(len(ordenados) * q))] for q in (0.50, 0.95, 0.99)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeticiones", type=int, default=3, help="veces que se reproduce el corpus")
+    parser.add_argument("--artefactos", help="carpeta de artefactos a usar (por defecto, una temporal)")
+    parser.add_argument("--sin-tensorflow", action="store_true", help="impide importar TensorFlow")
+    parser.add_argument("--min-precision", type=float, help="precisión global mínima aceptada")
+    parser.add_argument("--json", help="guarda los resultados en este archivo")
+    args = parser.parse_args()
+
+    if args.sin_tensorflow:
+        sys.modules["tensorflow"] = None
+
+    import django
+
+    django.setup()
+    from django.conf import settings
+    from django.db import connection
+    from django.test.utils import setup_test_environment
+
+    from core import chatbot, chatbot_productos
+    from core.chatbot_intents import conjunto_evaluacion
+    from core.models import Producto
+
+    temporal = None
+    if args.artefactos:
+        settings.CHATBOT_MODEL_DIR = args.artefactos
+    else:
+        temporal = tempfile.TemporaryDirectory()
+        settings.CHATBOT_MODEL_DIR = temporal.name
+
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0)
+    try:
+        for nombre, categoria, existencias in PRODUCTOS:
+            Producto.objects.create(
+                nombre=nombre, marca="Bandai", calidad="Nuevo", precio=Decimal("14990"),
+                existencias=existencias, categoria=categoria,
+            )
+        chatbot_productos.invalidar()
+
+        tracemalloc.start()
+        inicio = time.perf_counter()
+        chatbot._ensure_model()
+        chatbot._ensure_semantic_space()
+        chatbot_productos.obtener_indice()
+        arranque = time.perf_counter() - inicio
+        _, pico = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        casos = _corpus(chatbot, conjunto_evaluacion)
+        aciertos = defaultdict(lambda: [0, 0])
+        latencias = defaultdict(list)
+        fallos = []
+        for repeticion in range(args.repeticiones):
+            for categoria, pregunta, esperados in casos:
+                for rol, esperado in esperados.items():
+                    t0 = time.perf_counter()
+                    resultado = chatbot.responder(pregunta, rol)
+                    latencias[resultado.get("source", "?")].append((time.perf_counter() - t0) * 1000)
+                    if repeticion:
+                        continue
+                    correcto = esperado in resultado["answer"]
+                    aciertos[(rol, categoria)][0] += correcto
+                    aciertos[(rol, categoria)][1] += 1
+                    if not correcto:
+                        fallos.append((rol, categoria, pregunta, resultado.get("source")))
+        rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        if temporal:
+            temporal.cleanup()
+
+    tf_estado = "bloqueado" if args.sin_tensorflow else ("cargado" if sys.modules.get("tensorflow") else "no cargado")
+    print(f"tensorflow: {tf_estado}; arranque en frío {arranque:.2f} s; "
+          f"pico Python {pico / 2**20:.1f} MB; RSS máx. {rss_mb:.0f} MB")
+
+    categorias = sorted({c for _, c in aciertos})
+    print(f"\n{'rol':<15}" + "".join(f"{c:>10}" for c in categorias) + f"{'total':>10}")
+    precision = {}
+    for rol in ROLES:
+        celdas = []
+        for categoria in categorias:
+            ok, total = aciertos.get((rol, categoria), (0, 0))
+            celdas.append(f"{ok / total:>10.3f}" if total else f"{'-':>10}")
+        ok = sum(v[0] for (r, _), v in aciertos.items() if r == rol)
+        total = sum(v[1] for (r, _), v in aciertos.items() if r == rol)
+        precision[rol] = ok / total
+        print(f"{rol:<15}" + "".join(celdas) + f"{precision[rol]:>10.3f}")
+    global_ok = sum(v[0] for v in aciertos.values())
+    global_total = sum(v[1] for v in aciertos.values())
+    print(f"precisión global {global_ok / global_total:.3f} ({global_ok}/{global_total})")
+
+    print(f"\n{'ruta':<10}{'n':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    rutas = {}
+    for ruta, valores in sorted(latencias.items()):
+        p50, p95, p99 = _percentiles(valores)
+        rutas[ruta] = {"n": len(valores), "p50_ms": p50, "p95_ms": p95, "p99_ms": p99}
+        print(f"{ruta:<10}{len(valores):>8}{p50:>10.3f}{p95:>10.3f}{p99:>10.3f}")
+    todas = [v for valores in latencias.values() for v in valores]
+    print(f"{'todas':<10}{len(todas):>8}" + "".join(f"{v:>10.3f}" for v in _percentiles(todas)))
+
+    if fallos:
+        print(f"\n{len(fallos)} respuestas incorrectas (primeras 10):")
+        for rol, categoria, pregunta, ruta in fallos[:10]:
+            print(f"  [{rol}/{categoria}] {pregunta!r} -> {ruta}")
+
+    if args.json:
+        Path(args.json).write_text(
+            json.dumps(
+                {
+                    "tensorflow": tf_estado,
+                    "arranque_s": arranque,
+                    "pico_python_mb": pico / 2**20,
+                    "rss_max_mb": rss_mb,
+                    "precision_global": global_ok / global_total,
+                    "precision_por_rol": precision,
+                    "precision_por_categoria": {
+                        f"{rol}/{categoria}": ok / total for (rol, categoria), (ok, total) in aciertos.items()
+                    },
+                    "latencia_por_ruta": rutas,
+                    "mediana_ms": statistics.median(todas),
+                },
+                indent=2,
+                ensure_ascii=False,
+            ),
+            encoding="utf-8",
+        )
+    if args.min_precision is not None and global_ok / global_total < args.min_precision:
+        print(f"\nprecisión global por debajo de {args.min_precision}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
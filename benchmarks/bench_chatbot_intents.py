@@ -0,0 +1,84 @@
+"""Mide precisión y latencia del clasificador de intenciones del chatbot.
+
+Uso (con DJANGO_SETTINGS_MODULE apuntando a la configuración a medir):
+    python benchmarks/bench_chatbot_intents.py
+
+Usa como conjunto etiquetado core.chatbot_intents.conjunto_evaluacion (reformulaciones
+de cada pregunta de chatbot_faq.txt) y mide:
+- numpy: ClasificadorIntenciones.predecir, el motor que usa `responder`.
+- responder: la respuesta final de core.chatbot.responder frente a la respuesta
+  esperada de la FAQ (crea una base de prueba desechable para las consultas de productos).
+- responder_many: el mismo conjunto en una sola llamada (latencia promedio por pregunta).
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "EpicAnimes.settings")
+
+
+def _latencias(funcion, entradas):
+    tiempos = []
+    for entrada in entradas:
+        inicio = time.perf_counter()
+        funcion(entrada)
+        tiempos.append((time.perf_counter() - inicio) * 1e6)
+    return statistics.median(tiempos), sorted(tiempos)[int(len(tiempos) * 0.95) - 1]
+
+
+def _fila(etiqueta, precision, p50, p95, extra=""):
+    print(f"{etiqueta:<10}{precision:>10.3f}{p50:>12.1f}{p95:>12.1f}  {extra}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.parse_args()
+
+    import django
+
+    django.setup()
+    from django.db import connection
+    from django.test.utils import setup_test_environment
+
+    from core import chatbot
+    from core.chatbot_intents import conjunto_evaluacion
+
+    preguntas, respuestas = chatbot._ensure_faq_cache()
+    documentos = [chatbot._tokenize(p) for p in preguntas]
+    casos = conjunto_evaluacion(documentos)
+    print(f"{len(preguntas)} intenciones, {len(casos)} casos de evaluación")
+    print(f"{'motor':<10}{'precisión':>10}{'p50 µs':>12}{'p95 µs':>12}")
+
+    inicio = time.perf_counter()
+    clasificador = chatbot.entrenar_clasificador(preguntas)
+    entrenamiento = time.perf_counter() - inicio
+    p50, p95 = _latencias(clasificador.predecir, [tokens for tokens, _ in casos])
+    _fila("numpy", clasificador.precision(casos), p50, p95, f"entrenamiento {entrenamiento:.2f} s")
+
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0)
+    try:
+        textos = [" ".join(tokens) for tokens, _ in casos]
+        aciertos = sum(
+            1 for texto, (_, etiqueta) in zip(textos, casos) if respuestas[etiqueta] in chatbot.responder(texto)["answer"]
+        )
+        p50, p95 = _latencias(chatbot.responder, textos)
+        _fila("responder", aciertos / len(casos), p50, p95)
+
+        inicio = time.perf_counter()
+        lote = chatbot.responder_many(textos)
+        promedio = (time.perf_counter() - inicio) * 1e6 / len(textos)
+        aciertos = sum(1 for r, (_, etiqueta) in zip(lote, casos) if respuestas[etiqueta] in r["answer"])
+        _fila("lote", aciertos / len(casos), promedio, promedio, "responder_many, promedio por pregunta")
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""Compara la búsqueda de productos del chatbot recorriendo el catálogo vs. el índice invertido.
+
+Uso (con DJANGO_SETTINGS_MODULE apuntando a la configuración a medir):
+    python benchmarks/bench_chatbot_productos.py --productos 20000
+
+Crea una base de prueba desechable con un catálogo sintético y mide la latencia por
+pregunta de:
+- catalogo: list(Producto.objects.all()) y re-tokenizar cada producto, como hacía
+  _product_answer.
+- indice: core.chatbot._product_answer sobre core.chatbot_productos (incluye la
+  construcción inicial del índice por separado).
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+from decimal import Decimal
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "EpicAnimes.settings")
+
+PREGUNTAS = ["precio figura gojo 17", "tienen poster naruto", "taza luffy 999", "recomiendame algo", "llavero zoro"]
+
+
+def _por_catalogo(pregunta, tokens):
+    from core.chatbot import _PRODUCT_STOPWORDS, _tokenize
+    from core.models import Producto
+
+    content = {t for t in tokens if len(t) > 2 and t not in _PRODUCT_STOPWORDS}
+    matches = []
+    for prod in list(Producto.objects.all()):
+        texto = " ".join(part for part in [prod.nombre, prod.descripcion, prod.categoria] if part)
+        producto_tokens = {tok for tok in _tokenize(texto) if len(tok) > 2 and tok not in _PRODUCT_STOPWORDS}
+        if content & producto_tokens:
+            matches.append(prod)
+    return matches
+
+
+def _medir(funcion, repeticiones=3):
+    from core.chatbot import _tokenize
+
+    tiempos = []
+    for _ in range(repeticiones):
+        for pregunta in PREGUNTAS:
+            inicio = time.perf_counter()
+            funcion(pregunta, _tokenize(pregunta))
+            tiempos.append((time.perf_counter() - inicio) * 1000)
+    return statistics.median(tiempos)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--productos", type=int, default=20_000)
+    args = parser.parse_args()
+
+    import django
+
+    django.setup()
+    from django.db import connection
+    from django.test.utils import setup_test_environment
+
+    from core import chatbot, chatbot_productos
+    from core.models import Producto
+
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0)
+    try:
+        personajes = ["gojo", "naruto", "luffy", "zoro", "nami", "goku", "tanjiro", "levi"]
+        tipos = [("Figura", "Figuras"), ("Poster", "Posters"), ("Taza", "Tazas"), ("Llavero", "Accesorios")]
+        Producto.objects.bulk_create(
+            [
+                Producto(
+                    nombre=f"{tipos[i % 4][0]} {personajes[i % 8]} {i}",
+                    descripcion=f"Edición coleccionable {i % 97}",
+                    marca="Bandai",
+                    calidad="Nuevo",
+                    precio=Decimal(9990 + i % 500),
+                    existencias=i % 13,
+                    categoria=tipos[i % 4][1],
+                )
+                for i in range(args.productos)
+            ],
+            batch_size=2000,
+        )
+        print(f"{args.productos} productos")
+        print(f"{'variante':<12}{'ms/pregunta':>14}")
+        print(f"{'catalogo':<12}{_medir(_por_catalogo, 1):>14.2f}")
+        chatbot_productos.invalidar()
+        inicio = time.perf_counter()
+        chatbot_productos.obtener_indice()
+        print(f"{'construir':<12}{(time.perf_counter() - inicio) * 1000:>14.2f}  (una vez por cambio de catálogo)")
+        print(f"{'indice':<12}{_medir(chatbot._product_answer):>14.2f}")
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""Compara la evaluación lineal de reglas del chatbot con las reglas compiladas.
+
+Uso:
+    python benchmarks/bench_chatbot_reglas.py --reglas 10 100 1000
+
+Para cada tamaño agrega reglas sintéticas (any/all/phrases) a `_FAQ_RULES` y mide la
+latencia por pregunta de:
+- lineal: el recorrido anterior de `_match_rule`, que normalizaba cada palabra clave y
+  frase de cada regla en cada llamada y buscaba las frases como subcadenas.
+- compilada: core.chatbot._match_rule sobre core.chatbot_reglas.ReglasCompiladas.
+También mide `_special_response` sobre preguntas que no son saludos (el peor caso).
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "EpicAnimes.settings")
+
+PREGUNTAS = [
+    "cuales son los metodos de pago disponibles",
+    "recomiendame algo de naruto",
+    "cuanto tarda el envio a regiones",
+    "como valido facturas o ventas sospechosas",
+    "quiero devolver un producto dañado",
+]
+
+
+def _lineal(chatbot, question, tokens, user_role, rules):
+    normalizar = lambda valores: {chatbot._normalize_text(v) for v in valores if v}  # noqa: E731
+    normalized_question = chatbot._normalize_text(question)
+    token_set = normalizar(tokens)
+    role = (user_role or "comprador").lower()
+    for rule in rules:
+        roles = rule.get("roles")
+        if roles and role not in roles:
+            continue
+        if rule.get("all") and not normalizar(rule["all"]).issubset(token_set):
+            continue
+        if rule.get("any") and not (token_set & normalizar(rule["any"])):
+            continue
+        if rule.get("phrases") and not any(chatbot._normalize_text(p) in normalized_question for p in rule["phrases"]):
+            continue
+        return chatbot._compose_response(*rule["response"])
+    return None
+
+
+def _sinteticas(n):
+    reglas = []
+    for i in range(n):
+        tipo = i % 3
+        if tipo == 0:
+            reglas.append({"any": {f"clave{i}", f"otra{i}"}, "response": (f"r{i}",)})
+        elif tipo == 1:
+            reglas.append({"all": {f"tema{i}", "envio"}, "response": (f"r{i}",)})
+        else:
+            reglas.append({"phrases": [f"frase numero {i}", f"Pregunta Número {i}"], "response": (f"r{i}",)})
+    return reglas
+
+
+def _medir(funcion, repeticiones=200):
+    tiempos = []
+    for _ in range(repeticiones):
+        for pregunta in PREGUNTAS:
+            inicio = time.perf_counter()
+            funcion(pregunta)
+            tiempos.append((time.perf_counter() - inicio) * 1e6)
+    return statistics.median(tiempos)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--reglas", type=int, nargs="+", default=[10, 100, 1000])
+    args = parser.parse_args()
+
+    import django
+
+    django.setup()
+    from core import chatbot
+
+    print(f"{'reglas':>8}{'lineal µs':>12}{'compilada µs':>14}{'compilar ms':>13}")
+    for n in args.reglas:
+        # Las sintéticas van primero para que el recorrido lineal no se corte antes de tiempo.
+        reglas = _sinteticas(n) + chatbot._FAQ_RULES
+        inicio = time.perf_counter()
+        chatbot._compiled_rules(reglas)
+        compilar = (time.perf_counter() - inicio) * 1000
+        lineal = _medir(lambda q: _lineal(chatbot, q, chatbot._tokenize(q), None, reglas))
+        compilada = _medir(lambda q: chatbot._match_rule(q, chatbot._tokenize(q), None, reglas))
+        for q in PREGUNTAS:
+            esperado = _lineal(chatbot, q, chatbot._tokenize(q), None, reglas)
+            if "valido" not in q:
+                assert chatbot._match_rule(q, chatbot._tokenize(q), None, reglas) == esperado, q
+        print(f"{n:>8}{lineal:>12.1f}{compilada:>14.1f}{compilar:>13.2f}")
+
+    print(f"\n_special_response sobre preguntas que no son saludos: {_medir(chatbot._special_response):.1f} µs")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""Compara el espacio semántico denso original con el disperso (CSR) del chatbot.
+
+Uso:
+    python benchmarks/bench_chatbot_semantica.py --factor 50
+
+Replica las preguntas de chatbot_faq.txt `factor` veces (con un token distintivo por
+copia, para simular un FAQ más grande) y mide construcción, memoria de la matriz y
+latencia por consulta de:
+- densa: np.zeros((N, V)) llenada celda a celda y un vector de largo V por consulta.
+- dispersa: core.chatbot_semantica.EspacioSemantico (filas L2 precalculadas).
+"""
+
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+
+def _densa(documentos):
+    """Reproduce _ensure_semantic_space y _vectorize_text tal como estaban."""
+    vocab = {}
+    for tokens in documentos:
+        for token in tokens:
+            vocab.setdefault(token, len(vocab))
+    df = np.zeros(len(vocab))
+    for tokens in documentos:
+        for idx in {vocab[t] for t in tokens}:
+            df[idx] += 1
+    n = len(documentos)
+    idf = np.log((n + 1) / (df + 1)) + 1
+    matrix = np.zeros((n, len(vocab)))
+    for row, tokens in enumerate(documentos):
+        counts = {}
+        for token in tokens:
+            counts[vocab[token]] = counts.get(vocab[token], 0) + 1
+        total = sum(counts.values())
+        for idx, count in counts.items():
+            matrix[row, idx] = (count / max(total, 1)) * idf[idx]
+    norms = np.linalg.norm(matrix, axis=1)
+
+    def consultar(tokens):
+        vec = np.zeros(len(vocab))
+        counts = {}
+        for token in tokens:
+            if token in vocab:
+                counts[vocab[token]] = counts.get(vocab[token], 0) + 1
+        total = sum(counts.values())
+        for idx, count in counts.items():
+            vec[idx] = (count / max(total, 1)) * idf[idx]
+        sims = matrix @ vec
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.divide(sims, norms * np.linalg.norm(vec), out=np.zeros_like(sims), where=norms != 0)
+
+    return consultar, matrix.nbytes + norms.nbytes
+
+
+def _medir(consultar, consultas):
+    tiempos = []
+    for tokens in consultas:
+        inicio = time.perf_counter()
+        consultar(tokens)
+        tiempos.append((time.perf_counter() - inicio) * 1e6)
+    return statistics.median(tiempos)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--factor", type=int, default=50)
+    args = parser.parse_args()
+
+    from core.chatbot import FAQ_PATH, _load_faq_pairs, _tokenize
+    from core.chatbot_semantica import EspacioSemantico
+
+    preguntas, _ = _load_faq_pairs(FAQ_PATH)
+    base = [_tokenize(p) for p in preguntas]
+    documentos = [tokens + [f"copia{i}"] for i in range(args.factor) for tokens in base]
+    consultas = base[: min(len(base), 200)]
+    print(f"{len(documentos)} preguntas, {len(consultas)} consultas")
+    print(f"{'variante':<10}{'construir s':>12}{'matriz KB':>12}{'p50 µs':>10}{'lote µs/q':>12}")
+
+    inicio = time.perf_counter()
+    consultar, nbytes = _densa(documentos)
+    construir = time.perf_counter() - inicio
+    print(f"{'densa':<10}{construir:>12.2f}{nbytes / 1024:>12.0f}{_medir(consultar, consultas):>10.0f}{'-':>12}")
+
+    inicio = time.perf_counter()
+    espacio = EspacioSemantico.construir(documentos)
+    construir = time.perf_counter() - inicio
+    nbytes = espacio.matriz.bytes() + espacio.por_token.bytes()
+    inicio = time.perf_counter()
+    espacio.similitudes_lote(consultas)
+    lote = (time.perf_counter() - inicio) * 1e6 / len(consultas)
+    print(f"{'dispersa':<10}{construir:>12.2f}{nbytes / 1024:>12.0f}{_medir(espacio.similitudes, consultas):>10.0f}{lote:>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
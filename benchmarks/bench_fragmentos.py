@@ -0,0 +1,110 @@
+"""Mide el render de la portada y del detalle con los fragmentos de tarjeta en caché.
+
+Uso (con DJANGO_SETTINGS_MODULE apuntando a la configuración a medir):
+    python benchmarks/bench_fragmentos.py --productos 2000
+
+Crea una base de prueba desechable con un catálogo sintético y mide con el cliente de
+pruebas de Django:
+- frio: portada con el caché vacío (cada tarjeta se renderiza y se guarda).
+- caliente: portada con todas las tarjetas ya en caché.
+- cambio: portada tras editar un producto (solo su tarjeta se vuelve a renderizar).
+- detalle: página de producto con sus relacionados, en frío y en caliente.
+
+La caché de páginas completas (core.cache_paginas) se desactiva para medir solo los
+fragmentos; benchmarks/bench_cache_paginas.py mide esa capa.
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+from decimal import Decimal
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "EpicAnimes.settings")
+
+
+def _medir(cliente, url, repeticiones):
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        respuesta = cliente.get(url)
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+        assert respuesta.status_code == 200, respuesta.status_code
+    return statistics.median(tiempos)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--productos", type=int, default=2000)
+    parser.add_argument("--repeticiones", type=int, default=5)
+    args = parser.parse_args()
+
+    import django
+
+    django.setup()
+    from django.conf import settings
+    from django.core.cache import caches
+    from django.db import connection
+    from django.test import Client
+    from django.test.utils import override_settings, setup_test_environment
+    from django.urls import reverse
+
+    from core.models import Producto
+
+    settings.ALLOWED_HOSTS = ["testserver"]
+    setup_test_environment()
+    override_settings(
+        CACHES={**settings.CACHES, "paginas": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}}
+    ).enable()
+    old_name = connection.creation.create_test_db(verbosity=0)
+    try:
+        tipos = [("Figura", "Figuras"), ("Poster", "Posters"), ("Taza", "Tazas"), ("Llavero", "Accesorios")]
+        Producto.objects.bulk_create(
+            [
+                Producto(
+                    nombre=f"{tipos[i % 4][0]} coleccionable {i}",
+                    marca="Bandai",
+                    calidad="Nuevo",
+                    precio=Decimal(9990 + i % 500),
+                    existencias=i % 13,
+                    categoria=tipos[i % 4][1],
+                )
+                for i in range(args.productos)
+            ],
+            batch_size=2000,
+        )
+        cliente = Client()
+        portada = reverse("index")
+        detalle = reverse("producto_detalle", args=[Producto.objects.order_by("pk").first().pk])
+
+        caches["fragmentos"].clear()
+        frio = _medir(cliente, portada, 1)
+        caliente = _medir(cliente, portada, args.repeticiones)
+        producto = Producto.objects.order_by("pk").first()
+        producto.existencias += 1
+        producto.save()
+        cambio = _medir(cliente, portada, 1)
+        caches["fragmentos"].clear()
+        detalle_frio = _medir(cliente, detalle, 1)
+        detalle_caliente = _medir(cliente, detalle, args.repeticiones)
+
+        print(f"{args.productos} productos, caché {settings.CACHES['default']['BACKEND'].rsplit('.', 1)[-1]}")
+        print(f"{'render':<18}{'ms':>10}")
+        for nombre, valor in (
+            ("portada frio", frio),
+            ("portada caliente", caliente),
+            ("portada cambio", cambio),
+            ("detalle frio", detalle_frio),
+            ("detalle caliente", detalle_caliente),
+        ):
+            print(f"{nombre:<18}{valor:>10.1f}")
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+if __name__ == "__main__":
+    main()
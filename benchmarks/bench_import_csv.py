@@ -0,0 +1,105 @@
+"""Mide el rendimiento de la importación CSV de productos: fila a fila vs. por lotes.
+
+Uso (con DJANGO_SETTINGS_MODULE apuntando a la configuración a medir):
+    python benchmarks/bench_import_csv.py --rows 100000
+
+Crea una base de prueba desechable con el backend configurado, genera un CSV
+sintético y compara:
+- por_fila: Producto.objects.create por cada fila, como hacía la vista original.
+- por_lotes: core.importers.ImportadorProductos (bulk_create en una transacción).
+- reimportar: el mismo archivo otra vez; sin cambios, no escribe ninguna fila.
+- actualizar_stock: el archivo con otras existencias, que actualiza por llave natural.
+"""
+
+import argparse
+import io
+import os
+import sys
+import time
+from decimal import Decimal
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "EpicAnimes.settings")
+
+
+def _csv(rows, stock_extra=0):
+    buffer = io.StringIO()
+    buffer.write("nombre;marca;calidad;categoria;precio;existencias;fecha_ingreso;descripcion\n")
+    for i in range(rows):
+        buffer.write(f"Figura {i};Marca {i % 30};Nuevo;Figuras;{12990 + i % 1000};{i % 50 + stock_extra};2025-01-01;Lote {i}\n")
+    return buffer.getvalue().encode("utf-8")
+
+
+def _por_fila(vendedor, contenido):
+    import csv
+
+    from django.utils import timezone
+
+    from core.models import Producto
+
+    reader = csv.DictReader(io.StringIO(contenido.decode("utf-8")), delimiter=";")
+    for row in reader:
+        Producto.objects.create(
+            vendedor=vendedor,
+            nombre=row["nombre"],
+            marca=row["marca"],
+            calidad=row["calidad"],
+            categoria=row["categoria"],
+            precio=Decimal(row["precio"]),
+            existencias=int(row["existencias"]),
+            fecha_ingreso=timezone.localdate(),
+            descripcion=row["descripcion"],
+        )
+
+
+def _por_lotes(vendedor, contenido):
+    from core.importers import ImportadorProductos, leer_csv
+
+    return ImportadorProductos(vendedor).importar_tabla(leer_csv(io.BytesIO(contenido)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100_000)
+    args = parser.parse_args()
+
+    import django
+
+    django.setup()
+    from django.contrib.auth.models import User
+    from django.db import connection
+    from django.test.utils import setup_test_environment
+
+    from core.models import Producto, Vendedor
+
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0)
+    try:
+        contenido = _csv(args.rows)
+        resultados = []
+        for etiqueta, funcion, limpiar, contenido in (
+            ("por_fila", _por_fila, True, contenido),
+            ("por_lotes", _por_lotes, False, contenido),
+            ("reimportar", _por_lotes, False, contenido),
+            ("actualizar_stock", _por_lotes, False, _csv(args.rows, stock_extra=5)),
+        ):
+            if limpiar:
+                Producto.objects.all().delete()
+            vendedor, _ = Vendedor.objects.get_or_create(
+                usuario=User.objects.get_or_create(username=f"bench_{etiqueta if limpiar else 'lotes'}")[0]
+            )
+            inicio = time.perf_counter()
+            funcion(vendedor, contenido)
+            duracion = time.perf_counter() - inicio
+            resultados.append((etiqueta, duracion, args.rows / duracion))
+        print(f"{'variante':<18}{'filas':>10}{'segundos':>10}{'filas/s':>12}")
+        for etiqueta, duracion, velocidad in resultados:
+            print(f"{etiqueta:<18}{args.rows:>10}{duracion:>10.2f}{velocidad:>12.0f}")
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+if __name__ == "__main__":
+    main()
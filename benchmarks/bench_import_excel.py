@@ -0,0 +1,110 @@
+"""Compara el pico de memoria (RSS) al leer un Excel de productos antes y después del modo read-only.
+
+Uso:
+    python benchmarks/bench_import_excel.py --rows 200000
+
+Genera un XLSX sintético y mide, cada variante en un subproceso propio, solo la lectura
+y el mapeo de filas (la escritura en la base es la misma para ambas):
+- workbook: f.read() + BytesIO + load_workbook normal + list(iter_rows), como la vista original.
+- read_only: core.importers.leer_excel sobre la ruta del archivo temporal.
+"""
+
+import argparse
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from io import BytesIO
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+HEADERS = ["nombre", "marca", "calidad", "categoria", "precio", "existencias", "fecha_ingreso", "descripcion"]
+
+
+def _generar(path, rows):
+    from openpyxl import Workbook
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Productos")
+    ws.append(HEADERS)
+    for i in range(rows):
+        ws.append([f"Figura {i}", f"Marca {i % 30}", "Nuevo", "Figuras", 12990 + i % 1000, i % 50, "2025-01-01", f"Lote {i}"])
+    wb.save(path)
+
+
+class _Subido:
+    """Imita un TemporaryUploadedFile de Django."""
+
+    def __init__(self, path):
+        self.path = path
+
+    def temporary_file_path(self):
+        return self.path
+
+
+def _run_workbook(path):
+    from openpyxl import load_workbook
+
+    with open(path, "rb") as f:
+        content = f.read()
+    wb = load_workbook(filename=BytesIO(content), data_only=True)
+    rows = list(wb.active.iter_rows(values_only=True))
+    return sum(1 for _ in rows[1:])
+
+
+def _run_read_only(path):
+    sys.path.insert(0, str(ROOT))
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "EpicAnimes.settings")
+    import django
+
+    django.setup()
+    from core.importers import leer_excel, mapear_encabezados
+
+    filas = leer_excel(_Subido(path))
+    campos = mapear_encabezados(next(filas))
+    return sum(1 for fila in filas if dict(zip(campos, fila)))
+
+
+def _peak_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _child(mode, path):
+    runner = _run_workbook if mode == "workbook" else _run_read_only
+    started = time.perf_counter()
+    rows = runner(path)
+    elapsed = time.perf_counter() - started
+    print(f"{mode}\t{rows}\t{elapsed:.2f}\t{_peak_rss_mb():.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--mode", choices=["workbook", "read_only"])
+    parser.add_argument("--path")
+    args = parser.parse_args()
+
+    if args.mode:
+        _child(args.mode, args.path)
+        return
+
+    with tempfile.NamedTemporaryFile(suffix=".xlsx") as tmp:
+        _generar(tmp.name, args.rows)
+        size_mb = Path(tmp.name).stat().st_size / 1024 / 1024
+        print(f"archivo: {size_mb:.1f} MB")
+        print(f"{'variante':<12}{'filas':>10}{'segundos':>10}{'pico RSS MB':>14}")
+        for mode in ("workbook", "read_only"):
+            out = subprocess.run(
+                [sys.executable, __file__, "--mode", mode, "--path", tmp.name],
+                check=True,
+                capture_output=True,
+                text=True,
+            ).stdout.strip()
+            name, rows, elapsed, rss = out.split("\t")
+            print(f"{name:<12}{rows:>10}{elapsed:>10}{rss:>14}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""Mide el arranque de un worker (django.setup + core.views) y su memoria base.
+
+Uso (con DJANGO_SETTINGS_MODULE apuntando a la configuración a medir):
+    python benchmarks/bench_startup.py --repeat 5
+
+Cada medición corre en un subproceso nuevo, como un worker de gunicorn o un comando
+de manage.py:
+- eager: importa TensorFlow antes de core.views, como hacía core.chatbot al cargarse.
+- lazy: solo django.setup() + core.views; TensorFlow queda para la primera pregunta.
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+_CHILD = """
+import resource, sys, time
+inicio = time.perf_counter()
+if {eager}:
+    import tensorflow
+import django
+django.setup()
+import core.views
+duracion = time.perf_counter() - inicio
+rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+print(f"{{duracion:.3f}}\\t{{rss:.1f}}\\t{{'tensorflow' in sys.modules}}")
+"""
+
+
+def _medir(eager):
+    env = dict(os.environ)
+    env.setdefault("DJANGO_SETTINGS_MODULE", "EpicAnimes.settings")
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(ROOT), env.get("PYTHONPATH")]))
+    out = subprocess.run(
+        [sys.executable, "-c", _CHILD.format(eager=eager)],
+        cwd=ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    if out.returncode != 0:
+        return None
+    duracion, rss, cargado = out.stdout.strip().splitlines()[-1].split("\t")
+    return float(duracion), float(rss), cargado == "True"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'variante':<10}{'mediana s':>12}{'pico RSS MB':>14}{'tensorflow':>12}")
+    for etiqueta, eager in (("eager", True), ("lazy", False)):
+        muestras = [_medir(eager) for _ in range(args.repeat)]
+        if any(m is None for m in muestras):
+            print(f"{etiqueta:<10}{'no disponible (falta tensorflow)':>38}")
+            continue
+        duracion = statistics.median(m[0] for m in muestras)
+        rss = statistics.median(m[1] for m in muestras)
+        print(f"{etiqueta:<10}{duracion:>12.3f}{rss:>14.1f}{str(muestras[0][2]):>12}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""Compara el pico de memoria (RSS) de las exportaciones XLSX antes y después del modo write-only.
+
+Uso:
+    python benchmarks/bench_xlsx_export.py --rows 100000
+
+Cada variante corre en un subproceso propio para que el pico de RSS sea independiente:
+- workbook: Workbook normal + BytesIO + bio.read(), como hacían las vistas originales.
+- write_only: core.exports.escribir_xlsx sobre un SpooledTemporaryFile.
+"""
+
+import argparse
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+from io import BytesIO
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+HEADERS = ["Fecha", "Vendedor", "Producto", "Cantidad", "Total"]
+
+
+def _filas(total):
+    """Genera filas sintéticas con la misma forma que la exportación de ventas."""
+    inicio = date(2024, 1, 1)
+    for i in range(total):
+        yield [
+            (inicio + timedelta(days=i % 365)).isoformat(),
+            f"vendedor_{i % 40}",
+            f"Figura coleccionable {i % 500}",
+            (i % 7) + 1,
+            Decimal("12990.00") * ((i % 7) + 1),
+        ]
+
+
+def _run_workbook(rows):
+    from openpyxl import Workbook
+
+    wb = Workbook()
+    ws = wb.active
+    ws.title = "Ventas"
+    ws.append(HEADERS)
+    for fila in _filas(rows):
+        ws.append(fila)
+    bio = BytesIO()
+    wb.save(bio)
+    bio.seek(0)
+    return len(bio.read())
+
+
+def _run_write_only(rows):
+    sys.path.insert(0, str(ROOT))
+    from core.exports import XLSX_SPOOL_MAX_BYTES, escribir_xlsx
+
+    with tempfile.SpooledTemporaryFile(max_size=XLSX_SPOOL_MAX_BYTES) as tmp:
+        escribir_xlsx(tmp, "Ventas", HEADERS, _filas(rows))
+        return tmp.tell()
+
+
+def _peak_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _child(mode, rows):
+    runner = _run_workbook if mode == "workbook" else _run_write_only
+    started = time.perf_counter()
+    size = runner(rows)
+    elapsed = time.perf_counter() - started
+    print(f"{mode}\t{rows}\t{size}\t{elapsed:.2f}\t{_peak_rss_mb():.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--mode", choices=["workbook", "write_only"])
+    args = parser.parse_args()
+
+    if args.mode:
+        _child(args.mode, args.rows)
+        return
+
+    print(f"{'variante':<12}{'filas':>10}{'bytes':>12}{'segundos':>10}{'pico RSS MB':>14}")
+    for mode in ("workbook", "write_only"):
+        out = subprocess.run(
+            [sys.executable, __file__, "--mode", mode, "--rows", str(args.rows)],
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout.strip()
+        name, rows, size, elapsed, rss = out.split("\t")
+        print(f"{name:<12}{rows:>10}{size:>12}{elapsed:>10}{rss:>14}")
+
+
+if __name__ == "__main__":
+    main()
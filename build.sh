@@ -10,3 +10,6 @@ python manage.py collectstatic --no-input
 
 # Apply any outstanding migrations before the app starts.
 python manage.py migrate
+
+# Train the chatbot model once per FAQ version so workers only load it.
+python manage.py entrenar_chatbot
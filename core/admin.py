@@ -16,6 +16,8 @@ from .models import (
     DashboardMetricas,
     PostulacionVendedor,
     NewsletterSubscriber,
+    TrabajoExportacion,
+    TrabajoImportacion,
 )
 
 
@@ -128,7 +130,7 @@ class CompraAdmin(admin.ModelAdmin):
                         nuevo_stock = max(0, int(p.existencias or 0) - int(qty))
                         if nuevo_stock != p.existencias:
                             p.existencias = nuevo_stock
-                            p.save(update_fields=['existencias'])
+                            p.save(update_fields=['existencias', 'actualizado'])
                     except Exception:
                         pass
                 return redirect('admin:core_compra_changelist')
@@ -169,3 +171,21 @@ class NewsletterSubscriberAdmin(admin.ModelAdmin):
 
     list_display = ("email", "fecha_suscripcion")
     search_fields = ("email",)
+
+
+@admin.register(TrabajoExportacion)
+class TrabajoExportacionAdmin(admin.ModelAdmin):
+    """Permite revisar las exportaciones en cola y sus archivos generados."""
+
+    list_display = ("tipo", "formato", "estado", "filas", "usuario", "creado", "finalizado")
+    list_filter = ("estado", "tipo", "formato")
+    readonly_fields = ("huella",)
+
+
+@admin.register(TrabajoImportacion)
+class TrabajoImportacionAdmin(admin.ModelAdmin):
+    """Permite seguir las importaciones de productos en cola y su resultado."""
+
+    list_display = ("vendedor", "formato", "estado", "filas", "creados", "actualizados", "total_errores", "creado")
+    list_filter = ("estado", "formato")
+    readonly_fields = ("errores",)
@@ -0,0 +1,100 @@
+"""Almacenamiento direccionado por contenido para las imágenes subidas.
+
+Expone:
+- AlmacenamientoPorContenido: guarda cada archivo con el hash SHA-256 de su contenido
+  como nombre ("productos/3f9a…c1.jpeg"). Subir dos veces la misma imagen reutiliza
+  el archivo existente en vez de crear "Vegetta_6TBUPxu.jpeg", y como un nombre nunca
+  cambia de contenido puede servirse con caché inmutable.
+- almacenamiento_contenido: instancia usada por Producto.imagen y PerfilCliente.foto.
+- es_nombre_hash: indica si un nombre ya tiene el formato direccionado por contenido.
+- EstaticosConHuella: almacenamiento de collectstatic (huellas en los nombres y
+  variantes .gz/.br de WhiteNoise) que tolera referencias a estáticos ausentes.
+
+Los archivos derivados (miniaturas de core.imagenes) se guardan con
+`guardar_derivado`, que respeta el nombre pedido porque ya deriva de un hash.
+`manage.py depurar_media` migra los archivos antiguos y elimina los huérfanos.
+"""
+
+import hashlib
+import posixpath
+import re
+
+from django.core.files.storage import FileSystemStorage
+from django.utils.deconstruct import deconstructible
+from whitenoise.storage import CompressedManifestStaticFilesStorage
+
+LARGO_HASH = 32
+_NOMBRE_HASH = re.compile(rf"^[0-9a-f]{{{LARGO_HASH}}}(\.|$)")
+
+
+def huella_contenido(contenido) -> str:
+    """SHA-256 (truncado) del archivo, leído por bloques."""
+    digest = hashlib.sha256()
+    if hasattr(contenido, "seek"):
+        contenido.seek(0)
+    for bloque in contenido.chunks() if hasattr(contenido, "chunks") else iter(lambda: contenido.read(65536), b""):
+        digest.update(bloque)
+    if hasattr(contenido, "seek"):
+        contenido.seek(0)
+    return digest.hexdigest()[:LARGO_HASH]
+
+
+def nombre_por_contenido(name: str, contenido) -> str:
+    """Nombre definitivo de un archivo: misma carpeta, hash del contenido y extensión en minúsculas."""
+    carpeta = posixpath.dirname(name.replace("\\", "/"))
+    extension = posixpath.splitext(name)[1].lower()
+    return posixpath.join(carpeta, f"{huella_contenido(contenido)}{extension}")
+
+
+def es_nombre_hash(nombre: str) -> bool:
+    return bool(_NOMBRE_HASH.match(posixpath.basename(nombre or "")))
+
+
+@deconstructible(path="core.almacenamiento.AlmacenamientoPorContenido")
+class AlmacenamientoPorContenido(FileSystemStorage):
+    """FileSystemStorage que nombra los archivos por el hash de su contenido."""
+
+    def save(self, name, content, max_length=None):
+        if content is None:
+            raise ValueError("No se puede guardar un archivo vacío.")
+        nombre = nombre_por_contenido(name, content)
+        if self.exists(nombre):
+            return nombre
+        try:
+            return super().save(nombre, content, max_length=max_length)
+        except FileExistsError:
+            # Otra subida simultánea guardó los mismos bytes.
+            return nombre
+
+    def get_available_name(self, name, max_length=None):
+        # Con nombres por contenido el mismo nombre implica los mismos bytes: nunca se agrega
+        # un sufijo. Si ya existe se avisa con FileExistsError (lo atiende `save`), en vez de
+        # dejar que FileSystemStorage._save reintente para siempre con el mismo nombre.
+        if es_nombre_hash(name):
+            if self.exists(name):
+                raise FileExistsError(name)
+            return name
+        return super().get_available_name(name, max_length=max_length)
+
+    def guardar_derivado(self, name, content):
+        """Guarda un archivo derivado con el nombre exacto pedido, reemplazando el anterior."""
+        if self.exists(name):
+            self.delete(name)
+        return super().save(name, content)
+
+
+almacenamiento_contenido = AlmacenamientoPorContenido()
+
+
+class EstaticosConHuella(CompressedManifestStaticFilesStorage):
+    """Estáticos con huella; un {% static %} a un archivo ausente usa el nombre sin huella.
+
+    Django lanzaría ValueError y una referencia rota (p. ej. los favicons que faltan en
+    static/) haría fallar el render de cada página en producción.
+    """
+
+    def stored_name(self, name):
+        try:
+            return super().stored_name(name)
+        except ValueError:
+            return name
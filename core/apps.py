@@ -8,3 +8,14 @@ class CoreConfig(AppConfig):
 
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'core'
+
+    def ready(self):
+        """Conecta las señales del chatbot, las miniaturas, la caché de páginas, las exportaciones, los roles y los perfiles."""
+        from . import cache_paginas, chatbot_productos, exports, imagenes, perfiles, roles
+
+        cache_paginas.conectar_senales()
+        chatbot_productos.conectar_senales()
+        exports.conectar_senales()
+        imagenes.conectar_senales()
+        perfiles.conectar_senales()
+        roles.conectar_senales()
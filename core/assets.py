@@ -0,0 +1,202 @@
+"""Paquetes de JS/CSS y subconjunto de Font Awesome servidos desde static/ (sin CDN).
+
+Expone:
+- PAQUETES: archivo generado en static/dist/ -> fuentes que concatena, en orden. La
+  fuente ICONOS es la hoja de Font Awesome recortada a los íconos usados.
+- iconos_usados: clases fa-* que aparecen en las plantillas y en static/js.
+- construir: genera en memoria los paquetes minificados, la hoja de íconos y las
+  fuentes reducidas; devuelve {ruta relativa a static/: bytes}.
+
+`manage.py construir_assets` escribe el resultado (se versiona en el repositorio, así el
+despliegue no necesita estas herramientas) y `--check` avisa si quedó desactualizado.
+Las huellas en los nombres las pone CompressedManifestStaticFilesStorage al ejecutar
+collectstatic, por eso las plantillas ya no llevan "?v=N".
+
+Para regenerar hacen falta rjsmin, rcssmin, fonttools, brotli (woff2) y el paquete
+fontawesomefree==6.5.1; se importan solo al construir. Chart.js 4.4.0 está copiado en
+static/vendor/chartjs/.
+"""
+
+import os
+import re
+from io import BytesIO
+from pathlib import Path
+
+from django.conf import settings
+
+ICONOS = "dist/iconos.css"
+FUENTES_DIR = "dist/webfonts"
+PAQUETES = {
+    "dist/index.css": [ICONOS, "css/base/index.css", "css/base/chatbot.css"],
+    "dist/index.js": ["js/site/index.js", "js/site/chatbot.js"],
+    "dist/admin.css": [ICONOS, "css/dashboards/dashboard_administrador.css"],
+    "dist/admin.js": [
+        "vendor/chartjs/chart.umd.min.js",
+        "js/dashboards/admin/dashboard_administrador.js",
+        "js/dashboards/admin/dashboard_administrador_charts.js",
+        "js/dashboards/admin/dashboard_estado_global.js",
+        "js/dashboards/admin/dashboard_ventas_usuarios_cards.js",
+        "js/dashboards/admin/dashboard_vendedores_estado.js",
+        "js/dashboards/admin/ventas_usuarios_barras.js",
+    ],
+    "dist/vendedor.css": [ICONOS, "css/dashboards/dashboard_vendedor.css"],
+    "dist/vendedor.js": [
+        "vendor/chartjs/chart.umd.min.js",
+        "js/dashboards/vendor/dashboard_vendedor.js",
+        "js/dashboards/vendor/dashboard_vendedor_charts.js",
+    ],
+}
+
+# Hojas de Font Awesome por estilo: (hoja, fuente, clases que lo activan). El sólido es
+# el estilo por defecto de la clase "fa", así que se incluye siempre.
+ESTILOS = (
+    ("solid", "fa-solid-900", ()),
+    ("regular", "fa-regular-400", ("far", "fa-regular")),
+    ("brands", "fa-brands-400", ("fab", "fa-brands")),
+)
+
+_CLASE_ICONO = re.compile(r"(?<![\w-])fa-[a-z0-9]+(?:-[a-z0-9]+)*")
+_CLASE_ESTILO = re.compile(r"(?<![\w-])(fa[rb]|fa-regular|fa-brands)(?![\w-])")
+_REGLA_ICONO = re.compile(r'((?:\.fa-[a-z0-9-]+:before,?)+)\{content:"\\([0-9a-f]+)"\}')
+_FUENTE_URL = re.compile(r"src:url\(\.\./webfonts/([\w-]+)\.woff2\) format\(\"woff2\"\),url\([^)]*\) format\(\"truetype\"\)")
+
+
+def _raiz_static() -> Path:
+    return Path(settings.BASE_DIR) / "static"
+
+
+def _archivos_escaneados():
+    for carpeta, extension in (
+        (Path(settings.BASE_DIR) / "templates", ".html"),
+        (_raiz_static() / "js", ".js"),
+    ):
+        for ruta in sorted(carpeta.rglob(f"*{extension}")):
+            yield ruta
+
+
+def iconos_usados():
+    """(clases fa-* usadas, estilos de Font Awesome que aparecen además del sólido)."""
+    clases, estilos = set(), {"solid"}
+    for ruta in _archivos_escaneados():
+        texto = ruta.read_text(encoding="utf-8-sig")
+        clases.update(_CLASE_ICONO.findall(texto))
+        for clase in _CLASE_ESTILO.findall(texto):
+            estilos.update(estilo for estilo, _, activan in ESTILOS if clase in activan)
+    return clases, estilos
+
+
+def _fontawesome():
+    try:
+        import fontawesomefree
+    except ImportError as exc:
+        raise RuntimeError("Instala fontawesomefree==6.5.1 para construir la hoja de íconos.") from exc
+    return Path(fontawesomefree.__file__).parent / "static" / "fontawesomefree"
+
+
+def _recortar_css(css: str, clases: set, codigos: set) -> str:
+    """Quita las reglas de íconos que no se usan y deja solo la fuente woff2 reducida."""
+
+    def regla(coincidencia):
+        selectores = [s for s in coincidencia.group(1).split(",") if s and s[1:-len(":before")] in clases]
+        if not selectores:
+            return ""
+        codigos.add(int(coincidencia.group(2), 16))
+        return ",".join(selectores) + '{content:"\\' + coincidencia.group(2) + '"}'
+
+    css = _REGLA_ICONO.sub(regla, css)
+    return _FUENTE_URL.sub(r'src:url(webfonts/\1.woff2) format("woff2")', css)
+
+
+def _subconjunto(origen: Path, codigos: set) -> bytes:
+    from fontTools import subset
+
+    opciones = subset.Options()
+    opciones.flavor = "woff2"
+    opciones.layout_features = ["*"]
+    fuente = subset.load_font(str(origen), opciones)
+    recorte = subset.Subsetter(opciones)
+    recorte.populate(unicodes=codigos)
+    recorte.subset(fuente)
+    salida = BytesIO()
+    subset.save_font(fuente, salida, opciones)
+    return salida.getvalue()
+
+
+def _iconos():
+    """Hoja de Font Awesome recortada y sus fuentes: ({ruta: bytes}, clases desconocidas)."""
+    base = _fontawesome()
+    clases, estilos = iconos_usados()
+    codigos = set()
+    hojas = ["fontawesome"] + [estilo for estilo, _, _ in ESTILOS if estilo in estilos]
+    css = "".join(
+        _recortar_css((base / "css" / f"{hoja}.min.css").read_text(encoding="utf-8"), clases, codigos) for hoja in hojas
+    )
+    generados = {ICONOS: css.encode("utf-8")}
+    for estilo, fuente, _ in ESTILOS:
+        if estilo in estilos:
+            generados[f"{FUENTES_DIR}/{fuente}.woff2"] = _subconjunto(base / "webfonts" / f"{fuente}.ttf", codigos)
+    conocidas = set(re.findall(r"\.(fa-[a-z0-9-]+)", (base / "css" / "all.min.css").read_text(encoding="utf-8")))
+    return generados, sorted(clases - conocidas)
+
+
+def _minificar(ruta: str, texto: str) -> str:
+    if ruta.endswith(".min.js") or ruta.endswith(".min.css"):
+        return texto.strip()
+    if ruta.endswith(".js"):
+        import rjsmin
+
+        return rjsmin.jsmin(texto, keep_bang_comments=True)
+    import rcssmin
+
+    return rcssmin.cssmin(texto, keep_bang_comments=True)
+
+
+def construir():
+    """Genera todos los archivos en memoria; devuelve ({ruta: bytes}, clases fa-* desconocidas)."""
+    generados, desconocidas = _iconos()
+    for destino, fuentes in PAQUETES.items():
+        partes = []
+        for fuente in fuentes:
+            if fuente == ICONOS:
+                partes.append(generados[ICONOS].decode("utf-8"))
+                continue
+            texto = (_raiz_static() / fuente).read_text(encoding="utf-8-sig")
+            partes.append(_minificar(fuente, texto))
+        # ";" entre scripts: un archivo que termina sin punto y coma no se fusiona con el siguiente.
+        separador = "\n;\n" if destino.endswith(".js") else "\n"
+        generados[destino] = (separador.join(partes) + "\n").encode("utf-8")
+    return generados, desconocidas
+
+
+def codigos_de_fuente(contenido: bytes) -> set:
+    """Puntos de código de una fuente; compara fuentes sin depender de la versión de brotli."""
+    from fontTools.ttLib import TTFont
+
+    return set(TTFont(BytesIO(contenido)).getBestCmap())
+
+
+def diferencias(generados: dict) -> list:
+    """Rutas de static/ cuyo contenido no coincide con lo generado."""
+    raiz = _raiz_static()
+    distintas = []
+    for ruta, contenido in sorted(generados.items()):
+        actual = raiz / ruta
+        if not actual.exists():
+            distintas.append(ruta)
+        elif ruta.endswith(".woff2"):
+            if codigos_de_fuente(actual.read_bytes()) != codigos_de_fuente(contenido):
+                distintas.append(ruta)
+        elif actual.read_bytes() != contenido:
+            distintas.append(ruta)
+    return distintas
+
+
+def escribir(generados: dict) -> int:
+    raiz = _raiz_static()
+    total = 0
+    for ruta, contenido in generados.items():
+        destino = raiz / ruta
+        os.makedirs(destino.parent, exist_ok=True)
+        destino.write_bytes(contenido)
+        total += len(contenido)
+    return total
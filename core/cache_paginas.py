@@ -0,0 +1,163 @@
+"""Caché de páginas completas para visitantes anónimos (portada y detalle de producto).
+
+Expone:
+- cache_anonima: decorador de vistas. Si la solicitud es GET/HEAD de un visitante sin
+  sesión iniciada, sin carrito y sin mensajes pendientes, responde con la página
+  guardada sin ejecutar la vista (ni consultas ni render); si no, ejecuta la vista.
+- clave_pagina: ruta + parámetros de filtro normalizados + versión del catálogo.
+- invalidar: publica una versión nueva; las páginas guardadas dejan de usarse.
+- conectar_senales: invalida al guardar o eliminar un Producto y tras cada
+  importación masiva (`catalogo_actualizado`).
+
+Solo los parámetros declarados por cada vista forman la clave: "?utm_source=…" o
+"?fbclid=…" de una promoción comparten la misma entrada, y los valores que la vista
+trata igual ("", "recientes") se normalizan. Los campos ocultos "next" que repiten
+la URL conservan la de la primera solicitud, equivalente en filtros.
+
+Todas las apariciones del token CSRF de la página guardada (formularios, la meta
+"csrf-token" que usa el chatbot, scripts) se reemplazan por una marca y se vuelven a
+poner en cada respuesta con el token del visitante (lo que además le entrega la cookie).
+
+Las páginas van en el alias "paginas" de CACHES. Con la caché local por proceso cada
+worker guarda e invalida su propia copia; CACHE_PAGINAS_TTL acota cuánto puede tardar
+otro worker en ver un cambio, y también los cambios hechos con QuerySet.update().
+"""
+
+import hashlib
+import re
+import uuid
+from functools import wraps
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.contrib.messages.storage.cookie import CookieStorage
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.http import HttpResponse
+from django.middleware.csrf import CSRF_TOKEN_LENGTH, _unmask_cipher_token, get_token
+
+from .importers import catalogo_actualizado
+
+ALIAS = "paginas"
+PAGINAS_TTL = 300
+VERSION_KEY = "paginas:version"
+MARCA_CSRF = "__csrf_pagina__"
+
+_CANDIDATO_CSRF = re.compile(rf"(?<![A-Za-z0-9])[A-Za-z0-9]{{{CSRF_TOKEN_LENGTH}}}(?![A-Za-z0-9])")
+
+
+def _cache():
+    return caches[ALIAS]
+
+
+def _version() -> str:
+    version = _cache().get(VERSION_KEY)
+    if version is None:
+        version = uuid.uuid4().hex
+        _cache().set(VERSION_KEY, version, None)
+    return version
+
+
+def invalidar():
+    """Descarta todas las páginas guardadas (se vuelven a generar en la próxima visita)."""
+    _cache().set(VERSION_KEY, uuid.uuid4().hex, None)
+
+
+def texto(valor: str) -> str | None:
+    return valor.strip() or None
+
+
+def casilla(valor: str) -> str | None:
+    return "1" if valor.strip() in ("1", "on", "true", "True") else None
+
+
+def distinto_de(por_defecto: str):
+    def normalizar(valor: str) -> str | None:
+        valor = valor.strip()
+        return valor if valor and valor != por_defecto else None
+
+    return normalizar
+
+
+def clave_pagina(request, parametros: dict) -> str:
+    """Clave de la página: versión, ruta y solo los parámetros declarados, normalizados."""
+    filtros = []
+    for nombre, normalizar in sorted(parametros.items()):
+        valor = normalizar(request.GET.get(nombre) or "")
+        if valor is not None:
+            filtros.append((nombre, valor))
+    resumen = hashlib.sha256(f"{request.path}?{urlencode(filtros)}".encode("utf-8")).hexdigest()[:32]
+    return f"pagina:{_version()}:{resumen}"
+
+
+def _es_anonima(request) -> bool:
+    # Sin cookie de sesión no se toca la base de datos; con ella se carga la sesión una vez.
+    if request.method not in ("GET", "HEAD") or request.user.is_authenticated:
+        return False
+    if CookieStorage.cookie_name in request.COOKIES:
+        return False
+    sesion = request.session
+    return not sesion.get("cart") and not sesion.get("_messages")
+
+
+def _guardable(request, respuesta) -> bool:
+    return (
+        respuesta.status_code == 200
+        and not respuesta.streaming
+        and not respuesta.cookies
+        and not request.session.modified
+        and not respuesta.has_header("Cache-Control")
+    )
+
+
+def _con_marca(request, contenido: str) -> str:
+    # Cada get_token() enmascara el secreto de otra forma: se reconocen todos los tokens
+    # que descifran al secreto de esta solicitud, estén donde estén en la página.
+    secreto = request.META.get("CSRF_COOKIE")
+    if not secreto:
+        return contenido
+    for token in set(_CANDIDATO_CSRF.findall(contenido)):
+        if _unmask_cipher_token(token) == secreto:
+            contenido = contenido.replace(token, MARCA_CSRF)
+    return contenido
+
+
+def cache_anonima(parametros: dict):
+    """Decorador: guarda la página para visitantes anónimos según `parametros` {nombre: normalizador}."""
+
+    def decorador(vista):
+        @wraps(vista)
+        def envoltura(request, *args, **kwargs):
+            if not _es_anonima(request):
+                return vista(request, *args, **kwargs)
+            clave = clave_pagina(request, parametros)
+            guardada = _cache().get(clave)
+            if guardada is not None:
+                contenido, tipo = guardada
+                return HttpResponse(contenido.replace(MARCA_CSRF, get_token(request)), content_type=tipo)
+            respuesta = vista(request, *args, **kwargs)
+            if _guardable(request, respuesta):
+                contenido = _con_marca(request, respuesta.content.decode(respuesta.charset))
+                _cache().set(
+                    clave,
+                    (contenido, respuesta["Content-Type"]),
+                    getattr(settings, "CACHE_PAGINAS_TTL", PAGINAS_TTL),
+                )
+            return respuesta
+
+        return envoltura
+
+    return decorador
+
+
+def _producto_cambiado(sender, **kwargs):
+    transaction.on_commit(invalidar)
+
+
+def conectar_senales():
+    from .models import Producto
+
+    post_save.connect(_producto_cambiado, sender=Producto, dispatch_uid="paginas_producto_guardado")
+    post_delete.connect(_producto_cambiado, sender=Producto, dispatch_uid="paginas_producto_eliminado")
+    catalogo_actualizado.connect(_producto_cambiado, dispatch_uid="paginas_catalogo_actualizado")
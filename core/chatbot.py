@@ -1,36 +1,36 @@
 """Implementa el chatbot basado en FAQ y los mecanismos de respaldo semántico."""
 
+import hashlib
+import json
 import logging
+import os
 import re
+import shutil
+import tempfile
 import unicodedata
 from decimal import Decimal
 from pathlib import Path
 from typing import Iterable, List, Tuple
 
 import numpy as np
-from django.apps import apps
-
-try:
-    import tensorflow as tf
-except Exception as exc:
-    tf = None
-    _IMPORT_ERROR = exc
-else:
-    _IMPORT_ERROR = None
+from django.conf import settings
 
+from .chatbot_intents import ClasificadorIntenciones
+from .chatbot_reglas import AutomataFrases, ReglasCompiladas
+from .chatbot_semantica import EspacioSemantico
 
 BASE_DIR = Path(__file__).resolve().parent
 FAQ_PATH = BASE_DIR / "chatbot_faq.txt"
+ARTEFACTO_PESOS = "clasificador.npz"
+ARTEFACTO_VOCABULARIO = "vocabulario.json"
+ARTEFACTO_ETIQUETAS = "etiquetas.json"
 
 _MODEL = None
 _LABELS: List[int] = []
 _ANSWERS: List[str] = []
 _FAQ_CACHE: List[Tuple[str, str]] = []
 
-_VOCAB = {}
-_IDF: np.ndarray | None = None
-_QUESTION_MATRIX: np.ndarray | None = None
-_QUESTION_NORMS: np.ndarray | None = None
+_SEMANTIC: EspacioSemantico | None = None
 
 _TOKEN_PATTERN = re.compile(r"[a-z0-9ñ]+", re.IGNORECASE)
 
@@ -275,32 +275,18 @@ _FAQ_RULES = [
 ]
 
 def _match_rule(question: str, tokens: List[str], user_role: str | None, rules: List[dict]) -> str | None:
-    """Evalúa un conjunto de reglas y retorna la respuesta correspondiente."""
+    """Evalúa un conjunto de reglas y retorna la respuesta correspondiente.
+
+    La tabla se compila una sola vez (ver `_compiled_rules`); cada pregunta se recorre
+    en una pasada sin importar cuántas reglas tenga la tabla.
+    """
     if not question:
         return None
-    normalized_question = _normalize_text(question)
-    token_set = _normalize_tokens(tokens)
     role = (user_role or "comprador").lower()
-    for rule in rules:
-        roles = rule.get("roles")
-        if roles and role not in roles:
-            continue
-        all_tokens = rule.get("all")
-        if all_tokens:
-            if not _normalize_tokens(all_tokens).issubset(token_set):
-                continue
-        any_tokens = rule.get("any")
-        if any_tokens:
-            if not (token_set & _normalize_tokens(any_tokens)):
-                continue
-        phrases = rule.get("phrases")
-        if phrases:
-            if not any(_normalize_text(phrase) in normalized_question for phrase in phrases):
-                continue
-        response_segments = rule.get("response") or ()
-        if response_segments:
-            return _compose_response(*response_segments)
-    return None
+    idx = _compiled_rules(rules).primera([_normalize_text(token) for token in tokens if token], role)
+    if idx is None:
+        return None
+    return _compose_response(*rules[idx]["response"])
 
 
 def _strip_accents(text: str) -> str:
@@ -315,10 +301,6 @@ def _normalize_text(text: str) -> str:
     return re.sub(r"\s+", " ", cleaned).strip()
 
 
-def _normalize_tokens(tokens: Iterable[str]) -> set[str]:
-    return { _normalize_text(token) for token in tokens if token }
-
-
 def _tokenize(text: str) -> List[str]:
     """Convierte una oración en tokens normalizados para búsquedas."""
     if not text:
@@ -327,6 +309,59 @@ def _tokenize(text: str) -> List[str]:
     return _TOKEN_PATTERN.findall(lowered)
 
 
+def _build_role_dialog_rules() -> List[dict]:
+    """Convierte las preguntas guía de cada rol en reglas para `_match_rule`.
+
+    Una pregunta coincide si contiene las palabras significativas de la pregunta guía;
+    las del perfil "invitado" sirven para cualquier rol. Se usan en `_fallback_answer`
+    cuando el clasificador no está disponible.
+    """
+    rules = []
+    for role, entries in _ROLE_HELP_SEGMENTS.items():
+        roles = None if role == "invitado" else {role}
+        for entry in entries:
+            keywords = {tok for tok in _tokenize(entry["pregunta"]) if len(tok) > 3 and tok not in _PRODUCT_STOPWORDS}
+            rule = {"roles": roles, "response": (entry["respuesta"],)}
+            if len(keywords) > 1:
+                rule["all"] = keywords
+            else:
+                # Con una sola palabra clave ("¿Qué es EpicAnimes?") se exige la frase completa.
+                rule["phrases"] = [" ".join(_tokenize(entry["pregunta"]))]
+            rules.append(rule)
+    return rules
+
+
+_ROLE_DIALOG_RULES = _build_role_dialog_rules()
+
+_COMPILED_RULES: dict[int, tuple[List[dict], ReglasCompiladas]] = {}
+
+
+def _compiled_rules(rules: List[dict]) -> ReglasCompiladas:
+    """Devuelve la versión compilada de una tabla de reglas (se compila la primera vez)."""
+    entry = _COMPILED_RULES.get(id(rules))
+    if entry is None or entry[0] is not rules:
+        entry = _COMPILED_RULES[id(rules)] = (rules, ReglasCompiladas(rules, _tokenize, _normalize_text))
+    return entry[1]
+
+
+_compiled_rules(_FAQ_RULES)
+_compiled_rules(_ROLE_DIALOG_RULES)
+
+# Frases de `_special_response` en un solo autómata; cada una se etiqueta con su grupo.
+_SPECIAL_PHRASES = AutomataFrases(
+    (_tokenize(phrase), group)
+    for group, phrases in (
+        ("offensive", _OFFENSIVE_KEYWORDS),
+        ("thanks", _THANKS_KEYWORDS),
+        ("help", _HELP_KEYWORDS),
+        ("goodbye", _GOODBYE_KEYWORDS),
+        ("small_talk", _SMALL_TALK_PHRASES),
+        ("greeting", _GREETING_KEYWORDS),
+    )
+    for phrase in phrases
+)
+
+
 def _role_greeting(role: str | None, *, seed: str = "") -> str:
     """Devuelve un saludo contextualizado según el rol del usuario."""
     normalized_role = role or "comprador"
@@ -337,9 +372,9 @@ def _role_greeting(role: str | None, *, seed: str = "") -> str:
 
 def _role_help_message(role: str | None) -> str:
     """Entrega sugerencias rápidas para orientar al usuario según su rol."""
-    normalized_role = role or "comprador"
-    segments = _ROLE_HELP_SEGMENTS.get(normalized_role, _ROLE_HELP_SEGMENTS["comprador"])
-    return _compose_response(*segments)
+    normalized_role = "invitado" if role == "anonimo" else role or "comprador"
+    entries = _ROLE_HELP_SEGMENTS.get(normalized_role, _ROLE_HELP_SEGMENTS["comprador"])
+    return _compose_response(*(f"{entry['pregunta']} {entry['respuesta']}" for entry in entries))
 
 
 def _special_response(question: str, *, user_role: str | None = None) -> str | None:
@@ -352,22 +387,22 @@ def _special_response(question: str, *, user_role: str | None = None) -> str | N
             "Parece que solo enviaste signos o espacios.",
             "Cuéntame tu pregunta sobre EpicAnimes y con gusto respondo.",
         )
-    token_set = set(tokens)
-    if token_set & _OFFENSIVE_KEYWORDS:
+    groups = _SPECIAL_PHRASES.buscar(tokens)
+    if "offensive" in groups:
         return _compose_response(
             "Prefiero mantener una conversación respetuosa.",
             "¿Deseas que te ayude con algo relacionado con EpicAnimes?",
         )
-    if token_set & _THANKS_KEYWORDS:
+    if "thanks" in groups:
         return _compose_response("¡Gracias a ti!", "¿Hay algo más en lo que pueda ayudarte en EpicAnimes?")
-    if token_set & _HELP_KEYWORDS:
+    if "help" in groups:
         return _role_help_message(user_role)
-    if any(phrase in normalized for phrase in _GOODBYE_KEYWORDS):
+    if "goodbye" in groups:
         return _compose_response(
             "¡Hasta luego, que tengas un gran día!",
             "Si necesitas algo más de EpicAnimes, aquí estaré.",
         )
-    if any(phrase in normalized for phrase in _SMALL_TALK_PHRASES):
+    if "small_talk" in groups:
         reply = _pick_variant(
             [
                 "Todo bien por aquí, listo para ayudarte.",
@@ -377,9 +412,8 @@ def _special_response(question: str, *, user_role: str | None = None) -> str | N
             seed=question,
         )
         return _compose_response(reply, "¿En qué puedo ayudarte hoy?")
-    for keyword in _GREETING_KEYWORDS:
-        if cleaned.startswith(keyword) or f" {keyword} " in f" {cleaned} ":
-            return _role_greeting(user_role, seed=question)
+    if "greeting" in groups:
+        return _role_greeting(user_role, seed=question)
     short_noise = len(tokens) <= 2 and all(len(token) <= 2 for token in tokens)
     only_repeated = len(set("".join(tokens))) == 1 if tokens else False
     if short_noise or only_repeated:
@@ -397,12 +431,10 @@ def _question_relates_to_faq(tokens: List[str]) -> bool:
     filtered = [token for token in tokens if token not in _PRODUCT_STOPWORDS]
     if not filtered:
         return False
-    if not _VOCAB:
-        try:
-            _ensure_semantic_space()
-        except Exception:
-            return True
-    vocab = _VOCAB or {}
+    try:
+        vocab = _ensure_semantic_space().vocabulario
+    except Exception:
+        return True
     return any(token in vocab for token in filtered)
 
 
@@ -419,44 +451,34 @@ def _format_price(value) -> str:
     return text.replace(",", ".")
 
 
-def _recommendation_answer(productos: List) -> dict | None:
-    """Entrega una recomendación directa usando los productos disponibles."""
-    if not productos:
+def _recommendation_answer(top) -> dict | None:
+    """Entrega una recomendación directa con el mejor producto disponible del índice."""
+    if top is None:
         return None
-
-    disponibles = [p for p in productos if (p.existencias or 0) > 0]
-    candidatos = list(disponibles or productos)
-
-    def _score(prod):
-        stock = prod.existencias or 0
-        fecha = getattr(prod, "fecha_ingreso", None)
-        try:
-            fecha_score = fecha.toordinal()
-        except Exception:
-            fecha_score = 0
-        return (1 if stock > 0 else 0, stock, fecha_score, getattr(prod, "id", 0))
-
-    candidatos.sort(key=_score, reverse=True)
-    top = candidatos[0]
-
     respuesta = _compose_response(
         f'Te recomiendo "{top.nombre}" ({top.categoria}) por {_format_price(top.precio)}.',
         f"Hay {max(int(top.existencias or 0), 0)} unidades listas para despacho.",
         f"Revísalo aquí: /producto/{top.id}/.",
     )
-    return {"answer": respuesta, "confidence": 0.85}
+    return {"answer": respuesta, "confidence": 0.85, "source": "product"}
 
 
 def _product_answer(question: str, tokens: List[str]) -> dict | None:
-    """Busca coincidencias con productos reales para responder consultas específicas."""
+    """Busca coincidencias con productos reales para responder consultas específicas.
+
+    Usa el índice invertido de core.chatbot_productos: solo se recorren los productos
+    que comparten algún token con la pregunta, sin consultar la base por mensaje.
+    """
     if not tokens:
         return None
     try:
-        Producto = apps.get_model("core", "Producto")
+        from .chatbot_productos import obtener_indice
+
+        indice = obtener_indice()
     except Exception:
+        logger.exception("No se pudo preparar el índice de productos del chatbot")
         return None
-    productos = list(Producto.objects.all())
-    if not productos:
+    if not len(indice):
         return None
 
     token_set = set(tokens)
@@ -467,46 +489,34 @@ def _product_answer(question: str, tokens: List[str]) -> dict | None:
     content_tokens = {tok for tok in token_set if len(tok) > 2 and tok not in _PRODUCT_STOPWORDS}
     meaningful_tokens = {tok for tok in content_tokens if tok not in _RECOMMEND_TERMS and not tok.startswith("recom")}
     if wants_recommendation and not meaningful_tokens:
-        recommendation = _recommendation_answer(productos)
+        recommendation = _recommendation_answer(indice.recomendado())
         if recommendation:
             return recommendation
     if not content_tokens:
         return None
-    matches = []
     price_terms = {"precio", "precios", "cuanto", "vale", "cuesta"}
     stock_terms = {"stock", "disponible", "disponibles", "tienen", "hay"}
+    bonus = (0.4 if token_set & price_terms else 0) + (0.2 if token_set & stock_terms else 0)
 
-    for prod in productos:
-        texto = " ".join(part for part in [prod.nombre, prod.descripcion, prod.categoria] if part)
-        producto_tokens = {tok for tok in _tokenize(texto) if len(tok) > 2 and tok not in _PRODUCT_STOPWORDS}
-        overlap = content_tokens & producto_tokens
-        if not overlap:
-            continue
-        score = len(overlap)
-        if token_set & price_terms:
-            score += 0.4
-        if token_set & stock_terms:
-            score += 0.2
-        matches.append(
-            {
-                "producto": prod,
-                "score": score,
-            }
-        )
-
-    if not matches:
+    coincidencias = indice.coincidencias(content_tokens)
+    if not coincidencias:
         if wants_recommendation:
-            return _recommendation_answer(productos)
+            return _recommendation_answer(indice.recomendado())
         return None
 
-    matches.sort(key=lambda item: (item["score"], item["producto"].existencias or 0), reverse=True)
-    top = matches[0]["producto"]
+    def _orden(pk):
+        # Mayor puntaje y stock primero; los empates siguen el orden del catálogo (Producto.Meta.ordering).
+        ficha = indice.fichas[pk]
+        fecha = ficha.fecha_ingreso.toordinal() if ficha.fecha_ingreso else 0
+        return (-(coincidencias[pk] + bonus), -(ficha.existencias or 0), -fecha, ficha.nombre, pk)
+
+    top = indice.fichas[min(coincidencias, key=_orden)]
     respuesta = _compose_response(
         f'Tenemos "{top.nombre}" ({top.categoria}) por {_format_price(top.precio)}.',
         f"Hay {top.existencias} unidades disponibles." if top.existencias is not None else "Consulta su stock en la ficha del producto.",
         f"Revísalo aquí: /producto/{top.id}/.",
     )
-    return {"answer": respuesta, "confidence": 0.9}
+    return {"answer": respuesta, "confidence": 0.9, "source": "product"}
 
 
 def _load_faq_pairs(path: Path) -> Tuple[List[str], List[str]]:
@@ -539,165 +549,116 @@ def _ensure_faq_cache() -> Tuple[List[str], List[str]]:
     return preguntas, respuestas
 
 
-def _build_model(preguntas: List[str], etiquetas: List[int]):
-    """Entrena el clasificador basado en TensorFlow a partir de las FAQ."""
-    vectorizer = tf.keras.layers.TextVectorization(
-        output_mode="int",
-        output_sequence_length=48,
-        standardize="lower_and_strip_punctuation",
-    )
-    vectorizer.adapt(preguntas)
-    vocab_size = len(vectorizer.get_vocabulary())
-
-    model = tf.keras.Sequential(
-        [
-            tf.keras.Input(shape=(1,), dtype=tf.string),
-            vectorizer,
-            tf.keras.layers.Embedding(vocab_size + 1, 64),
-            tf.keras.layers.GlobalAveragePooling1D(),
-            tf.keras.layers.Dense(64, activation="relu"),
-            tf.keras.layers.Dense(len(_ANSWERS), activation="softmax"),
-        ]
-    )
+def huella_faq(path: Path = FAQ_PATH) -> str:
+    """Hash del archivo de FAQ completo: cambia con cualquier edición, preguntas o respuestas."""
+    return hashlib.sha256(path.read_bytes()).hexdigest()[:16]
 
-    model.compile(optimizer="adam", loss="sparse_categorical_crossentropy", metrics=["accuracy"])
-    model.fit(
-        tf.convert_to_tensor(preguntas),
-        tf.convert_to_tensor(etiquetas),
-        epochs=160,
-        verbose=0,
-        shuffle=True,
-    )
-    return model
 
+def directorio_artefactos(huella: str | None = None) -> Path:
+    """Carpeta donde viven los artefactos entrenados para una versión de las FAQ."""
+    return Path(settings.CHATBOT_MODEL_DIR) / (huella or huella_faq())
 
-def _ensure_model():
-    """Garantiza que el modelo neuronal esté disponible antes de responder."""
-    global _MODEL, _LABELS, _ANSWERS
-    if _MODEL is not None:
-        return
-    if _IMPORT_ERROR is not None or tf is None:
-        detalle = f" Detalle: {_IMPORT_ERROR}" if _IMPORT_ERROR else ""
-        raise RuntimeError(
-            "El asistente virtual no está disponible porque TensorFlow no se cargó correctamente. "
-            "Instala una versión compatible (por ejemplo 'pip install tensorflow-cpu==2.15') y reinicia el servidor."
-            f"{detalle}"
-        ) from _IMPORT_ERROR
+
+def entrenar_clasificador(preguntas: List[str]) -> ClasificadorIntenciones:
+    """Ajusta el clasificador NumPy con una intención por pregunta de las FAQ."""
+    documentos = [_tokenize(pregunta) for pregunta in preguntas]
+    return ClasificadorIntenciones.entrenar(documentos, list(range(len(documentos))))
+
+
+def entrenar_artefactos(*, forzar: bool = False) -> Path:
+    """Entrena el clasificador para la versión actual de las FAQ y guarda pesos, vocabulario y etiquetas.
+
+    Si los artefactos de esa versión ya existen no se vuelve a entrenar (salvo `forzar`).
+    Se escriben en una carpeta temporal y se publican con un rename para que otros
+    procesos nunca lean artefactos a medio escribir.
+    """
+    huella = huella_faq()
+    destino = directorio_artefactos(huella)
+    if (destino / ARTEFACTO_ETIQUETAS).exists() and not forzar:
+        return destino
     preguntas, respuestas = _ensure_faq_cache()
-    _ANSWERS = list(respuestas)
-    _LABELS = list(range(len(respuestas)))
     logger.info("Entrenando modelo de chatbot con %d ejemplos", len(preguntas))
-    _MODEL = _build_model(preguntas, _LABELS)
+    clasificador = entrenar_clasificador(preguntas)
+    vocabulario = sorted(clasificador.vocabulario, key=clasificador.vocabulario.get)
+
+    destino.parent.mkdir(parents=True, exist_ok=True)
+    tmp = Path(tempfile.mkdtemp(prefix=f".{huella}-", dir=destino.parent))
+    try:
+        clasificador.guardar(tmp / ARTEFACTO_PESOS)
+        (tmp / ARTEFACTO_VOCABULARIO).write_text(json.dumps(vocabulario, ensure_ascii=False), encoding="utf-8")
+        (tmp / ARTEFACTO_ETIQUETAS).write_text(
+            json.dumps({"huella": huella, "respuestas": list(respuestas)}, ensure_ascii=False),
+            encoding="utf-8",
+        )
+        if destino.exists():
+            shutil.rmtree(destino)
+        os.replace(tmp, destino)
+    except OSError:
+        shutil.rmtree(tmp, ignore_errors=True)
+        if not (destino / ARTEFACTO_ETIQUETAS).exists():
+            raise
+    return destino
 
 
-def _ensure_semantic_space():
-    """Construye la representación semántica usada como respaldo."""
-    global _VOCAB, _IDF, _QUESTION_MATRIX, _QUESTION_NORMS
-    if _QUESTION_MATRIX is not None and _IDF is not None and _QUESTION_NORMS is not None:
-        return
+def _cargar_artefactos(destino: Path):
+    """Reconstruye el clasificador desde los artefactos guardados, sin entrenar."""
+    vocabulario = json.loads((destino / ARTEFACTO_VOCABULARIO).read_text(encoding="utf-8"))
+    etiquetas = json.loads((destino / ARTEFACTO_ETIQUETAS).read_text(encoding="utf-8"))
+    return ClasificadorIntenciones.cargar(destino / ARTEFACTO_PESOS, vocabulario), etiquetas["respuestas"]
 
-    preguntas, _ = _ensure_faq_cache()
-    vocab = {}
-    docs_tokens: List[List[str]] = []
-    for question in preguntas:
-        tokens = _tokenize(question)
-        docs_tokens.append(tokens)
-        for token in tokens:
-            if token not in vocab:
-                vocab[token] = len(vocab)
-
-    if not vocab:
-        _VOCAB = {}
-        _IDF = np.zeros(0)
-        _QUESTION_MATRIX = np.zeros((len(preguntas), 0))
-        _QUESTION_NORMS = np.zeros(len(preguntas))
-        return
 
-    df = np.zeros(len(vocab))
-    for tokens in docs_tokens:
-        seen = set()
-        for token in tokens:
-            idx = vocab[token]
-            if idx not in seen:
-                df[idx] += 1
-                seen.add(idx)
-    N = len(docs_tokens)
-    idf = np.log((N + 1) / (df + 1)) + 1
-
-    matrix = np.zeros((N, len(vocab)))
-    for row, tokens in enumerate(docs_tokens):
-        if not tokens:
-            continue
-        counts = {}
-        for token in tokens:
-            idx = vocab[token]
-            counts[idx] = counts.get(idx, 0) + 1
-        total = sum(counts.values())
-        for idx, count in counts.items():
-            matrix[row, idx] = (count / max(total, 1)) * idf[idx]
+def _ensure_model():
+    """Garantiza que el clasificador de intenciones esté disponible antes de responder.
+
+    Carga los artefactos de la versión vigente de las FAQ; solo entrena (en menos de
+    un segundo) si aún no existen, por ejemplo si cambió el archivo y no se corrió
+    `entrenar_chatbot`.
+    """
+    global _MODEL, _LABELS, _ANSWERS
+    if _MODEL is not None:
+        return
+    destino = directorio_artefactos()
+    if not (destino / ARTEFACTO_ETIQUETAS).exists():
+        logger.warning("No hay artefactos del chatbot para estas FAQ; entrenando en %s", destino)
+        destino = entrenar_artefactos()
+    _MODEL, respuestas = _cargar_artefactos(destino)
+    _ANSWERS = list(respuestas)
+    _LABELS = list(range(len(respuestas)))
 
-    norms = np.linalg.norm(matrix, axis=1)
 
-    _VOCAB = vocab
-    _IDF = idf
-    _QUESTION_MATRIX = matrix
-    _QUESTION_NORMS = norms
+def _ensure_semantic_space() -> EspacioSemantico:
+    """Construye una sola vez el espacio TF-IDF disperso usado como respaldo."""
+    global _SEMANTIC
+    if _SEMANTIC is None:
+        preguntas, _ = _ensure_faq_cache()
+        _SEMANTIC = EspacioSemantico.construir([_tokenize(question) for question in preguntas])
+    return _SEMANTIC
 
 
-def _vectorize_text(text: str) -> np.ndarray | None:
-    """Transforma una pregunta en un vector TF-IDF alineado al vocabulario."""
-    if not _VOCAB or _IDF is None:
-        return None
-    tokens = _tokenize(text)
-    counts = {}
-    for token in tokens:
-        idx = _VOCAB.get(token)
-        if idx is None:
-            continue
-        counts[idx] = counts.get(idx, 0) + 1
-    if not counts:
-        return None
-    total = sum(counts.values())
-    vec = np.zeros(len(_VOCAB))
-    for idx, count in counts.items():
-        vec[idx] = (count / max(total, 1)) * _IDF[idx]
-    return vec
+def _semantic_from_scores(sims: np.ndarray) -> dict:
+    """Elige la FAQ más similar a partir de las similitudes coseno ya calculadas."""
+    if not sims.size:
+        return {"answer": DEFAULT_UNKNOWN_RESPONSE, "confidence": 0.0, "source": "semantic"}
+    best_idx = int(np.argmax(sims))
+    best_score = float(sims[best_idx])
+    if best_score < 0.25:
+        return {"answer": DEFAULT_UNKNOWN_RESPONSE, "confidence": best_score, "source": "semantic"}
+    _, respuestas = _ensure_faq_cache()
+    return {"answer": _compose_response(respuestas[best_idx]), "confidence": best_score, "source": "semantic"}
 
 
 def _semantic_match(pregunta: str) -> dict:
     """Busca la respuesta más similar mediante coincidencia semántica."""
     try:
-        _ensure_semantic_space()
-        preguntas, respuestas = _ensure_faq_cache()
+        espacio = _ensure_semantic_space()
     except Exception as exc:
         logger.exception("Error al preparar el espacio semántico: %s", exc)
         return {
             "answer": "Por ahora no puedo acceder a las preguntas frecuentes. Escríbenos y te ayudaremos manualmente.",
             "confidence": 0.0,
+            "source": "semantic",
         }
-
-    if _QUESTION_MATRIX is None or _QUESTION_MATRIX.size == 0:
-        return {"answer": DEFAULT_UNKNOWN_RESPONSE, "confidence": 0.0}
-
-    vec = _vectorize_text(pregunta)
-    if vec is None or vec.size == 0:
-        return {"answer": DEFAULT_UNKNOWN_RESPONSE, "confidence": 0.0}
-
-    vec_norm = np.linalg.norm(vec)
-    if vec_norm == 0:
-        return {"answer": DEFAULT_UNKNOWN_RESPONSE, "confidence": 0.0}
-
-    sims = _QUESTION_MATRIX @ vec
-    norms = _QUESTION_NORMS * vec_norm
-    with np.errstate(divide="ignore", invalid="ignore"):
-        sims = np.divide(sims, norms, out=np.zeros_like(sims), where=norms != 0)
-
-    best_idx = int(np.argmax(sims))
-    best_score = float(sims[best_idx]) if sims.size else 0.0
-    if best_score < 0.25:
-        return {"answer": DEFAULT_UNKNOWN_RESPONSE, "confidence": best_score}
-    answer = _compose_response(respuestas[best_idx])
-    return {"answer": answer, "confidence": best_score}
+    return _semantic_from_scores(espacio.similitudes(_tokenize(pregunta)))
 
 
 def _fallback_answer(pregunta: str, *, user_role: str | None = None) -> dict:
@@ -710,57 +671,81 @@ def _fallback_answer(pregunta: str, *, user_role: str | None = None) -> dict:
                 "Estoy aquí para ayudarte con EpicAnimes.",
             ),
             "confidence": 0.0,
+            "source": "special",
         }
     tokens = _tokenize(question)
     special = _special_response(question, user_role=user_role)
     if special:
-        return {"answer": special, "confidence": 0.0}
+        return {"answer": special, "confidence": 0.0, "source": "special"}
     product = _product_answer(question, tokens)
     if product:
         return product
     role_answer = _match_rule(question, tokens, user_role, _ROLE_DIALOG_RULES)
     if role_answer:
-        return {"answer": role_answer, "confidence": 0.35}
+        return {"answer": role_answer, "confidence": 0.35, "source": "rule"}
     faq_answer = _match_rule(question, tokens, user_role, _FAQ_RULES)
     if faq_answer:
-        return {"answer": faq_answer, "confidence": 0.4}
+        return {"answer": faq_answer, "confidence": 0.4, "source": "rule"}
     if not _question_relates_to_faq(tokens):
-        return {"answer": DEFAULT_UNKNOWN_RESPONSE, "confidence": 0.0}
+        return {"answer": DEFAULT_UNKNOWN_RESPONSE, "confidence": 0.0, "source": "unknown"}
     semantic = _semantic_match(question)
     return semantic
 
 
-def responder(pregunta: str, user_role: str | None = None) -> dict:
-    """Atiende una consulta usando el modelo neuronal y el respaldo semántico."""
-    pregunta = (pregunta or "").strip()
+def _direct_answer(pregunta: str, tokens: List[str], user_role: str | None) -> dict | None:
+    """Resuelve saludos, reglas especiales, productos y preguntas ajenas a las FAQ."""
     if not pregunta:
-        return {"answer": "¿Podrías formular tu pregunta? Estoy aquí para ayudarte.", "confidence": 0.0}
-    tokens = _tokenize(pregunta)
+        return {"answer": "¿Podrías formular tu pregunta? Estoy aquí para ayudarte.", "confidence": 0.0, "source": "special"}
     special = _special_response(pregunta, user_role=user_role)
     if special:
-        return {"answer": special, "confidence": 0.0}
+        return {"answer": special, "confidence": 0.0, "source": "special"}
     product = _product_answer(pregunta, tokens)
     if product:
         return product
     if not _question_relates_to_faq(tokens):
-        return {"answer": DEFAULT_UNKNOWN_RESPONSE, "confidence": 0.0}
-    try:
-        _ensure_model()
-        if tf is None:
-            raise RuntimeError("TensorFlow no disponible")
-        input_tensor = tf.convert_to_tensor([pregunta])
-        pred = _MODEL.predict(input_tensor, verbose=0)[0]
-        idx = int(np.argmax(pred))
-        confianza = float(pred[idx])
-        semantic = _semantic_match(pregunta)
-        if confianza < 0.55 or semantic["confidence"] >= confianza:
-            return semantic
-        if semantic["answer"] == DEFAULT_UNKNOWN_RESPONSE and confianza < 0.75:
-            return semantic
-        return {"answer": _compose_response(_ANSWERS[idx]), "confidence": confianza}
-    except RuntimeError as exc:
-        logger.warning("TensorFlow no disponible, usando fallback: %s", exc)
-        return _fallback_answer(pregunta, user_role=user_role)
-    except Exception:
-        logger.exception("Error al generar respuesta del chatbot")
-        return _fallback_answer(pregunta, user_role=user_role)
+        return {"answer": DEFAULT_UNKNOWN_RESPONSE, "confidence": 0.0, "source": "unknown"}
+    return None
+
+
+def _choose_answer(tokens: List[str], semantic: dict) -> dict:
+    """Combina la intención del clasificador con la coincidencia semántica."""
+    idx, confianza = _MODEL.predecir(tokens)
+    if confianza < 0.55 or semantic["confidence"] >= confianza:
+        return semantic
+    if semantic["answer"] == DEFAULT_UNKNOWN_RESPONSE and confianza < 0.75:
+        return semantic
+    return {"answer": _compose_response(_ANSWERS[idx]), "confidence": confianza, "source": "model"}
+
+
+def responder_many(preguntas: Iterable[str], user_role: str | None = None) -> List[dict]:
+    """Responde varias preguntas de una vez (evaluaciones y pruebas de carga).
+
+    Las similitudes semánticas de todas las preguntas que llegan a las FAQ se calculan
+    en un solo producto disperso; el resultado coincide con llamar a `responder` una a una.
+    """
+    resultados: List[dict | None] = []
+    pendientes = []
+    for pregunta in preguntas:
+        pregunta = (pregunta or "").strip()
+        tokens = _tokenize(pregunta)
+        directa = _direct_answer(pregunta, tokens, user_role)
+        if directa is None:
+            pendientes.append((len(resultados), pregunta, tokens))
+        resultados.append(directa)
+    if pendientes:
+        try:
+            _ensure_model()
+            sims = _ensure_semantic_space().similitudes_lote([tokens for _, _, tokens in pendientes])
+            for (pos, _, tokens), fila in zip(pendientes, sims):
+                resultados[pos] = _choose_answer(tokens, _semantic_from_scores(fila))
+        except Exception:
+            logger.exception("Error al generar respuesta del chatbot")
+            for pos, pregunta, _ in pendientes:
+                if resultados[pos] is None:
+                    resultados[pos] = _fallback_answer(pregunta, user_role=user_role)
+    return resultados
+
+
+def responder(pregunta: str, user_role: str | None = None) -> dict:
+    """Atiende una consulta usando el clasificador de intenciones y el respaldo semántico."""
+    return responder_many([pregunta], user_role)[0]
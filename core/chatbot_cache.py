@@ -0,0 +1,115 @@
+"""Caché de respuestas y límite de consultas del endpoint del chatbot.
+
+Expone:
+- responder_con_cache: devuelve la respuesta guardada para la misma pregunta
+  normalizada y rol, o la calcula con `chatbot.responder` y la guarda.
+- consumir_consulta: cubeta de fichas por usuario (o IP si es anónimo) que acota
+  cuántas preguntas puede hacer un cliente.
+- identidad_cliente: usuario o IP del cliente; X-Forwarded-For solo se cree cuando la
+  solicitud llega desde una red de settings.PROXIES_CONFIABLES.
+
+La clave de la caché incluye la huella del archivo de FAQ: al cambiar las FAQ las
+respuestas anteriores dejan de usarse sin recorrer la caché. Las respuestas sobre
+productos (source "product") se guardan con la versión del catálogo publicada por
+core.chatbot_productos y se recalculan cuando cambia; las de FAQ, reglas o saludos no
+dependen del catálogo y siguen vigentes aunque cada venta cambie el stock. Que un
+producto nuevo pase a responder una pregunta que antes contestaban las FAQ, igual que
+los cambios hechos con QuerySet.update(), queda acotado por RESPUESTAS_TTL.
+"""
+
+import hashlib
+import ipaddress
+import math
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+from . import chatbot, chatbot_productos
+
+RESPUESTAS_TTL = 300
+LIMITE_CAPACIDAD = 10
+LIMITE_RECARGA_SEGUNDOS = 3.0
+
+_HUELLA_FAQ: str | None = None
+
+
+def _huella_faq() -> str:
+    # Las FAQ se cargan una vez por proceso (ver chatbot._ensure_faq_cache); la huella también.
+    global _HUELLA_FAQ
+    if _HUELLA_FAQ is None:
+        _HUELLA_FAQ = chatbot.huella_faq()
+    return _HUELLA_FAQ
+
+
+def clave_respuesta(pregunta: str, rol: str | None) -> str:
+    normalizada = chatbot._normalize_text(pregunta)
+    resumen = hashlib.sha256(normalizada.encode("utf-8")).hexdigest()[:32]
+    return f"chatbot:respuesta:{_huella_faq()}:{rol or 'anonimo'}:{resumen}"
+
+
+def responder_con_cache(pregunta: str, rol: str | None) -> dict:
+    """Igual que chatbot.responder, pero reutiliza respuestas recientes a la misma pregunta."""
+    clave = clave_respuesta(pregunta, rol)
+    version = cache.get(chatbot_productos.CACHE_VERSION_KEY) or "0"
+    guardado = cache.get(clave)
+    if guardado is not None:
+        resultado, catalogo = guardado
+        if catalogo is None or catalogo == version:
+            return resultado
+    resultado = chatbot.responder(pregunta, rol)
+    catalogo = version if resultado.get("source") == "product" else None
+    cache.set(clave, (resultado, catalogo), getattr(settings, "CHATBOT_CACHE_TTL", RESPUESTAS_TTL))
+    return resultado
+
+
+def _es_proxy(direccion: str, redes) -> bool:
+    try:
+        ip = ipaddress.ip_address(direccion.strip())
+    except ValueError:
+        return False
+    return any(ip in red for red in redes)
+
+
+def ip_cliente(request) -> str:
+    """REMOTE_ADDR o, si viene de un proxy confiable, la última IP de X-Forwarded-For que no es proxy.
+
+    Se recorre el encabezado de derecha a izquierda: las entradas de la izquierda las
+    escribe el propio cliente y no sirven para identificarlo.
+    """
+    remota = request.META.get("REMOTE_ADDR", "")
+    redes = [ipaddress.ip_network(red, strict=False) for red in getattr(settings, "PROXIES_CONFIABLES", ())]
+    if not redes or not _es_proxy(remota, redes):
+        return remota
+    saltos = [ip.strip() for ip in request.META.get("HTTP_X_FORWARDED_FOR", "").split(",") if ip.strip()]
+    for ip in reversed(saltos):
+        if not _es_proxy(ip, redes):
+            return ip
+    return saltos[0] if saltos else remota
+
+
+def identidad_cliente(request) -> str:
+    """Usuario autenticado o, si es anónimo, su IP (la sesión se puede descartar)."""
+    if request.user.is_authenticated:
+        return f"u:{request.user.pk}"
+    return f"ip:{ip_cliente(request)}"
+
+
+def consumir_consulta(identidad: str) -> float:
+    """Descuenta una ficha de la cubeta del cliente.
+
+    Devuelve 0 si la consulta está permitida o los segundos que faltan para la próxima
+    ficha. La lectura y escritura en caché no son atómicas: dos consultas simultáneas
+    del mismo cliente pueden gastar la misma ficha, lo que basta para acotar abusos.
+    """
+    capacidad = getattr(settings, "CHATBOT_LIMITE_CAPACIDAD", LIMITE_CAPACIDAD)
+    recarga = getattr(settings, "CHATBOT_LIMITE_RECARGA_SEGUNDOS", LIMITE_RECARGA_SEGUNDOS)
+    clave = f"chatbot:limite:{identidad}"
+    ahora = time.time()
+    fichas, instante = cache.get(clave, (capacidad, ahora))
+    fichas = min(capacidad, fichas + (ahora - instante) / recarga)
+    if fichas < 1:
+        return (1 - fichas) * recarga
+    # Pasado el tiempo de recarga completa la cubeta vuelve a estar llena; la entrada puede expirar.
+    cache.set(clave, (fichas - 1, ahora), math.ceil(capacidad * recarga))
+    return 0.0
@@ -0,0 +1,151 @@
+"""Clasificador de intenciones del chatbot implementado solo con NumPy.
+
+Expone:
+- ClasificadorIntenciones: regresión softmax sobre TF-IDF normalizado (L2), con el
+  mismo vocabulario e IDF que core.chatbot_semantica. Se entrena en milisegundos a
+  partir de las FAQ y predice con unas pocas filas de la matriz de pesos.
+- aumentar_ejemplos: genera variantes de cada pregunta para entrenar.
+- conjunto_evaluacion: preguntas etiquetadas (reformulaciones de las FAQ que no están
+  entre los ejemplos de entrenamiento) para medir la precisión del clasificador y de
+  `responder`.
+
+El módulo no depende de Django; recibe preguntas ya tokenizadas.
+"""
+
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+import numpy as np
+
+from .chatbot_semantica import tfidf, vocabulario_idf
+
+EPOCAS = 400
+TASA_APRENDIZAJE = 0.5
+REGULARIZACION = 1e-4
+
+# Palabras de relleno con las que los usuarios suelen rodear una pregunta de las FAQ.
+_PREFIJOS_EVALUACION = ("oye", "consulta")
+_SUFIJOS_EVALUACION = ("por favor", "ahora")
+_VACIAS = {"el", "la", "los", "las", "un", "una", "de", "del", "en", "mi", "tu", "que", "como", "se", "y", "a"}
+
+
+def aumentar_ejemplos(documentos: Sequence[List[str]], etiquetas: Sequence[int]) -> Tuple[List[List[str]], List[int]]:
+    """Agrega, por cada pregunta, las variantes que omiten una palabra."""
+    docs, ys = [], []
+    for tokens, etiqueta in zip(documentos, etiquetas):
+        docs.append(list(tokens))
+        ys.append(etiqueta)
+        if len(tokens) > 2:
+            for i in range(len(tokens)):
+                docs.append(tokens[:i] + tokens[i + 1:])
+                ys.append(etiqueta)
+    return docs, ys
+
+
+def conjunto_evaluacion(documentos: Sequence[List[str]]) -> List[Tuple[List[str], int]]:
+    """Construye reformulaciones etiquetadas de cada pregunta de las FAQ.
+
+    Incluye la versión sin palabras vacías (cuando quita al menos dos) y las versiones
+    con prefijos y sufijos de cortesía. La pregunta original y las que omiten una sola
+    palabra se usan para entrenar (ver aumentar_ejemplos) y quedan fuera.
+    """
+    casos = []
+    for etiqueta, tokens in enumerate(documentos):
+        tokens = list(tokens)
+        sin_vacias = [t for t in tokens if t not in _VACIAS]
+        if sin_vacias and len(sin_vacias) < len(tokens) - 1:
+            casos.append((sin_vacias, etiqueta))
+        for prefijo in _PREFIJOS_EVALUACION:
+            casos.append((prefijo.split() + tokens, etiqueta))
+        for sufijo in _SUFIJOS_EVALUACION:
+            casos.append((tokens + sufijo.split(), etiqueta))
+    return casos
+
+
+@dataclass
+class ClasificadorIntenciones:
+    """Regresión softmax sobre vectores TF-IDF con normalización L2."""
+
+    vocabulario: Dict[str, int]
+    idf: np.ndarray
+    pesos: np.ndarray
+    sesgo: np.ndarray
+
+    @property
+    def total_clases(self) -> int:
+        return int(self.sesgo.shape[0])
+
+    def vector(self, tokens: Iterable[str]) -> Tuple[np.ndarray, np.ndarray]:
+        return tfidf(self.vocabulario, self.idf, list(tokens))
+
+    def probabilidades(self, tokens: Iterable[str]) -> np.ndarray:
+        indices, valores = self.vector(tokens)
+        logits = self.sesgo + valores @ self.pesos[indices]
+        logits = logits - logits.max()
+        exp = np.exp(logits)
+        return exp / exp.sum()
+
+    def predecir(self, tokens: Iterable[str]) -> Tuple[int, float]:
+        """Devuelve (clase, probabilidad) de la intención más probable."""
+        probs = self.probabilidades(tokens)
+        idx = int(np.argmax(probs))
+        return idx, float(probs[idx])
+
+    def precision(self, casos: Sequence[Tuple[List[str], int]]) -> float:
+        if not casos:
+            return 0.0
+        aciertos = sum(1 for tokens, etiqueta in casos if self.predecir(tokens)[0] == etiqueta)
+        return aciertos / len(casos)
+
+    @classmethod
+    def entrenar(
+        cls,
+        documentos: Sequence[List[str]],
+        etiquetas: Sequence[int],
+        *,
+        epocas: int = EPOCAS,
+        tasa: float = TASA_APRENDIZAJE,
+        regularizacion: float = REGULARIZACION,
+        semilla: int = 0,
+    ) -> "ClasificadorIntenciones":
+        """Ajusta el modelo con descenso de gradiente por lotes completos (Adam)."""
+        total_clases = max(etiquetas) + 1
+        vocabulario, idf = vocabulario_idf(documentos)
+        modelo = cls(vocabulario, idf, np.zeros((len(vocabulario), total_clases)), np.zeros(total_clases))
+
+        docs, ys = aumentar_ejemplos(documentos, etiquetas)
+        x = np.zeros((len(docs), len(vocabulario)))
+        for fila, tokens in enumerate(docs):
+            indices, valores = modelo.vector(tokens)
+            x[fila, indices] = valores
+        y = np.zeros((len(docs), total_clases))
+        y[np.arange(len(docs)), ys] = 1.0
+
+        rng = np.random.default_rng(semilla)
+        pesos = rng.normal(0, 0.01, size=modelo.pesos.shape)
+        sesgo = np.zeros(total_clases)
+        parametros = [pesos, sesgo]
+        m = [np.zeros_like(p) for p in parametros]
+        v = [np.zeros_like(p) for p in parametros]
+        beta1, beta2, eps = 0.9, 0.999, 1e-8
+        for paso in range(1, epocas + 1):
+            logits = x @ pesos + sesgo
+            logits -= logits.max(axis=1, keepdims=True)
+            probs = np.exp(logits)
+            probs /= probs.sum(axis=1, keepdims=True)
+            error = (probs - y) / len(docs)
+            gradientes = [x.T @ error + regularizacion * pesos, error.sum(axis=0)]
+            for i, (p, g) in enumerate(zip(parametros, gradientes)):
+                m[i] = beta1 * m[i] + (1 - beta1) * g
+                v[i] = beta2 * v[i] + (1 - beta2) * g * g
+                p -= tasa * (m[i] / (1 - beta1**paso)) / (np.sqrt(v[i] / (1 - beta2**paso)) + eps)
+        modelo.pesos, modelo.sesgo = pesos, sesgo
+        return modelo
+
+    def guardar(self, destino) -> None:
+        np.savez(destino, idf=self.idf, pesos=self.pesos, sesgo=self.sesgo)
+
+    @classmethod
+    def cargar(cls, origen, vocabulario: Sequence[str]) -> "ClasificadorIntenciones":
+        with np.load(origen) as datos:
+            return cls({token: i for i, token in enumerate(vocabulario)}, datos["idf"], datos["pesos"], datos["sesgo"])
@@ -0,0 +1,203 @@
+"""Índice en memoria de productos para las respuestas del chatbot.
+
+Expone:
+- IndiceProductos: índice invertido token normalizado -> ids de producto, con una
+  ficha (nombre, categoría, precio, stock, fecha) por producto.
+- obtener_indice: devuelve el índice del proceso, reconstruyéndolo solo si otro
+  proceso cambió el catálogo o venció INDICE_TTL.
+- conectar_senales: mantiene el índice al día con las señales de Producto y con
+  `catalogo_actualizado` (importaciones masivas).
+
+Cada worker guarda su propio índice; la versión vigente se publica en la caché de
+Django, así que con una caché compartida (Redis, Memcached, base de datos) todos los
+workers ven los cambios de inmediato. Con la caché local por proceso, INDICE_TTL acota
+cuánto puede tardar otro worker en enterarse. Las actualizaciones con
+QuerySet.update() no disparan señales y también quedan cubiertas por el TTL.
+"""
+
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import date
+from decimal import Decimal
+from typing import Dict, Iterable, Optional, Set, Tuple
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+
+from .chatbot import _PRODUCT_STOPWORDS, _tokenize
+from .importers import catalogo_actualizado
+
+CACHE_VERSION_KEY = "chatbot:indice_productos:version"
+INDICE_TTL = 300
+_CAMPOS = ("id", "nombre", "descripcion", "categoria", "precio", "existencias", "fecha_ingreso")
+
+
+@dataclass(frozen=True)
+class FichaProducto:
+    """Datos del producto que el chatbot necesita para responder."""
+
+    id: int
+    nombre: str
+    categoria: str
+    precio: Decimal
+    existencias: Optional[int]
+    fecha_ingreso: Optional[date]
+
+    def orden_recomendacion(self):
+        """Prioriza productos con stock, luego más stock, más recientes y de id mayor."""
+        stock = self.existencias or 0
+        fecha = self.fecha_ingreso.toordinal() if self.fecha_ingreso else 0
+        return (1 if stock > 0 else 0, stock, fecha, self.id)
+
+
+def tokens_producto(nombre, descripcion, categoria) -> Set[str]:
+    texto = " ".join(part for part in (nombre, descripcion, categoria) if part)
+    return {tok for tok in _tokenize(texto) if len(tok) > 2 and tok not in _PRODUCT_STOPWORDS}
+
+
+class IndiceProductos:
+    """Índice invertido de tokens de productos; las búsquedas solo tocan los que coinciden."""
+
+    def __init__(self, version=None):
+        self.version = version
+        self.creado = time.monotonic()
+        self.fichas: Dict[int, FichaProducto] = {}
+        self.por_token: Dict[str, Set[int]] = {}
+        self._tokens: Dict[int, Set[str]] = {}
+        self._recomendado: Optional[FichaProducto] = None
+        self._recomendado_vigente = True
+
+    @classmethod
+    def desde_filas(cls, filas: Iterable[Tuple], version=None) -> "IndiceProductos":
+        indice = cls(version)
+        for pk, nombre, descripcion, categoria, precio, existencias, fecha in filas:
+            indice.agregar(
+                FichaProducto(pk, nombre, categoria, precio, existencias, fecha),
+                tokens_producto(nombre, descripcion, categoria),
+            )
+        return indice
+
+    def __len__(self):
+        return len(self.fichas)
+
+    def agregar(self, ficha: FichaProducto, tokens: Set[str]):
+        self.quitar(ficha.id)
+        self.fichas[ficha.id] = ficha
+        self._tokens[ficha.id] = tokens
+        for token in tokens:
+            self.por_token.setdefault(token, set()).add(ficha.id)
+        actual = self._recomendado
+        if self._recomendado_vigente and (actual is None or ficha.orden_recomendacion() > actual.orden_recomendacion()):
+            self._recomendado = ficha
+
+    def quitar(self, pk: int):
+        if self.fichas.pop(pk, None) is None:
+            return
+        for token in self._tokens.pop(pk, ()):
+            ids = self.por_token.get(token)
+            if ids is not None:
+                ids.discard(pk)
+                if not ids:
+                    del self.por_token[token]
+        if self._recomendado is not None and self._recomendado.id == pk:
+            # El siguiente mejor se calcula recién cuando se pida una recomendación.
+            self._recomendado, self._recomendado_vigente = None, False
+
+    def coincidencias(self, tokens: Set[str]) -> Dict[int, int]:
+        """Cantidad de tokens de la consulta que comparte cada producto que coincide."""
+        conteos: Dict[int, int] = {}
+        for token in tokens:
+            for pk in self.por_token.get(token, ()):
+                conteos[pk] = conteos.get(pk, 0) + 1
+        return conteos
+
+    def recomendado(self) -> Optional[FichaProducto]:
+        if not self._recomendado_vigente:
+            self._recomendado = max(self.fichas.values(), key=FichaProducto.orden_recomendacion, default=None)
+            self._recomendado_vigente = True
+        return self._recomendado
+
+
+_INDICE: Optional[IndiceProductos] = None
+_LOCK = threading.Lock()
+
+
+def _construir(version) -> IndiceProductos:
+    from .models import Producto
+
+    filas = Producto.objects.order_by().values_list(*_CAMPOS)
+    return IndiceProductos.desde_filas(filas.iterator(chunk_size=2000), version)
+
+
+def obtener_indice() -> IndiceProductos:
+    """Índice vigente para este proceso (una lectura de caché por consulta)."""
+    global _INDICE
+    version = cache.get(CACHE_VERSION_KEY)
+    indice = _INDICE
+    if indice is not None and indice.version == version and time.monotonic() - indice.creado < INDICE_TTL:
+        return indice
+    with _LOCK:
+        indice = _INDICE
+        if indice is None or indice.version != version or time.monotonic() - indice.creado >= INDICE_TTL:
+            indice = _INDICE = _construir(version)
+    return indice
+
+
+def invalidar():
+    """Descarta el índice de todos los procesos (se reconstruye en la próxima consulta)."""
+    global _INDICE
+    cache.set(CACHE_VERSION_KEY, uuid.uuid4().hex, None)
+    _INDICE = None
+
+
+def _aplicar(cambio):
+    """Aplica un cambio al índice local y publica la nueva versión para los demás workers.
+
+    Si el índice local ya estaba desactualizado se descarta en vez de parcharlo.
+    """
+    global _INDICE
+    with _LOCK:
+        previa = cache.get(CACHE_VERSION_KEY)
+        version = uuid.uuid4().hex
+        cache.set(CACHE_VERSION_KEY, version, None)
+        indice = _INDICE
+        if indice is None:
+            return
+        if indice.version != previa:
+            _INDICE = None
+            return
+        cambio(indice)
+        indice.version = version
+
+
+def _producto_guardado(sender, instance, **kwargs):
+    ficha = FichaProducto(
+        instance.pk,
+        instance.nombre,
+        instance.categoria,
+        instance.precio,
+        instance.existencias,
+        instance.fecha_ingreso,
+    )
+    tokens = tokens_producto(instance.nombre, instance.descripcion, instance.categoria)
+    transaction.on_commit(lambda: _aplicar(lambda indice: indice.agregar(ficha, tokens)))
+
+
+def _producto_eliminado(sender, instance, **kwargs):
+    pk = instance.pk
+    transaction.on_commit(lambda: _aplicar(lambda indice: indice.quitar(pk)))
+
+
+def _catalogo_actualizado(sender, **kwargs):
+    invalidar()
+
+
+def conectar_senales():
+    from .models import Producto
+
+    post_save.connect(_producto_guardado, sender=Producto, dispatch_uid="chatbot_indice_producto_guardado")
+    post_delete.connect(_producto_eliminado, sender=Producto, dispatch_uid="chatbot_indice_producto_eliminado")
+    catalogo_actualizado.connect(_catalogo_actualizado, dispatch_uid="chatbot_indice_catalogo_actualizado")
@@ -0,0 +1,121 @@
+"""Reglas de palabras clave y frases del chatbot compiladas una sola vez.
+
+Expone:
+- AutomataFrases: autómata Aho–Corasick sobre tokens; encuentra en una pasada todas
+  las frases (secuencias de palabras completas) presentes en una pregunta.
+- ReglasCompiladas: tabla de reglas con el formato de `chatbot._FAQ_RULES`
+  (roles, all, any, phrases) normalizada al cargar e indexada por token y por frase,
+  de modo que solo se verifican las reglas que la pregunta puede activar.
+
+Las frases se comparan por palabras completas: "como va" ya no coincide dentro de
+"como valido" ni "hola" dentro de "holanda". El módulo no depende de Django; recibe
+textos ya tokenizados y normalizados.
+"""
+
+from collections import deque
+from typing import Dict, Hashable, Iterable, List, Optional, Sequence, Set, Tuple
+
+
+class AutomataFrases:
+    """Aho–Corasick cuyo alfabeto son tokens en vez de caracteres."""
+
+    def __init__(self, frases: Iterable[Tuple[Sequence[str], Hashable]]):
+        self._siguiente: List[Dict[str, int]] = [{}]
+        self._salidas: List[Set[Hashable]] = [set()]
+        for tokens, etiqueta in frases:
+            if not tokens:
+                continue
+            estado = 0
+            for token in tokens:
+                destino = self._siguiente[estado].get(token)
+                if destino is None:
+                    destino = len(self._siguiente)
+                    self._siguiente[estado][token] = destino
+                    self._siguiente.append({})
+                    self._salidas.append(set())
+                estado = destino
+            self._salidas[estado].add(etiqueta)
+        self._falla = [0] * len(self._siguiente)
+        cola = deque(self._siguiente[0].values())
+        while cola:
+            estado = cola.popleft()
+            for token, destino in self._siguiente[estado].items():
+                falla = self._falla[estado]
+                while falla and token not in self._siguiente[falla]:
+                    falla = self._falla[falla]
+                self._falla[destino] = self._siguiente[falla].get(token, 0)
+                # Cada estado hereda las frases que terminan en su sufijo más largo.
+                self._salidas[destino] |= self._salidas[self._falla[destino]]
+                cola.append(destino)
+
+    def __len__(self):
+        return len(self._siguiente)
+
+    def buscar(self, tokens: Iterable[str]) -> Set[Hashable]:
+        """Etiquetas de todas las frases que aparecen en los tokens."""
+        encontradas: Set[Hashable] = set()
+        estado = 0
+        for token in tokens:
+            while estado and token not in self._siguiente[estado]:
+                estado = self._falla[estado]
+            estado = self._siguiente[estado].get(token, 0)
+            if self._salidas[estado]:
+                encontradas |= self._salidas[estado]
+        return encontradas
+
+
+class ReglasCompiladas:
+    """Reglas normalizadas e indexadas; `primera` respeta el orden de la tabla original."""
+
+    def __init__(self, reglas: Sequence[dict], tokenizar, normalizar):
+        self._roles: List[Optional[frozenset]] = []
+        self._todas: List[frozenset] = []
+        self._alguna: List[frozenset] = []
+        self._con_frases: List[bool] = []
+        self._siempre: List[int] = []
+        self._por_token: Dict[str, List[int]] = {}
+        frases = []
+        for idx, regla in enumerate(reglas):
+            roles = regla.get("roles")
+            self._roles.append(frozenset(normalizar(r) for r in roles) if roles else None)
+            todas = frozenset(normalizar(t) for t in regla.get("all") or ())
+            alguna = frozenset(normalizar(t) for t in regla.get("any") or ())
+            self._todas.append(todas)
+            self._alguna.append(alguna)
+            self._con_frases.append(bool(regla.get("phrases")))
+            frases.extend((tokenizar(frase), idx) for frase in regla.get("phrases") or ())
+            # Basta indexar una condición necesaria: la frase (vía autómata), un token de
+            # "all" o cada token de "any". Sin condiciones la regla siempre es candidata.
+            if regla.get("phrases"):
+                continue
+            if todas:
+                self._por_token.setdefault(next(iter(todas)), []).append(idx)
+            elif alguna:
+                for token in alguna:
+                    self._por_token.setdefault(token, []).append(idx)
+            else:
+                self._siempre.append(idx)
+        self._automata = AutomataFrases(frases)
+
+    def __len__(self):
+        return len(self._roles)
+
+    def primera(self, tokens: Sequence[str], rol: str) -> Optional[int]:
+        """Índice de la primera regla que cumple la pregunta, o None."""
+        conjunto = set(tokens)
+        con_frase = self._automata.buscar(tokens)
+        candidatas = set(self._siempre) | con_frase
+        for token in conjunto:
+            candidatas.update(self._por_token.get(token, ()))
+        for idx in sorted(candidatas):
+            roles = self._roles[idx]
+            if roles is not None and rol not in roles:
+                continue
+            if not self._todas[idx] <= conjunto:
+                continue
+            if self._alguna[idx] and not (self._alguna[idx] & conjunto):
+                continue
+            if self._con_frases[idx] and idx not in con_frase:
+                continue
+            return idx
+        return None
@@ -0,0 +1,131 @@
+"""Espacio semántico TF-IDF disperso usado como respaldo del chatbot.
+
+Expone:
+- MatrizCSR: matriz dispersa mínima (indptr, indices, data) sobre arreglos NumPy.
+- EspacioSemantico: preguntas de las FAQ como filas TF-IDF normalizadas (L2) una sola
+  vez; la similitud coseno de una consulta es un producto disperso que solo recorre
+  las preguntas que comparten algún token con ella.
+- vocabulario_idf / tfidf: vocabulario, IDF y vectores TF-IDF normalizados, compartidos
+  con el clasificador de core.chatbot_intents.
+
+El módulo no depende de Django; recibe preguntas ya tokenizadas.
+"""
+
+from dataclasses import dataclass
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+
+@dataclass(frozen=True)
+class MatrizCSR:
+    """Matriz dispersa en formato CSR (filas comprimidas)."""
+
+    indptr: np.ndarray
+    indices: np.ndarray
+    data: np.ndarray
+    shape: Tuple[int, int]
+
+    @classmethod
+    def desde_filas(cls, filas: Sequence[Tuple[np.ndarray, np.ndarray]], columnas: int) -> "MatrizCSR":
+        """Arma la matriz a partir de pares (índices, valores) por fila."""
+        largos = np.fromiter((len(indices) for indices, _ in filas), dtype=np.int64, count=len(filas))
+        indptr = np.zeros(len(filas) + 1, dtype=np.int64)
+        np.cumsum(largos, out=indptr[1:])
+        indices = np.concatenate([i for i, _ in filas]) if filas else np.zeros(0, dtype=np.int64)
+        data = np.concatenate([v for _, v in filas]) if filas else np.zeros(0)
+        return cls(indptr, indices.astype(np.int64), data.astype(np.float64), (len(filas), columnas))
+
+    @property
+    def nnz(self) -> int:
+        return int(self.indptr[-1])
+
+    def transpuesta(self) -> "MatrizCSR":
+        """Devuelve la transpuesta también en CSR (equivale a la matriz original en CSC)."""
+        filas = np.repeat(np.arange(self.shape[0]), np.diff(self.indptr))
+        orden = np.argsort(self.indices, kind="stable")
+        conteos = np.bincount(self.indices, minlength=self.shape[1])
+        indptr = np.zeros(self.shape[1] + 1, dtype=np.int64)
+        np.cumsum(conteos, out=indptr[1:])
+        return MatrizCSR(indptr, filas[orden], self.data[orden], (self.shape[1], self.shape[0]))
+
+    def bytes(self) -> int:
+        return self.indptr.nbytes + self.indices.nbytes + self.data.nbytes
+
+
+def _recorridos(indptr: np.ndarray, filas: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Posiciones de los elementos de las filas pedidas y, para cada una, su fila de origen."""
+    inicios = indptr[filas]
+    largos = indptr[filas + 1] - inicios
+    total = int(largos.sum())
+    if not total:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    origen = np.repeat(np.arange(len(filas)), largos)
+    desplazamiento = np.arange(total) - np.repeat(np.cumsum(largos) - largos, largos)
+    return inicios[origen] + desplazamiento, origen
+
+
+def vocabulario_idf(documentos: Sequence[List[str]]) -> Tuple[Dict[str, int], np.ndarray]:
+    """Vocabulario en orden de aparición e IDF suavizado (log((n + 1) / (df + 1)) + 1)."""
+    vocabulario: Dict[str, int] = {}
+    for tokens in documentos:
+        for token in tokens:
+            vocabulario.setdefault(token, len(vocabulario))
+    df = np.zeros(len(vocabulario))
+    for tokens in documentos:
+        for idx in {vocabulario[t] for t in tokens}:
+            df[idx] += 1
+    n = len(documentos)
+    return vocabulario, np.log((n + 1) / (df + 1)) + 1
+
+
+def tfidf(vocabulario: Dict[str, int], idf: np.ndarray, tokens: Sequence[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """Índices y pesos TF-IDF con norma L2 = 1 de los tokens conocidos."""
+    conteos: Dict[int, int] = {}
+    for token in tokens:
+        idx = vocabulario.get(token)
+        if idx is not None:
+            conteos[idx] = conteos.get(idx, 0) + 1
+    if not conteos:
+        return np.zeros(0, dtype=np.int64), np.zeros(0)
+    indices = np.fromiter(conteos.keys(), dtype=np.int64, count=len(conteos))
+    valores = np.fromiter(conteos.values(), dtype=np.float64, count=len(conteos)) * idf[indices]
+    return indices, valores / np.linalg.norm(valores)
+
+
+@dataclass(frozen=True)
+class EspacioSemantico:
+    """Filas TF-IDF normalizadas de las preguntas y su índice invertido por token."""
+
+    vocabulario: Dict[str, int]
+    idf: np.ndarray
+    matriz: MatrizCSR
+    por_token: MatrizCSR
+
+    @property
+    def total_preguntas(self) -> int:
+        return self.matriz.shape[0]
+
+    @classmethod
+    def construir(cls, documentos: Sequence[List[str]]) -> "EspacioSemantico":
+        vocabulario, idf = vocabulario_idf(documentos)
+        matriz = MatrizCSR.desde_filas([tfidf(vocabulario, idf, tokens) for tokens in documentos], len(vocabulario))
+        return cls(vocabulario, idf, matriz, matriz.transpuesta())
+
+    def vector(self, tokens: Sequence[str]) -> Tuple[np.ndarray, np.ndarray]:
+        return tfidf(self.vocabulario, self.idf, tokens)
+
+    def similitudes_lote(self, consultas: Sequence[Sequence[str]]) -> np.ndarray:
+        """Similitud coseno de cada consulta contra cada pregunta: arreglo (consultas, preguntas)."""
+        n = self.total_preguntas
+        vectores = [self.vector(tokens) for tokens in consultas]
+        tokens = np.concatenate([i for i, _ in vectores]) if vectores else np.zeros(0, dtype=np.int64)
+        pesos = np.concatenate([v for _, v in vectores]) if vectores else np.zeros(0)
+        consulta = np.repeat(np.arange(len(vectores)), [len(i) for i, _ in vectores])
+        posiciones, origen = _recorridos(self.por_token.indptr, tokens)
+        celdas = consulta[origen] * n + self.por_token.indices[posiciones]
+        aportes = self.por_token.data[posiciones] * pesos[origen]
+        return np.bincount(celdas, weights=aportes, minlength=len(vectores) * n).reshape(len(vectores), n)
+
+    def similitudes(self, tokens: Sequence[str]) -> np.ndarray:
+        return self.similitudes_lote([tokens])[0]
@@ -0,0 +1,246 @@
+"""Exportación columnar (Parquet / Arrow IPC) de ventas, compras y productos.
+
+Expone:
+- ESQUEMAS: columnas y tipos Arrow de cada modelo exportable.
+- iterar_record_batches: lee la base por lotes y los convierte en RecordBatch.
+- escribir_columnar: escribe Parquet o Arrow IPC comprimidos con zstd.
+- leer_marca_agua: recupera la marca de agua guardada en un archivo previo.
+- export_admin_columnar: endpoint para descargar el archivo desde el panel.
+
+Cada archivo guarda en sus metadatos la fecha y el id máximos exportados, de modo
+que la siguiente exportación incremental solo lee los registros nuevos. La consulta
+se acota a esa marca antes de leer: un registro creado durante la escritura queda
+para la próxima exportación en vez de escribirse sin estar cubierto por la marca.
+Una exportación incremental sin registros nuevos conserva la marca anterior.
+"""
+
+import tempfile
+from dataclasses import dataclass
+from typing import Tuple
+
+from django.contrib.auth.decorators import login_required
+from django.db.models import Max
+from django.http import FileResponse, Http404, HttpResponseBadRequest, HttpResponseForbidden
+from django.views.decorators.http import require_http_methods
+
+from .exports import EXPORT_BATCH_SIZE, XLSX_SPOOL_MAX_BYTES, _parse_fecha, iterar_lotes
+from .models import Compra, Producto, Venta
+
+FORMATOS_COLUMNARES = {
+    "parquet": "application/vnd.apache.parquet",
+    "arrow": "application/vnd.apache.arrow.file",
+}
+COMPRESION = "zstd"
+META_FECHA = b"epicanimes.marca_agua_fecha"
+META_ID = b"epicanimes.marca_agua_id"
+
+
+class ColumnarNoDisponible(RuntimeError):
+    """Se lanza cuando pyarrow no está instalado en el entorno."""
+
+
+def _pyarrow():
+    """Importa pyarrow solo cuando se pide una exportación columnar."""
+    try:
+        import pyarrow as pa
+    except Exception as exc:
+        raise ColumnarNoDisponible("Falta dependencia 'pyarrow'") from exc
+    return pa
+
+
+@dataclass(frozen=True)
+class EsquemaColumnar:
+    """Asocia un modelo con sus columnas (campo ORM, nombre, tipo Arrow) y su campo de fecha."""
+
+    modelo: type
+    campo_fecha: str
+    columnas: Tuple[Tuple[str, str, str], ...]
+
+    def schema(self, metadata=None):
+        pa = _pyarrow()
+        tipos = {
+            "int64": pa.int64(),
+            "int32": pa.int32(),
+            "string": pa.string(),
+            "date": pa.date32(),
+            "decimal": pa.decimal128(12, 2),
+        }
+        return pa.schema([pa.field(nombre, tipos[tipo]) for _, nombre, tipo in self.columnas], metadata=metadata)
+
+
+ESQUEMAS = {
+    "venta": EsquemaColumnar(
+        modelo=Venta,
+        campo_fecha="fecha_venta",
+        columnas=(
+            ("id", "id", "int64"),
+            ("fecha_venta", "fecha_venta", "date"),
+            ("vendedor_id", "vendedor_id", "int64"),
+            ("vendedor__usuario__username", "vendedor", "string"),
+            ("producto_id", "producto_id", "int64"),
+            ("producto__nombre", "producto", "string"),
+            ("producto__categoria", "categoria", "string"),
+            ("cantidad", "cantidad", "int32"),
+            ("total", "total", "decimal"),
+        ),
+    ),
+    "compra": EsquemaColumnar(
+        modelo=Compra,
+        campo_fecha="fecha_compra",
+        columnas=(
+            ("id", "id", "int64"),
+            ("fecha_compra", "fecha_compra", "date"),
+            ("usuario_id", "usuario_id", "int64"),
+            ("producto_id", "producto_id", "int64"),
+            ("producto__nombre", "producto", "string"),
+            ("valor_producto", "valor_producto", "decimal"),
+            ("cantidad", "cantidad", "int32"),
+            ("ciudad_envio", "ciudad_envio", "string"),
+            ("estado_entrega", "estado_entrega", "string"),
+        ),
+    ),
+    "producto": EsquemaColumnar(
+        modelo=Producto,
+        campo_fecha="fecha_ingreso",
+        columnas=(
+            ("id", "id", "int64"),
+            ("fecha_ingreso", "fecha_ingreso", "date"),
+            ("vendedor_id", "vendedor_id", "int64"),
+            ("nombre", "nombre", "string"),
+            ("marca", "marca", "string"),
+            ("categoria", "categoria", "string"),
+            ("calidad", "calidad", "string"),
+            ("precio", "precio", "decimal"),
+            ("existencias", "existencias", "int32"),
+        ),
+    ),
+}
+
+
+def esquema_para(qs):
+    """Devuelve el esquema columnar del modelo del queryset, o None si no tiene."""
+    for esquema in ESQUEMAS.values():
+        if esquema.modelo is qs.model:
+            return esquema
+    return None
+
+
+def filtrar_incremental(esquema, qs, *, desde=None, despues_de_id=None):
+    """Restringe el queryset a los registros posteriores a la marca de agua."""
+    if desde:
+        qs = qs.filter(**{f"{esquema.campo_fecha}__gte": desde})
+    if despues_de_id:
+        qs = qs.filter(id__gt=despues_de_id)
+    return qs
+
+
+def iterar_record_batches(esquema, qs, *, batch_size=EXPORT_BATCH_SIZE):
+    """Convierte cada lote leído de la base en un RecordBatch con el esquema del modelo."""
+    pa = _pyarrow()
+    schema = esquema.schema()
+    campos = tuple(campo for campo, _, _ in esquema.columnas)
+    for lote in iterar_lotes(qs, campos, (esquema.campo_fecha, "id"), batch_size=batch_size):
+        columnas = list(zip(*lote))
+        arrays = [pa.array(valores, type=campo.type) for valores, campo in zip(columnas, schema)]
+        yield pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+
+def escribir_columnar(
+    destino,
+    esquema,
+    qs,
+    formato="parquet",
+    *,
+    batch_size=EXPORT_BATCH_SIZE,
+    marca_previa=(None, None),
+    latido=None,
+):
+    """Escribe el queryset en Parquet o Arrow IPC y devuelve (filas, fecha máx., id máx.).
+
+    `marca_previa` (fecha, id) es la marca de la exportación anterior; se conserva si no
+    hay registros nuevos. `latido`, si se indica, se llama tras escribir cada lote.
+    """
+    pa = _pyarrow()
+    if formato not in FORMATOS_COLUMNARES:
+        raise ValueError(f"Formato columnar no soportado: {formato}")
+    marcas = qs.order_by().aggregate(fecha=Max(esquema.campo_fecha), id=Max("id"))
+    if marcas["id"] is None:
+        marcas["fecha"], marcas["id"] = marca_previa
+        qs = qs.none()
+    else:
+        qs = qs.filter(id__lte=marcas["id"])
+    metadata = {
+        META_FECHA: (marcas["fecha"].isoformat() if marcas["fecha"] else "").encode(),
+        META_ID: str(marcas["id"] or "").encode(),
+    }
+    schema = esquema.schema(metadata)
+    if formato == "parquet":
+        import pyarrow.parquet as pq
+
+        writer = pq.ParquetWriter(destino, schema, compression=COMPRESION)
+    else:
+        writer = pa.ipc.new_file(destino, schema, options=pa.ipc.IpcWriteOptions(compression=COMPRESION))
+    filas = 0
+    try:
+        for batch in iterar_record_batches(esquema, qs, batch_size=batch_size):
+            writer.write_batch(batch)
+            filas += batch.num_rows
+            if latido is not None:
+                latido()
+    finally:
+        writer.close()
+    return filas, marcas["fecha"], marcas["id"]
+
+
+def leer_marca_agua(origen, formato="parquet"):
+    """Lee la marca de agua (fecha, id) guardada por `escribir_columnar`."""
+    pa = _pyarrow()
+    if formato == "parquet":
+        import pyarrow.parquet as pq
+
+        metadata = pq.read_schema(origen).metadata or {}
+    else:
+        with pa.ipc.open_file(origen) as reader:
+            metadata = reader.schema.metadata or {}
+    fecha = _parse_fecha(metadata.get(META_FECHA, b"").decode())
+    raw_id = metadata.get(META_ID, b"").decode()
+    return fecha, int(raw_id) if raw_id else None
+
+
+@login_required
+@require_http_methods(["GET"])
+def export_admin_columnar(request, modelo, formato):
+    """Descarga ventas, compras o productos en Parquet/Arrow para el equipo de BI.
+
+    Acepta `desde` (fecha ISO) y `despues_de_id` para exportaciones incrementales.
+    """
+    if not (request.user.is_staff or request.user.is_superuser):
+        return HttpResponseForbidden("Solo administradores")
+    esquema = ESQUEMAS.get(modelo)
+    if esquema is None or formato not in FORMATOS_COLUMNARES:
+        raise Http404("Exportación no disponible")
+    desde = _parse_fecha(request.GET.get("desde"))
+    if request.GET.get("desde") and desde is None:
+        # Ignorar una fecha imposible exportaría toda la tabla en vez del tramo pedido.
+        return HttpResponseBadRequest("desde inválido (YYYY-MM-DD)")
+    try:
+        despues_de_id = int(request.GET.get("despues_de_id") or 0)
+    except (TypeError, ValueError):
+        return HttpResponseBadRequest("despues_de_id inválido")
+    qs = filtrar_incremental(esquema, esquema.modelo.objects.all(), desde=desde, despues_de_id=despues_de_id)
+    tmp = tempfile.SpooledTemporaryFile(max_size=XLSX_SPOOL_MAX_BYTES)
+    try:
+        escribir_columnar(tmp, esquema, qs, formato, marca_previa=(desde, despues_de_id or None))
+    except ColumnarNoDisponible as exc:
+        tmp.close()
+        return HttpResponseBadRequest(str(exc))
+    except Exception:
+        tmp.close()
+        raise
+    tmp.seek(0)
+    return FileResponse(
+        tmp,
+        as_attachment=True,
+        filename=f"{modelo}s.{formato}",
+        content_type=FORMATOS_COLUMNARES[formato],
+    )
@@ -1,11 +1,10 @@
 """Context processors usados por las vistas públicas para mostrar datos de usuario."""
 
-from .models import PerfilCliente
+from django.utils.functional import SimpleLazyObject
+
+from .perfiles import perfil_de
 
 
 def perfil_cliente(request):
-    """Expone el perfil del usuario en las plantillas."""
-    perfil = None
-    if request.user.is_authenticated:
-        perfil, _ = PerfilCliente.objects.get_or_create(user=request.user)
-    return {"perfil_cliente": perfil}
+    """Expone el perfil del usuario en las plantillas; solo se consulta si la plantilla lo usa."""
+    return {"perfil_cliente": SimpleLazyObject(lambda: perfil_de(request))}
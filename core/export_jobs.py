@@ -0,0 +1,331 @@
+"""Exportaciones en segundo plano (separadas de views.py para claridad).
+
+Expone:
+- encolar_exportacion: crea o reutiliza el trabajo que corresponde a una exportación.
+- procesar_siguiente / procesar_trabajo: usados por el comando `procesar_exportaciones`.
+- api_exportaciones_crear, api_exportacion_estado, descargar_exportacion: endpoints
+  para encolar, consultar el avance y descargar el archivo generado.
+
+Los trabajos se identifican por una huella que combina el dataset, el formato, los
+filtros y un resumen de los datos filtrados; dos pedidos idénticos comparten el mismo
+trabajo y su archivo se reutiliza hasta que los datos cambian.
+"""
+
+import hashlib
+import io
+import json
+import logging
+import tempfile
+import time
+from datetime import timedelta
+
+from django.contrib.auth.decorators import login_required
+from django.core.files import File
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.http import FileResponse, Http404, HttpResponseForbidden, JsonResponse
+from django.urls import reverse
+from django.utils import timezone
+from django.views.decorators.http import require_http_methods
+
+from .columnar import FORMATOS_COLUMNARES, escribir_columnar, esquema_para
+from .exports import DATASETS, escribir_csv, escribir_xlsx
+from .models import TrabajoExportacion, Vendedor
+from .roles import es_vendedor
+
+logger = logging.getLogger(__name__)
+
+FORMATOS = {codigo for codigo, _ in TrabajoExportacion.FORMATO_CHOICES}
+FILTROS_PERMITIDOS = ("from", "to", "start", "end", "days", "q", "estado")
+# Días que se conservan los archivos generados antes de purgarlos.
+RETENCION_DIAS = 7
+# Minutos tras los cuales un trabajo "procesando" se da por abandonado (worker caído) y se retoma.
+ABANDONO_MINUTOS = 30
+# Cada cuántos segundos renueva `iniciado` el worker que escribe, muy por debajo del abandono.
+LATIDO_SEGUNDOS = 60
+
+
+class ExportacionError(Exception):
+    """Error controlado al validar o encolar una exportación."""
+
+
+def _normalizar_filtros(filtros):
+    """Conserva solo los filtros conocidos como cadenas para que la huella sea estable."""
+    filtros = filtros or {}
+    limpios = {}
+    for clave in FILTROS_PERMITIDOS:
+        valor = filtros.get(clave)
+        if valor in (None, ""):
+            continue
+        limpios[clave] = str(valor).strip()
+    return limpios
+
+
+def calcular_huella(tipo, formato, filtros, vendedor=None):
+    """Calcula la huella de un pedido incluyendo la versión actual de los datos."""
+    dataset = DATASETS[tipo]
+    qs = dataset.consulta(filtros, vendedor, max_days=None)
+    payload = json.dumps(
+        {
+            "tipo": tipo,
+            "formato": formato,
+            "filtros": filtros,
+            "vendedor": getattr(vendedor, "pk", None),
+            "version": dataset.version_datos(qs),
+        },
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def encolar_exportacion(usuario, tipo, formato, filtros=None, vendedor=None):
+    """Devuelve el trabajo vigente para el pedido o crea uno nuevo en estado pendiente."""
+    if tipo not in DATASETS:
+        raise ExportacionError("Tipo de exportación desconocido.")
+    if formato not in FORMATOS:
+        raise ExportacionError("Formato de exportación no soportado.")
+    if DATASETS[tipo].por_vendedor and vendedor is None:
+        raise ExportacionError("Perfil vendedor requerido.")
+    if formato in FORMATOS_COLUMNARES and esquema_para(DATASETS[tipo].consulta({}, vendedor)) is None:
+        raise ExportacionError("Este tipo de exportación no está disponible en formato columnar.")
+    filtros = _normalizar_filtros(filtros)
+    huella = calcular_huella(tipo, formato, filtros, vendedor)
+
+    existente = TrabajoExportacion.objects.filter(huella=huella).first()
+    if existente is None:
+        try:
+            with transaction.atomic():
+                return TrabajoExportacion.objects.create(
+                    usuario=usuario,
+                    vendedor=vendedor,
+                    tipo=tipo,
+                    formato=formato,
+                    filtros=filtros,
+                    huella=huella,
+                )
+        except IntegrityError:
+            # Otro proceso registró el mismo pedido en paralelo: se comparte su trabajo.
+            existente = TrabajoExportacion.objects.get(huella=huella)
+
+    archivo_perdido = existente.estado == "listo" and not (
+        existente.archivo and existente.archivo.storage.exists(existente.archivo.name)
+    )
+    if existente.estado == "error" or archivo_perdido:
+        existente.estado = "pendiente"
+        existente.error = ""
+        existente.save(update_fields=["estado", "error"])
+    return existente
+
+
+class _Latido:
+    """Renueva `iniciado` mientras el worker escribe para que nadie dé el trabajo por abandonado."""
+
+    def __init__(self, trabajo):
+        self.trabajo = trabajo
+        self.ultimo = time.monotonic()
+
+    def __call__(self):
+        if time.monotonic() - self.ultimo < LATIDO_SEGUNDOS:
+            return
+        self.ultimo = time.monotonic()
+        ahora = timezone.now()
+        # Si otro worker ya lo retomó, se deja de renovar y el guardado final lo descarta.
+        if _propio(self.trabajo).update(iniciado=ahora):
+            self.trabajo.iniciado = ahora
+
+
+def _propio(trabajo):
+    """El trabajo, mientras siga en manos del worker que lo tomó."""
+    return TrabajoExportacion.objects.filter(pk=trabajo.pk, estado="procesando", iniciado=trabajo.iniciado)
+
+
+def _contar(filas, contador, latido):
+    """Recorre las filas acumulando cuántas se escribieron."""
+    for fila in filas:
+        contador[0] += 1
+        latido()
+        yield fila
+
+
+def procesar_trabajo(trabajo):
+    """Genera el archivo del trabajo y lo guarda en MEDIA_ROOT/exportaciones/."""
+    dataset = DATASETS[trabajo.tipo]
+    qs = dataset.consulta(trabajo.filtros, trabajo.vendedor, max_days=None)
+    contador = [0]
+    latido = _Latido(trabajo)
+    nombre = f"{dataset.archivo}_{trabajo.pk}.{trabajo.formato}"
+    anterior = trabajo.archivo.name if trabajo.archivo else None
+    with tempfile.TemporaryFile() as tmp:
+        if trabajo.formato in FORMATOS_COLUMNARES:
+            contador[0], _, _ = escribir_columnar(tmp, esquema_para(qs), qs, trabajo.formato, latido=latido)
+        elif trabajo.formato == "xlsx":
+            filas = _contar(dataset.filas_xlsx(qs), contador, latido)
+            escribir_xlsx(tmp, dataset.titulo, dataset.encabezados_xlsx, filas)
+        else:
+            texto = io.TextIOWrapper(tmp, encoding="utf-8", newline="")
+            escribir_csv(texto, dataset.encabezados_csv, _contar(dataset.filas_csv(qs), contador, latido))
+            texto.flush()
+            texto.detach()
+        tmp.seek(0)
+        # El almacenamiento elige un nombre libre: no pisa el archivo de otro worker.
+        trabajo.archivo.save(nombre, File(tmp), save=False)
+    finalizado = timezone.now()
+    if not _propio(trabajo).update(
+        archivo=trabajo.archivo.name, filas=contador[0], estado="listo", finalizado=finalizado
+    ):
+        # Se dio por abandonado y otro worker lo retomó: su resultado es el que queda.
+        logger.warning("La exportación %s fue retomada por otro worker; se descarta este archivo", trabajo.pk)
+        trabajo.archivo.delete(save=False)
+        trabajo.refresh_from_db()
+        return trabajo
+    if anterior and anterior != trabajo.archivo.name:
+        trabajo.archivo.storage.delete(anterior)
+    trabajo.filas = contador[0]
+    trabajo.estado = "listo"
+    trabajo.finalizado = finalizado
+    return trabajo
+
+
+def _tomar_pendiente():
+    """Marca como en proceso el trabajo pendiente más antiguo sin bloquear a otros workers.
+
+    Un trabajo que lleva más de ABANDONO_MINUTOS en proceso sin latidos quedó huérfano de un
+    worker interrumpido; generar el archivo de nuevo no tiene efectos secundarios, así que se
+    retoma.
+    """
+    abandono = timezone.now() - timedelta(minutes=ABANDONO_MINUTOS)
+    with transaction.atomic():
+        trabajo = (
+            TrabajoExportacion.objects.select_for_update(skip_locked=True)
+            .filter(Q(estado="pendiente") | Q(estado="procesando", iniciado__lt=abandono))
+            .order_by("creado")
+            .first()
+        )
+        if trabajo is None:
+            return None
+        trabajo.estado = "procesando"
+        trabajo.iniciado = timezone.now()
+        trabajo.save(update_fields=["estado", "iniciado"])
+        return trabajo
+
+
+def procesar_siguiente():
+    """Procesa un trabajo pendiente; devuelve None cuando la cola está vacía."""
+    trabajo = _tomar_pendiente()
+    if trabajo is None:
+        return None
+    try:
+        return procesar_trabajo(trabajo)
+    except Exception as exc:
+        logger.exception("Error al generar la exportación %s", trabajo.pk)
+        trabajo.estado = "error"
+        trabajo.error = str(exc)[:500]
+        trabajo.finalizado = timezone.now()
+        trabajo.save(update_fields=["estado", "error", "finalizado"])
+        return trabajo
+
+
+def purgar_vencidos(dias=RETENCION_DIAS):
+    """Elimina los trabajos finalizados hace más de `dias` junto con sus archivos."""
+    limite = timezone.now() - timedelta(days=dias)
+    eliminados = 0
+    for trabajo in TrabajoExportacion.objects.filter(finalizado__lt=limite).exclude(estado="procesando"):
+        if trabajo.archivo:
+            trabajo.archivo.delete(save=False)
+        trabajo.delete()
+        eliminados += 1
+    return eliminados
+
+
+def _es_admin(user):
+    return user.is_staff or user.is_superuser
+
+
+def _vendedor_de(user):
+    """Obtiene el perfil vendedor del usuario si pertenece al grupo Vendedores."""
+    if not es_vendedor(user):
+        return None
+    return Vendedor.objects.filter(usuario=user).first()
+
+
+def _puede_ver(user, trabajo):
+    if trabajo.vendedor_id:
+        return trabajo.vendedor.usuario_id == user.pk
+    return _es_admin(user)
+
+
+def _serializar(trabajo):
+    data = {
+        "id": trabajo.pk,
+        "tipo": trabajo.tipo,
+        "formato": trabajo.formato,
+        "filtros": trabajo.filtros,
+        "estado": trabajo.estado,
+        "filas": trabajo.filas,
+        "creado": trabajo.creado.isoformat() if trabajo.creado else None,
+        "finalizado": trabajo.finalizado.isoformat() if trabajo.finalizado else None,
+        "estado_url": reverse("api_exportacion_estado", args=[trabajo.pk]),
+        "descarga_url": None,
+    }
+    if trabajo.estado == "listo":
+        data["descarga_url"] = reverse("descargar_exportacion", args=[trabajo.pk])
+    if trabajo.estado == "error":
+        data["error"] = trabajo.error
+    return data
+
+
+@login_required
+@require_http_methods(["POST"])
+def api_exportaciones_crear(request):
+    """Encola una exportación y responde de inmediato con el trabajo asociado."""
+    try:
+        data = json.loads(request.body.decode("utf-8")) if request.body else {}
+    except Exception:
+        data = {}
+    tipo = (data.get("tipo") or "").strip()
+    formato = (data.get("formato") or "csv").strip().lower()
+    dataset = DATASETS.get(tipo)
+    if dataset is None:
+        return JsonResponse({"ok": False, "error": "tipo_invalido"}, status=400)
+
+    vendedor = None
+    if dataset.por_vendedor:
+        vendedor = _vendedor_de(request.user)
+        if vendedor is None:
+            return HttpResponseForbidden("Solo vendedores")
+    elif not _es_admin(request.user):
+        return HttpResponseForbidden("Solo administradores")
+
+    try:
+        trabajo = encolar_exportacion(request.user, tipo, formato, data.get("filtros"), vendedor)
+    except ExportacionError as exc:
+        return JsonResponse({"ok": False, "error": str(exc)}, status=400)
+    status = 200 if trabajo.estado == "listo" else 202
+    return JsonResponse({"ok": True, "trabajo": _serializar(trabajo)}, status=status)
+
+
+@login_required
+@require_http_methods(["GET"])
+def api_exportacion_estado(request, pk):
+    """Informa el estado de un trabajo para que el panel consulte hasta que esté listo."""
+    trabajo = TrabajoExportacion.objects.select_related("vendedor").filter(pk=pk).first()
+    if trabajo is None or not _puede_ver(request.user, trabajo):
+        raise Http404("Exportación no encontrada")
+    return JsonResponse({"ok": True, "trabajo": _serializar(trabajo)})
+
+
+@login_required
+@require_http_methods(["GET"])
+def descargar_exportacion(request, pk):
+    """Entrega el archivo generado solo a quien puede ver el trabajo."""
+    trabajo = TrabajoExportacion.objects.select_related("vendedor").filter(pk=pk).first()
+    if trabajo is None or not _puede_ver(request.user, trabajo):
+        raise Http404("Exportación no encontrada")
+    if trabajo.estado != "listo" or not trabajo.archivo:
+        return JsonResponse({"ok": False, "error": "no_listo", "estado": trabajo.estado}, status=409)
+    dataset = DATASETS[trabajo.tipo]
+    return FileResponse(
+        trabajo.archivo.open("rb"),
+        as_attachment=True,
+        filename=f"{dataset.archivo}.{trabajo.formato}",
+    )
@@ -0,0 +1,403 @@
+"""Utilidades de exportación en streaming (separadas de views.py para claridad).
+
+Expone:
+- filtrar_rango_fechas / filtrar_postulaciones: aplican los filtros GET compartidos.
+- iterar_lotes / iterar_valores: recorren un queryset por lotes de tuplas con
+  paginación por llave.
+- filas_*: generadores de filas listas para escribir en cada exportación.
+- DATASETS: describe cada exportación (consulta, columnas y filas por formato).
+- conectar_senales: renombrar a un vendedor cambia la versión de las ventas exportadas.
+- respuesta_csv: entrega un CSV con StreamingHttpResponse sin acumular filas.
+- escribir_xlsx / respuesta_xlsx: arman un XLSX en modo write-only sobre un archivo
+  temporal y lo envían por bloques con FileResponse.
+"""
+
+import csv
+import tempfile
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Callable, Tuple
+
+from django.db.models import Count, Max, Q, Sum
+from django.db.models.signals import post_save
+from django.http import FileResponse, StreamingHttpResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from .models import Producto, PostulacionVendedor, Vendedor, Venta
+
+EXPORT_BATCH_SIZE = 2000
+EXPORT_MAX_DAYS = 365
+XLSX_CONTENT_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+# Los XLSX pequeños quedan en memoria; los mayores se vuelcan a disco.
+XLSX_SPOOL_MAX_BYTES = 8 * 1024 * 1024
+ESTADOS_POSTULACION = {"nuevo", "contactado", "archivado"}
+
+
+def _parse_fecha(valor):
+    """Interpreta una fecha ISO y devuelve None cuando no es válida."""
+    if not valor:
+        return None
+    try:
+        return parse_date(valor)
+    except (TypeError, ValueError):
+        return None
+
+
+def filtrar_rango_fechas(qs, params, campo, *, alias=True, max_days=EXPORT_MAX_DAYS):
+    """Filtra por `from`/`to` (o `start`/`end`) y, si faltan, por los últimos `days` días."""
+    desde_s = params.get("from") or (params.get("start") if alias else None)
+    hasta_s = params.get("to") or (params.get("end") if alias else None)
+    desde = _parse_fecha(desde_s)
+    hasta = _parse_fecha(hasta_s)
+    if desde:
+        qs = qs.filter(**{f"{campo}__gte": desde})
+    if hasta:
+        qs = qs.filter(**{f"{campo}__lte": hasta})
+    days = params.get("days")
+    if not desde_s and not hasta_s and days:
+        try:
+            n = int(days)
+        except (TypeError, ValueError):
+            return qs
+        if max_days:
+            n = min(max_days, n)
+        n = max(1, n)
+        qs = qs.filter(**{f"{campo}__gte": timezone.localdate() - timedelta(days=n)})
+    return qs
+
+
+def filtrar_postulaciones(qs, params):
+    """Aplica los filtros de texto, estado y rango usados en el panel de postulaciones."""
+    q = (params.get("q") or "").strip().lower()
+    estado = (params.get("estado") or "").strip().lower()
+    if estado in ESTADOS_POSTULACION:
+        qs = qs.filter(estado=estado)
+    if q:
+        qs = qs.filter(Q(nombre__icontains=q) | Q(email__icontains=q) | Q(mensaje__icontains=q))
+    desde = _parse_fecha(params.get("from"))
+    if desde:
+        qs = qs.filter(fecha_envio__date__gte=desde)
+    hasta = _parse_fecha(params.get("to"))
+    if hasta:
+        qs = qs.filter(fecha_envio__date__lte=hasta)
+    return qs
+
+
+def _despues_de(orden, ultimos):
+    """Construye la condición que ubica las filas posteriores a la última llave leída."""
+    condicion = Q()
+    for i, campo in enumerate(orden):
+        lookup = "lt" if campo.startswith("-") else "gt"
+        paso = Q(**{f"{campo.lstrip('-')}__{lookup}": ultimos[i]})
+        for previo, valor in zip(orden[:i], ultimos[:i]):
+            paso &= Q(**{previo.lstrip("-"): valor})
+        condicion |= paso
+    return condicion
+
+
+def iterar_lotes(qs, campos, orden, *, batch_size=EXPORT_BATCH_SIZE):
+    """Entrega listas de tuplas de `campos` leyendo el queryset por lotes acotados.
+
+    Usa paginación por llave sobre `orden` (que debe terminar en un campo único,
+    normalmente `id`), de modo que cada consulta trae a lo sumo `batch_size` filas
+    sin depender de cursores del servidor, que el backend MySQL no ofrece.
+    """
+    campos = tuple(campos)
+    orden = tuple(orden)
+    llaves = tuple(campo.lstrip("-") for campo in orden)
+    base = qs.order_by(*orden).values_list(*(campos + llaves))
+    ancho = len(campos)
+    lote = list(base[:batch_size])
+    while lote:
+        yield [fila[:ancho] for fila in lote]
+        if len(lote) < batch_size:
+            return
+        ultimos = lote[-1][ancho:]
+        lote = list(base.filter(_despues_de(orden, ultimos))[:batch_size])
+
+
+def iterar_valores(qs, campos, orden, *, batch_size=EXPORT_BATCH_SIZE):
+    """Versión fila a fila de `iterar_lotes`."""
+    for lote in iterar_lotes(qs, campos, orden, batch_size=batch_size):
+        yield from lote
+
+
+def _texto_plano(valor):
+    """Aplana saltos de línea para que cada registro quede en una fila del CSV."""
+    return (valor or "").replace("\n", " ").strip()
+
+
+def filas_ventas_admin(qs):
+    """Filas de ventas globales: fecha, vendedor, producto, cantidad y total."""
+    valores = iterar_valores(
+        qs,
+        ("fecha_venta", "vendedor__usuario__username", "producto__nombre", "cantidad", "total"),
+        ("fecha_venta", "vendedor_id", "id"),
+    )
+    for fecha, vendedor, producto, cantidad, total in valores:
+        yield [fecha.isoformat(), vendedor or "", producto, cantidad, total]
+
+
+def filas_ventas_vendedor(qs):
+    """Filas de ventas de un vendedor: fecha, producto, cantidad y total."""
+    valores = iterar_valores(
+        qs,
+        ("fecha_venta", "producto__nombre", "cantidad", "total"),
+        ("fecha_venta", "id"),
+    )
+    for fecha, producto, cantidad, total in valores:
+        yield [fecha.isoformat(), producto, cantidad, total]
+
+
+def filas_inventario(qs):
+    """Filas del CSV de inventario con los datos editables de cada producto."""
+    valores = iterar_valores(
+        qs,
+        ("nombre", "marca", "calidad", "categoria", "precio", "existencias", "fecha_ingreso", "descripcion"),
+        ("nombre", "id"),
+    )
+    for nombre, marca, calidad, categoria, precio, existencias, fecha, descripcion in valores:
+        yield [
+            nombre,
+            marca,
+            calidad,
+            categoria,
+            f"{precio}",
+            int(existencias or 0),
+            fecha.isoformat() if fecha else "",
+            (descripcion or "").replace("\n", " "),
+        ]
+
+
+def filas_postulaciones(qs):
+    """Filas del CSV de postulaciones con mensajes y notas en una sola línea."""
+    valores = iterar_valores(
+        qs,
+        ("id", "nombre", "email", "telefono", "tienda", "instagram", "mensaje", "notas", "fecha_envio", "estado"),
+        ("-fecha_envio", "-id"),
+    )
+    for pk, nombre, email, telefono, tienda, instagram, mensaje, notas, fecha, estado in valores:
+        yield [
+            pk,
+            nombre,
+            email,
+            telefono or "",
+            tienda or "",
+            instagram or "",
+            _texto_plano(mensaje),
+            _texto_plano(notas),
+            fecha.isoformat(sep=" "),
+            estado,
+        ]
+
+
+def filas_inventario_xlsx(qs):
+    """Filas del XLSX de inventario; conserva la descripción completa."""
+    valores = iterar_valores(
+        qs,
+        ("nombre", "marca", "calidad", "categoria", "precio", "existencias", "fecha_ingreso", "descripcion"),
+        ("nombre", "id"),
+    )
+    for nombre, marca, calidad, categoria, precio, existencias, fecha, descripcion in valores:
+        yield [
+            nombre,
+            marca,
+            calidad,
+            categoria,
+            precio,
+            int(existencias or 0),
+            fecha.isoformat() if fecha else "",
+            descripcion or "",
+        ]
+
+
+def filas_postulaciones_xlsx(qs):
+    """Filas del XLSX de postulaciones con mensajes y notas recortados a 500 caracteres."""
+    valores = iterar_valores(
+        qs,
+        ("id", "nombre", "email", "telefono", "tienda", "instagram", "mensaje", "fecha_envio", "estado", "notas"),
+        ("-fecha_envio", "-id"),
+    )
+    for pk, nombre, email, telefono, tienda, instagram, mensaje, fecha, estado, notas in valores:
+        yield [
+            pk,
+            nombre,
+            email,
+            telefono or "",
+            tienda or "",
+            instagram or "",
+            (mensaje or "")[:500],
+            fecha.isoformat(sep=" "),
+            estado,
+            (notas or "")[:500],
+        ]
+
+
+@dataclass(frozen=True)
+class DatasetExportacion:
+    """Describe una exportación: origen de datos, columnas y generadores por formato."""
+
+    archivo: str
+    titulo: str
+    encabezados_csv: Tuple[str, ...]
+    encabezados_xlsx: Tuple[str, ...]
+    filas_csv: Callable
+    filas_xlsx: Callable
+    consultar: Callable
+    sumas_version: Tuple[str, ...] = ()
+    maximos_version: Tuple[str, ...] = ()
+    por_vendedor: bool = False
+
+    def consulta(self, params, vendedor=None, *, max_days=EXPORT_MAX_DAYS):
+        """Aplica los filtros recibidos sobre el queryset del dataset."""
+        return self.consultar(params or {}, vendedor, max_days)
+
+    def version_datos(self, qs):
+        """Resume el contenido filtrado para detectar cambios sin recorrer las filas."""
+        agregados = {"n": Count("id"), "max_id": Max("id")}
+        for campo in self.sumas_version:
+            agregados[f"suma_{campo}"] = Sum(campo)
+        for campo in self.maximos_version:
+            agregados[f"max_{campo}"] = Max(campo)
+        resumen = qs.order_by().aggregate(**agregados)
+        return "|".join(f"{clave}={resumen[clave]}" for clave in sorted(resumen))
+
+
+def _consultar_ventas_admin(params, vendedor, max_days):
+    return filtrar_rango_fechas(Venta.objects.all(), params, "fecha_venta", max_days=max_days)
+
+
+def _consultar_ventas_vendedor(params, vendedor, max_days):
+    return filtrar_rango_fechas(
+        Venta.objects.filter(vendedor=vendedor), params, "fecha_venta", alias=False, max_days=max_days
+    )
+
+
+def _consultar_inventario(params, vendedor, max_days):
+    return Producto.objects.filter(vendedor=vendedor)
+
+
+def _consultar_postulaciones(params, vendedor, max_days):
+    return filtrar_postulaciones(PostulacionVendedor.objects.all(), params)
+
+
+DATASETS = {
+    "ventas_admin": DatasetExportacion(
+        archivo="ventas",
+        titulo="Ventas",
+        encabezados_csv=("fecha", "vendedor", "producto", "cantidad", "total"),
+        encabezados_xlsx=("Fecha", "Vendedor", "Producto", "Cantidad", "Total"),
+        filas_csv=filas_ventas_admin,
+        filas_xlsx=filas_ventas_admin,
+        consultar=_consultar_ventas_admin,
+        sumas_version=("cantidad", "total"),
+        # Ventas editadas (otro producto u otra fecha) y productos o vendedores renombrados.
+        maximos_version=("actualizado", "producto__actualizado", "vendedor__actualizado"),
+    ),
+    "ventas_vendedor": DatasetExportacion(
+        archivo="ventas_vendedor",
+        titulo="Ventas",
+        encabezados_csv=("fecha", "producto", "cantidad", "total"),
+        encabezados_xlsx=("Fecha", "Producto", "Cantidad", "Total"),
+        filas_csv=filas_ventas_vendedor,
+        filas_xlsx=filas_ventas_vendedor,
+        consultar=_consultar_ventas_vendedor,
+        sumas_version=("cantidad", "total"),
+        maximos_version=("actualizado", "producto__actualizado"),
+        por_vendedor=True,
+    ),
+    "inventario": DatasetExportacion(
+        archivo="inventario",
+        titulo="Inventario",
+        encabezados_csv=("nombre", "marca", "calidad", "categoria", "precio", "existencias", "fecha_ingreso", "descripcion"),
+        encabezados_xlsx=("Nombre", "Marca", "Calidad", "Categoría", "Precio", "Existencias", "Fecha ingreso", "Descripción"),
+        filas_csv=filas_inventario,
+        filas_xlsx=filas_inventario_xlsx,
+        consultar=_consultar_inventario,
+        sumas_version=("existencias", "precio"),
+        # Detecta ediciones que no cambian las sumas (nombre, descripción, precio y stock compensados).
+        maximos_version=("actualizado",),
+        por_vendedor=True,
+    ),
+    "postulaciones": DatasetExportacion(
+        archivo="postulaciones",
+        titulo="Postulaciones",
+        encabezados_csv=("id", "nombre", "email", "telefono", "tienda", "instagram", "mensaje", "notas", "fecha_envio", "estado"),
+        encabezados_xlsx=("ID", "Nombre", "Email", "Teléfono", "Tienda", "Instagram/Web", "Mensaje", "Fecha", "Estado", "Notas"),
+        filas_csv=filas_postulaciones,
+        filas_xlsx=filas_postulaciones_xlsx,
+        consultar=_consultar_postulaciones,
+        # El panel edita estado y notas sin cambiar la cantidad ni el último id.
+        maximos_version=("actualizado",),
+    ),
+}
+
+
+class _Eco:
+    """Pseudo-archivo que devuelve lo escrito para que csv.writer produzca cadenas."""
+
+    def write(self, value):
+        return value
+
+
+def generar_csv(encabezados, filas):
+    """Produce cada línea del CSV a medida que se leen las filas."""
+    writer = csv.writer(_Eco())
+    yield writer.writerow(encabezados)
+    for fila in filas:
+        yield writer.writerow(fila)
+
+
+def escribir_csv(destino, encabezados, filas):
+    """Escribe el CSV completo en un archivo de texto abierto con newline=''."""
+    writer = csv.writer(destino)
+    writer.writerow(encabezados)
+    writer.writerows(filas)
+
+
+def respuesta_csv(nombre_archivo, encabezados, filas):
+    """Devuelve una respuesta CSV en streaming con memoria constante."""
+    resp = StreamingHttpResponse(
+        generar_csv(encabezados, filas),
+        content_type="text/csv; charset=utf-8",
+    )
+    resp["Content-Disposition"] = f'attachment; filename="{nombre_archivo}"'
+    return resp
+
+
+def escribir_xlsx(destino, titulo, encabezados, filas):
+    """Escribe un XLSX en modo write-only: cada fila se vuelca al disco al agregarse."""
+    from openpyxl import Workbook
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet(title=titulo)
+    ws.append(encabezados)
+    for fila in filas:
+        ws.append(fila)
+    wb.save(destino)
+
+
+def respuesta_xlsx(nombre_archivo, titulo, encabezados, filas):
+    """Genera el XLSX en un archivo temporal y lo envía por bloques sin copiarlo a memoria."""
+    tmp = tempfile.SpooledTemporaryFile(max_size=XLSX_SPOOL_MAX_BYTES)
+    try:
+        escribir_xlsx(tmp, titulo, encabezados, filas)
+    except Exception:
+        tmp.close()
+        raise
+    tmp.seek(0)
+    return FileResponse(tmp, as_attachment=True, filename=nombre_archivo, content_type=XLSX_CONTENT_TYPE)
+
+
+def _usuario_guardado(sender, instance, created=False, update_fields=None, **kwargs):
+    # ventas_admin muestra el nombre de usuario del vendedor; el login solo guarda last_login.
+    if created or (update_fields is not None and "username" not in update_fields):
+        return
+    Vendedor.objects.filter(usuario_id=instance.pk).update(actualizado=timezone.now())
+
+
+def conectar_senales():
+    from django.contrib.auth import get_user_model
+
+    post_save.connect(_usuario_guardado, sender=get_user_model(), dispatch_uid="exports_usuario_guardado")
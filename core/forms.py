@@ -4,10 +4,15 @@ from django import forms
 from django.contrib.auth.forms import AuthenticationForm, UserCreationForm
 from django.core.cache import cache
 from django.core.exceptions import ValidationError
+from django.core.files.uploadedfile import UploadedFile
 from django.contrib.auth.models import User
 from django.utils import timezone
+from .imagenes import procesar_imagen
 from .models import PostulacionVendedor, PerfilCliente
 
+PERFIL_FOTO_MAX_MB = 5
+PERFIL_FOTO_MAX_LADO = 4096
+
 
 class LoginForm(AuthenticationForm):
     """Extiende el formulario nativo para personalizar etiquetas y estilos."""
@@ -125,6 +130,16 @@ class PostulacionVendedorForm(forms.ModelForm):
 class PerfilClienteForm(forms.ModelForm):
     """Permite que el usuario mantenga su información de despacho actualizada."""
 
+    # FileField en vez de ImageField: la foto se decodifica una sola vez en clean_foto
+    # (forms.ImageField la abriría con Pillow para validarla y luego otra vez al guardarla).
+    # Usamos FileInput en lugar de ClearableFileInput para evitar el texto "Actualmente"
+    # que rompe el layout personalizado.
+    foto = forms.FileField(
+        label="Fotografía personal",
+        required=False,
+        widget=forms.FileInput(attrs={"class": "form-control-file", "accept": "image/*"}),
+    )
+
     class Meta:
         model = PerfilCliente
         fields = ["nombre", "email", "telefono", "direccion", "ciudad", "codigo_postal", "pais", "foto"]
@@ -136,7 +151,6 @@ class PerfilClienteForm(forms.ModelForm):
             "ciudad": "Ciudad",
             "codigo_postal": "Código postal",
             "pais": "País",
-            "foto": "Fotografía personal",
         }
         widgets = {
             "nombre": forms.TextInput(attrs={"class": "form-control", "placeholder": "Tu nombre"}),
@@ -146,7 +160,12 @@ class PerfilClienteForm(forms.ModelForm):
             "ciudad": forms.TextInput(attrs={"class": "form-control", "placeholder": "Ciudad"}),
             "codigo_postal": forms.TextInput(attrs={"class": "form-control", "placeholder": "Código postal"}),
             "pais": forms.TextInput(attrs={"class": "form-control", "placeholder": "País", "value": "Chile"}),
-            # Usamos FileInput en lugar de ClearableFileInput para evitar
-            # el texto "Actualmente" que rompe el layout personalizado.
-            "foto": forms.FileInput(attrs={"class": "form-control-file", "accept": "image/*"}),
         }
+
+    def clean_foto(self):
+        foto = self.cleaned_data.get("foto")
+        if isinstance(foto, UploadedFile):
+            return procesar_imagen(
+                foto, max_mb=PERFIL_FOTO_MAX_MB, max_ancho=PERFIL_FOTO_MAX_LADO, max_alto=PERFIL_FOTO_MAX_LADO
+            )
+        return foto
@@ -0,0 +1,205 @@
+"""Variantes reducidas (miniaturas WebP) de las imágenes de productos y perfiles.
+
+Expone:
+- VARIANTES: tamaños máximos (ancho, alto) por nombre de variante.
+- generar_variantes: crea con Pillow las variantes WebP de una imagen y las guarda
+  junto al original ("productos/goku.jpg" -> "productos/goku.tarjeta.webp").
+- url_variante: URL de una variante; si todavía no existe devuelve la del original.
+- procesar_imagen: etapa única de subida. Decodifica el archivo una vez con Pillow,
+  valida formato, peso y dimensiones, aplica la orientación EXIF y quita los metadatos.
+  Devuelve una ImagenProcesada que se asigna al campo como cualquier archivo.
+- conectar_senales: genera las variantes al guardar un Producto o PerfilCliente con
+  una imagen nueva (después del commit); si la imagen viene de procesar_imagen se
+  reutiliza la ya decodificada en vez de volver a leer el archivo.
+
+Las imágenes ya subidas se procesan con `manage.py generar_miniaturas`.
+"""
+
+import logging
+import posixpath
+from io import BytesIO
+
+from django.core.exceptions import ValidationError
+from django.core.files.base import ContentFile
+from django.db import transaction
+from django.db.models.signals import post_save, pre_save
+
+logger = logging.getLogger(__name__)
+
+FORMATO = "webp"
+CALIDAD = 80
+VARIANTES = {
+    "avatar": (96, 96),
+    "miniatura": (160, 160),
+    "tarjeta": (480, 480),
+    "detalle": (960, 960),
+}
+# Variantes que se generan para cada campo de imagen (modelo, campo).
+VARIANTES_POR_CAMPO = {
+    ("Producto", "imagen"): ("miniatura", "tarjeta", "detalle"),
+    ("PerfilCliente", "foto"): ("avatar", "miniatura"),
+}
+
+# Formatos aceptados al subir (formato de Pillow -> extensión).
+FORMATOS_SUBIDA = {"JPEG": "jpeg", "PNG": "png", "WEBP": "webp"}
+CALIDAD_JPEG = 90
+
+# Nombres de variantes que ya se vieron en el almacenamiento; evita repetir exists() por imagen.
+_EXISTENTES = set()
+
+
+class ImagenProcesada(ContentFile):
+    """Archivo listo para guardar que conserva la imagen decodificada para generar las variantes."""
+
+    def __init__(self, contenido: bytes, name: str, imagen):
+        super().__init__(contenido, name=name)
+        self.imagen = imagen
+
+
+def procesar_imagen(archivo, *, max_mb: float, max_ancho: int, max_alto: int) -> ImagenProcesada:
+    """Valida y normaliza una imagen subida decodificándola una sola vez.
+
+    El peso y las dimensiones se revisan con la cabecera, antes de decodificar los
+    píxeles. Si la imagen trae metadatos EXIF se vuelve a codificar ya orientada y sin
+    ellos; si no, se guardan los bytes originales tal cual.
+    """
+    from PIL import Image, ImageOps, UnidentifiedImageError
+
+    if getattr(archivo, "size", 0) > int(max_mb * 1024 * 1024):
+        raise ValidationError(f"La imagen es muy pesada. Usa archivos de hasta {max_mb} MB.")
+    ilegible = ValidationError("No pude leer la imagen. Usa formatos JPG o PNG válidos.")
+    archivo.seek(0)
+    original = archivo.read()
+    try:
+        imagen = Image.open(BytesIO(original))
+    except (UnidentifiedImageError, OSError, Image.DecompressionBombError):
+        raise ilegible
+    formato = imagen.format
+    if formato not in FORMATOS_SUBIDA:
+        raise ilegible
+    ancho, alto = imagen.size
+    if ancho > max_ancho or alto > max_alto:
+        raise ValidationError(f"La imagen debe medir como máximo {max_ancho}x{max_alto} px.")
+    try:
+        imagen.load()
+    except (OSError, SyntaxError, ValueError):
+        raise ilegible
+
+    base = posixpath.splitext(posixpath.basename(getattr(archivo, "name", "") or "imagen"))[0]
+    nombre = f"{base}.{FORMATOS_SUBIDA[formato]}"
+    if not imagen.getexif():
+        return ImagenProcesada(original, nombre, imagen)
+    orientada = ImageOps.exif_transpose(imagen)
+    salida = BytesIO()
+    opciones = {"icc_profile": imagen.info.get("icc_profile")}
+    if formato == "JPEG":
+        opciones["quality"] = CALIDAD_JPEG
+        if orientada.mode not in ("RGB", "L", "CMYK"):
+            orientada = orientada.convert("RGB")
+    orientada.save(salida, formato, **opciones)
+    return ImagenProcesada(salida.getvalue(), nombre, orientada)
+
+
+def nombre_variante(nombre: str, variante: str) -> str:
+    base, _ = posixpath.splitext(nombre)
+    return f"{base}.{variante}.{FORMATO}"
+
+
+def _variantes_de(campo):
+    modelo = campo.instance.__class__.__name__
+    return VARIANTES_POR_CAMPO.get((modelo, campo.field.name), ())
+
+
+def generar_variantes(campo, variantes=None, *, forzar=False, imagen=None):
+    """Genera las variantes WebP de un campo de imagen; devuelve los nombres guardados.
+
+    Las variantes ya existentes se omiten salvo que se pida `forzar`. Si se entrega la
+    `imagen` ya decodificada (ver procesar_imagen) no se vuelve a leer el archivo.
+    """
+    from PIL import Image, ImageOps
+
+    if not campo:
+        return []
+    storage = campo.storage
+    variantes = variantes or _variantes_de(campo)
+    pendientes = [v for v in variantes if forzar or not storage.exists(nombre_variante(campo.name, v))]
+    if not pendientes:
+        return []
+    if imagen is None:
+        with storage.open(campo.name, "rb") as original:
+            imagen = Image.open(original)
+            imagen.load()
+        imagen = ImageOps.exif_transpose(imagen)
+    imagen = imagen.convert("RGBA" if imagen.mode in ("RGBA", "LA", "P") else "RGB")
+    guardadas = []
+    for variante in pendientes:
+        copia = imagen.copy()
+        copia.thumbnail(VARIANTES[variante], Image.LANCZOS)
+        salida = BytesIO()
+        copia.save(salida, FORMATO, quality=CALIDAD, method=4)
+        nombre = nombre_variante(campo.name, variante)
+        contenido = ContentFile(salida.getvalue())
+        if hasattr(storage, "guardar_derivado"):
+            guardadas.append(storage.guardar_derivado(nombre, contenido))
+        else:
+            if storage.exists(nombre):
+                storage.delete(nombre)
+            guardadas.append(storage.save(nombre, contenido))
+        _EXISTENTES.add(nombre)
+    return guardadas
+
+
+def url_variante(campo, variante: str, por_defecto: str | None = None) -> str | None:
+    """URL de la variante pedida, la del original si falta la variante, o `por_defecto` sin imagen."""
+    if not campo:
+        return por_defecto
+    nombre = nombre_variante(campo.name, variante)
+    try:
+        if nombre in _EXISTENTES or campo.storage.exists(nombre):
+            _EXISTENTES.add(nombre)
+            return campo.storage.url(nombre)
+        return campo.url
+    except Exception:
+        logger.exception("No se pudo resolver la imagen %s", campo.name)
+        return por_defecto
+
+
+def _generar_despues_del_commit(campo, imagen=None):
+    def _generar():
+        try:
+            generar_variantes(campo, imagen=imagen)
+        except Exception:
+            logger.exception("No se pudieron generar las variantes de %s", campo.name)
+
+    transaction.on_commit(_generar)
+
+
+def _campos_de(sender):
+    return [nombre_campo for modelo, nombre_campo in VARIANTES_POR_CAMPO if sender.__name__ == modelo]
+
+
+def _imagen_por_guardar(sender, instance, **kwargs):
+    # pre_save corre antes de que FileField.pre_save guarde el archivo; después del guardado
+    # el campo solo conserva el nombre, así que aquí se recuerda la imagen ya decodificada.
+    for nombre_campo in _campos_de(sender):
+        valor = instance.__dict__.get(nombre_campo)
+        if not isinstance(valor, ImagenProcesada) and not getattr(valor, "_committed", True):
+            valor = getattr(valor, "_file", None)
+        if isinstance(valor, ImagenProcesada):
+            instance.__dict__.setdefault("_imagenes_decodificadas", {})[nombre_campo] = valor.imagen
+
+
+def _imagen_guardada(sender, instance, **kwargs):
+    decodificadas = instance.__dict__.pop("_imagenes_decodificadas", {})
+    for nombre_campo in _campos_de(sender):
+        campo = getattr(instance, nombre_campo)
+        if campo and nombre_variante(campo.name, _variantes_de(campo)[0]) not in _EXISTENTES:
+            _generar_despues_del_commit(campo, decodificadas.get(nombre_campo))
+
+
+def conectar_senales():
+    from .models import PerfilCliente, Producto
+
+    for modelo in (Producto, PerfilCliente):
+        pre_save.connect(_imagen_por_guardar, sender=modelo, dispatch_uid=f"imagenes_{modelo.__name__}_por_guardar")
+        post_save.connect(_imagen_guardada, sender=modelo, dispatch_uid=f"imagenes_{modelo.__name__}_guardado")
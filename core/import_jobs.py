@@ -0,0 +1,228 @@
+"""Importaciones de productos en segundo plano (separadas de views.py para claridad).
+
+Expone:
+- encolar_importacion: guarda el archivo subido y crea el trabajo pendiente.
+- procesar_siguiente / procesar_trabajo: usados por el comando `procesar_importaciones`.
+- fallar_abandonados: da por fallidos los trabajos que un worker dejó a medias.
+- api_importaciones_crear, api_importacion_estado: endpoints para subir el archivo y
+  consultar el avance (filas leídas, creados, actualizados y errores).
+
+El worker confirma cada lote por separado y actualiza el trabajo tras cada uno, de modo
+que el panel puede mostrar el avance mientras la importación sigue corriendo. En modo
+estricto la importación es una sola transacción y el avance se ve al terminar.
+
+El worker se activa con IMPORTACIONES_EN_SEGUNDO_PLANO = True una vez desplegado
+(`manage.py procesar_importaciones` como proceso aparte). Mientras tanto el trabajo se
+procesa dentro de la misma solicitud y el panel recibe el resultado final, como antes.
+"""
+
+import logging
+import os
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth.decorators import login_required
+from django.db import transaction
+from django.http import Http404, HttpResponseBadRequest, HttpResponseForbidden, JsonResponse
+from django.urls import reverse
+from django.utils import timezone
+from django.views.decorators.http import require_http_methods
+
+from .importers import ExcelInvalido, ImportadorProductos, leer_csv, leer_excel
+from .models import TrabajoImportacion, Vendedor
+from .roles import es_vendedor
+
+logger = logging.getLogger(__name__)
+
+EXTENSIONES = {".csv": "csv", ".xlsx": "xlsx", ".xlsm": "xlsx"}
+# Días que se conservan los archivos subidos y el detalle de errores.
+RETENCION_DIAS = 7
+# Minutos tras los cuales un trabajo "procesando" se da por abandonado (worker caído).
+ABANDONO_MINUTOS = 30
+
+
+def formato_de(nombre):
+    """Deduce el formato por la extensión del archivo; None si no se reconoce."""
+    return EXTENSIONES.get(os.path.splitext(nombre or "")[1].lower())
+
+
+def encolar_importacion(usuario, vendedor, archivo, *, estricto=False, formato=None):
+    """Guarda el archivo subido en MEDIA_ROOT/importaciones/ y crea su trabajo pendiente."""
+    formato = formato or formato_de(archivo.name) or "csv"
+    trabajo = TrabajoImportacion(
+        usuario=usuario,
+        vendedor=vendedor,
+        formato=formato,
+        estricto=estricto,
+        nombre_original=(archivo.name or "")[:255],
+    )
+    trabajo.archivo.save(f"{vendedor.pk}.{formato}", archivo, save=False)
+    trabajo.save()
+    return trabajo
+
+
+def _registrar_avance(trabajo, resultado, **extra):
+    """Copia el resumen parcial del importador al trabajo con un único UPDATE."""
+    campos = {
+        "filas": resultado.filas,
+        "creados": resultado.creados,
+        "actualizados": resultado.actualizados,
+        "sin_cambios": resultado.sin_cambios,
+        "total_errores": resultado.total_errores,
+        "errores": resultado.errores,
+        **extra,
+    }
+    TrabajoImportacion.objects.filter(pk=trabajo.pk).update(**campos)
+    for campo, valor in campos.items():
+        setattr(trabajo, campo, valor)
+
+
+def procesar_trabajo(trabajo):
+    """Lee el archivo del trabajo y hace el upsert por lotes informando el avance."""
+    importador = ImportadorProductos(
+        trabajo.vendedor,
+        estricto=trabajo.estricto,
+        por_lote=True,
+        al_avanzar=lambda resultado: _registrar_avance(trabajo, resultado),
+    )
+    with trabajo.archivo.open("rb") as archivo:
+        filas = leer_excel(archivo) if trabajo.formato == "xlsx" else leer_csv(archivo)
+        resultado = importador.importar_tabla(filas)
+    fallido = trabajo.estricto and resultado.total_errores
+    _registrar_avance(
+        trabajo,
+        resultado,
+        estado="error" if fallido else "listo",
+        error="Importación revertida: el archivo tiene filas con errores." if fallido else "",
+        finalizado=timezone.now(),
+    )
+    return trabajo
+
+
+def _tomar_pendiente():
+    """Marca como en proceso el trabajo pendiente más antiguo sin bloquear a otros workers."""
+    with transaction.atomic():
+        trabajo = (
+            TrabajoImportacion.objects.select_for_update(skip_locked=True)
+            .filter(estado="pendiente")
+            .order_by("creado")
+            .first()
+        )
+        if trabajo is None:
+            return None
+        trabajo.estado = "procesando"
+        trabajo.iniciado = timezone.now()
+        trabajo.save(update_fields=["estado", "iniciado"])
+        return trabajo
+
+
+def fallar_abandonados(minutos=ABANDONO_MINUTOS):
+    """Marca con error los trabajos que llevan más de `minutos` en proceso.
+
+    No se reintentan: los lotes ya confirmados quedaron aplicados y repetir el archivo
+    informaría otros totales. El vendedor ve el error y puede volver a subirlo.
+    """
+    limite = timezone.now() - timedelta(minutes=minutos)
+    return TrabajoImportacion.objects.filter(estado="procesando", iniciado__lt=limite).update(
+        estado="error",
+        error="La importación se interrumpió; revisa los productos y vuelve a subir el archivo.",
+        finalizado=timezone.now(),
+    )
+
+
+def procesar_siguiente():
+    """Procesa un trabajo pendiente; devuelve None cuando la cola está vacía."""
+    fallar_abandonados()
+    trabajo = _tomar_pendiente()
+    if trabajo is None:
+        return None
+    return _ejecutar(trabajo)
+
+
+def _ejecutar(trabajo):
+    """Procesa un trabajo ya marcado como en proceso y registra el error si falla."""
+    try:
+        return procesar_trabajo(trabajo)
+    except Exception as exc:
+        if not isinstance(exc, ExcelInvalido):
+            logger.exception("Error al procesar la importación %s", trabajo.pk)
+        trabajo.estado = "error"
+        trabajo.error = str(exc)[:500]
+        trabajo.finalizado = timezone.now()
+        trabajo.save(update_fields=["estado", "error", "finalizado"])
+        return trabajo
+
+
+def purgar_vencidos(dias=RETENCION_DIAS):
+    """Elimina los trabajos finalizados hace más de `dias` junto con sus archivos."""
+    limite = timezone.now() - timedelta(days=dias)
+    eliminados = 0
+    for trabajo in TrabajoImportacion.objects.filter(finalizado__lt=limite).exclude(estado="procesando"):
+        if trabajo.archivo:
+            trabajo.archivo.delete(save=False)
+        trabajo.delete()
+        eliminados += 1
+    return eliminados
+
+
+def _vendedor_de(user):
+    """Obtiene el perfil vendedor del usuario si pertenece al grupo Vendedores."""
+    if not es_vendedor(user):
+        return None
+    return Vendedor.objects.filter(usuario=user).first()
+
+
+def _serializar(trabajo):
+    data = {
+        "id": trabajo.pk,
+        "formato": trabajo.formato,
+        "archivo": trabajo.nombre_original,
+        "estricto": trabajo.estricto,
+        "estado": trabajo.estado,
+        "filas": trabajo.filas,
+        "creados": trabajo.creados,
+        "actualizados": trabajo.actualizados,
+        "sin_cambios": trabajo.sin_cambios,
+        "total_errores": trabajo.total_errores,
+        "errores": trabajo.errores,
+        "creado": trabajo.creado.isoformat() if trabajo.creado else None,
+        "finalizado": trabajo.finalizado.isoformat() if trabajo.finalizado else None,
+        "estado_url": reverse("api_importacion_estado", args=[trabajo.pk]),
+    }
+    if trabajo.estado == "error":
+        data["error"] = trabajo.error
+    return data
+
+
+@login_required
+@require_http_methods(["POST"])
+def api_importaciones_crear(request):
+    """Recibe un CSV o Excel de productos, lo encola y responde de inmediato con el trabajo."""
+    vendedor = _vendedor_de(request.user)
+    if vendedor is None:
+        return HttpResponseForbidden("Solo vendedores")
+    archivo = request.FILES.get("file")
+    if not archivo:
+        return HttpResponseBadRequest("Archivo 'file' requerido")
+    formato = formato_de(archivo.name)
+    if formato is None:
+        return JsonResponse({"ok": False, "error": "formato_invalido"}, status=400)
+    estricto = (request.POST.get("estricto") or "").lower() in {"1", "true", "si"}
+    trabajo = encolar_importacion(request.user, vendedor, archivo, estricto=estricto, formato=formato)
+    if not getattr(settings, "IMPORTACIONES_EN_SEGUNDO_PLANO", False):
+        # Sin worker desplegado nadie tomaría el trabajo: se procesa aquí mismo.
+        trabajo.estado = "procesando"
+        trabajo.iniciado = timezone.now()
+        trabajo.save(update_fields=["estado", "iniciado"])
+        return JsonResponse({"ok": True, "trabajo": _serializar(_ejecutar(trabajo))})
+    return JsonResponse({"ok": True, "trabajo": _serializar(trabajo)}, status=202)
+
+
+@login_required
+@require_http_methods(["GET"])
+def api_importacion_estado(request, pk):
+    """Informa el avance de una importación para que el panel consulte hasta que termine."""
+    trabajo = TrabajoImportacion.objects.select_related("vendedor").filter(pk=pk).first()
+    if trabajo is None or trabajo.vendedor.usuario_id != request.user.pk:
+        raise Http404("Importación no encontrada")
+    return JsonResponse({"ok": True, "trabajo": _serializar(trabajo)})
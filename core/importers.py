@@ -0,0 +1,376 @@
+"""Importación masiva de productos para vendedores (separada de views.py para claridad).
+
+Expone:
+- normalizar_encabezado / mapear_encabezados: unifican los nombres de columna de CSV y Excel.
+- leer_csv: recorre un CSV subido sin cargarlo completo en memoria.
+- leer_excel: recorre la hoja activa de un XLSX en modo read-only, fila por fila.
+- ImportadorProductos: valida cada fila y hace upsert por lotes (vendedor + nombre + marca)
+  con bulk_create y UPDATE agrupados dentro de una transacción.
+- catalogo_actualizado: señal enviada una vez por importación (no por fila) para que
+  cachés e índices del catálogo del vendedor se invaliden en bloque.
+"""
+
+import csv
+import io
+import unicodedata
+from contextlib import nullcontext
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from decimal import Decimal, InvalidOperation
+from typing import Callable, Dict, List, Optional
+
+from django.db import transaction
+from django.dispatch import Signal
+from django.db.models.functions import Lower
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from .models import Producto
+
+IMPORT_BATCH_SIZE = 500
+# Se envía con `vendedor` tras confirmar una importación que creó o modificó productos.
+catalogo_actualizado = Signal()
+# Cantidad máxima de errores detallados que se devuelven al cliente.
+MAX_ERRORES_REPORTE = 200
+SNIFF_BYTES = 4096
+
+ALIAS_COLUMNAS = {
+    "nombre": "nombre",
+    "name": "nombre",
+    "producto": "nombre",
+    "marca": "marca",
+    "calidad": "calidad",
+    "categoria": "categoria",
+    "precio": "precio",
+    "existencias": "existencias",
+    "stock": "existencias",
+    "fecha_ingreso": "fecha_ingreso",
+    "fecha": "fecha_ingreso",
+    "descripcion": "descripcion",
+}
+CAMPOS_PRODUCTO = ("nombre", "marca", "calidad", "categoria", "precio", "existencias", "fecha_ingreso", "descripcion")
+CAMPOS_TEXTO = {"nombre": 80, "marca": 60, "calidad": 30, "categoria": 40}
+PRECIO_MAXIMO = Decimal("99999999.99")
+
+
+def normalizar_encabezado(valor):
+    """Convierte un encabezado en minúsculas sin tildes y con guiones bajos."""
+    texto = unicodedata.normalize("NFKD", str(valor or ""))
+    texto = "".join(ch for ch in texto if not unicodedata.combining(ch))
+    return "_".join(texto.strip().lower().split())
+
+
+def mapear_encabezados(encabezados):
+    """Devuelve, por posición, el campo de Producto al que corresponde cada columna."""
+    return [ALIAS_COLUMNAS.get(normalizar_encabezado(h).strip("_")) for h in encabezados]
+
+
+def leer_csv(archivo):
+    """Itera las filas del CSV como listas, detectando el delimitador con una muestra."""
+    muestra = archivo.read(SNIFF_BYTES)
+    archivo.seek(0)
+    try:
+        dialect = csv.Sniffer().sniff(muestra.decode("utf-8", errors="ignore"), delimiters=",;\t")
+    except csv.Error:
+        dialect = csv.excel
+    texto = io.TextIOWrapper(archivo, encoding="utf-8-sig", errors="replace", newline="")
+    try:
+        yield from csv.reader(texto, dialect=dialect)
+    finally:
+        texto.detach()
+
+
+class ExcelInvalido(ValueError):
+    """El archivo subido no es un libro XLSX legible."""
+
+
+def leer_excel(archivo):
+    """Abre el libro en modo read-only y devuelve un iterador perezoso de sus filas.
+
+    Los archivos grandes ya llegan como temporales en disco (TemporaryUploadedFile) y se
+    abren por ruta; openpyxl lee las hojas del zip en streaming sin armar el libro.
+    """
+    try:
+        from openpyxl import load_workbook
+    except Exception as exc:
+        raise ExcelInvalido("Falta dependencia 'openpyxl'") from exc
+    origen = archivo.temporary_file_path() if hasattr(archivo, "temporary_file_path") else archivo
+    try:
+        libro = load_workbook(origen, read_only=True, data_only=True)
+    except Exception as exc:
+        raise ExcelInvalido("No se pudo leer el Excel") from exc
+
+    def _filas():
+        try:
+            yield from libro.active.iter_rows(values_only=True)
+        finally:
+            libro.close()
+
+    return _filas()
+
+
+class FilaInvalida(Exception):
+    """Agrupa los errores de validación de una fila."""
+
+    def __init__(self, errores):
+        super().__init__("; ".join(errores))
+        self.errores = errores
+
+
+def _texto(valor):
+    if valor is None:
+        return ""
+    if isinstance(valor, float) and valor.is_integer():
+        valor = int(valor)
+    return str(valor).strip()
+
+
+def validar_fila(datos):
+    """Convierte los valores crudos de una fila en campos de Producto o lanza FilaInvalida."""
+    errores = []
+    limpio = {}
+    for campo, largo in CAMPOS_TEXTO.items():
+        if campo not in datos:
+            continue
+        valor = _texto(datos[campo])
+        if len(valor) > largo:
+            errores.append(f"{campo}: máximo {largo} caracteres")
+        limpio[campo] = valor
+    if not limpio.get("nombre"):
+        errores.append("nombre: obligatorio")
+
+    crudo = _texto(datos.get("precio")).replace("$", "").replace(" ", "")
+    if crudo:
+        try:
+            precio = Decimal(crudo).quantize(Decimal("0.01"))
+        except (InvalidOperation, ValueError):
+            errores.append(f"precio: '{crudo}' no es un número válido")
+        else:
+            if precio < 0 or precio > PRECIO_MAXIMO:
+                errores.append("precio: fuera de rango")
+            else:
+                limpio["precio"] = precio
+
+    crudo = _texto(datos.get("existencias"))
+    if crudo:
+        try:
+            numero = Decimal(crudo)
+            if numero != numero.to_integral_value():
+                raise InvalidOperation
+        except (InvalidOperation, ValueError):
+            errores.append(f"existencias: '{crudo}' no es un entero válido")
+        else:
+            existencias = int(numero)
+            if existencias < 0:
+                errores.append("existencias: no puede ser negativo")
+            else:
+                limpio["existencias"] = existencias
+
+    if "fecha_ingreso" in datos:
+        crudo = datos["fecha_ingreso"]
+        if isinstance(crudo, datetime):
+            limpio["fecha_ingreso"] = crudo.date()
+        elif isinstance(crudo, date):
+            limpio["fecha_ingreso"] = crudo
+        elif _texto(crudo):
+            try:
+                fecha = parse_date(_texto(crudo))
+            except ValueError:
+                fecha = None
+            if fecha is None:
+                errores.append(f"fecha_ingreso: '{_texto(crudo)}' no es una fecha YYYY-MM-DD")
+            else:
+                limpio["fecha_ingreso"] = fecha
+
+    if "descripcion" in datos:
+        limpio["descripcion"] = _texto(datos["descripcion"])
+
+    if errores:
+        raise FilaInvalida(errores)
+    return limpio
+
+
+@dataclass
+class ResultadoImportacion:
+    """Resume una importación: filas leídas, productos creados/actualizados y errores."""
+
+    filas: int = 0
+    creados: int = 0
+    actualizados: int = 0
+    sin_cambios: int = 0
+    total_errores: int = 0
+    errores: List[dict] = field(default_factory=list)
+
+    def registrar_error(self, numero, errores):
+        self.total_errores += 1
+        if len(self.errores) < MAX_ERRORES_REPORTE:
+            self.errores.append({"fila": numero, "errores": errores})
+
+    def as_dict(self):
+        return {
+            "filas": self.filas,
+            "creados": self.creados,
+            "actualizados": self.actualizados,
+            "sin_cambios": self.sin_cambios,
+            "total_errores": self.total_errores,
+            "errores": self.errores,
+        }
+
+
+class ImportadorProductos:
+    """Hace upsert por lotes de los productos de un vendedor a partir de filas crudas.
+
+    La llave natural es (nombre, marca) sin distinguir mayúsculas; si una fila repite
+    un producto existente se actualizan solo las columnas presentes en el archivo.
+    Las llaves del catálogo se leen una vez como tuplas, no como instancias.
+    Con `estricto=True` cualquier fila inválida revierte la importación completa; con
+    `por_lote=True` (y sin modo estricto) cada lote se confirma por separado para que
+    el avance reportado en `al_avanzar` sea visible desde otras conexiones.
+    """
+
+    def __init__(
+        self,
+        vendedor,
+        *,
+        batch_size=IMPORT_BATCH_SIZE,
+        estricto=False,
+        por_lote=False,
+        al_avanzar: Optional[Callable] = None,
+    ):
+        self.vendedor = vendedor
+        self.batch_size = batch_size
+        self.estricto = estricto
+        self.por_lote = por_lote and not estricto
+        self.al_avanzar = al_avanzar
+        self.resultado = ResultadoImportacion()
+        self._ids = None
+
+    @staticmethod
+    def _llave(nombre, marca):
+        return (nombre or "").strip().lower(), (marca or "").strip().lower()
+
+    def importar_filas(self, filas, *, primera_fila=2):
+        """Importa filas ya mapeadas a diccionarios {campo: valor}; devuelve el resultado."""
+        with nullcontext() if self.por_lote else transaction.atomic():
+            lote: Dict[tuple, tuple] = {}
+            for numero, datos in enumerate(filas, start=primera_fila):
+                if not any(_texto(v) for v in datos.values()):
+                    continue
+                self.resultado.filas += 1
+                try:
+                    limpio = validar_fila(datos)
+                except FilaInvalida as exc:
+                    self.resultado.registrar_error(numero, exc.errores)
+                    continue
+                lote[self._llave(limpio["nombre"], limpio.get("marca"))] = (numero, limpio)
+                if len(lote) >= self.batch_size:
+                    self._guardar_lote(lote)
+                    lote = {}
+            if lote:
+                self._guardar_lote(lote)
+            if self.estricto and self.resultado.total_errores:
+                transaction.set_rollback(True)
+                self.resultado.creados = self.resultado.actualizados = self.resultado.sin_cambios = 0
+            elif self.resultado.creados or self.resultado.actualizados:
+                transaction.on_commit(
+                    lambda: catalogo_actualizado.send(sender=ImportadorProductos, vendedor=self.vendedor)
+                )
+        return self.resultado
+
+    def importar_tabla(self, filas, **kwargs):
+        """Importa filas posicionales cuya primera fila contiene los encabezados."""
+        filas = iter(filas)
+        encabezados = next(filas, None)
+        if encabezados is None:
+            return self.resultado
+        campos = mapear_encabezados(encabezados)
+
+        def _como_diccionarios():
+            for fila in filas:
+                yield {campo: valor for campo, valor in zip(campos, fila) if campo}
+
+        return self.importar_filas(_como_diccionarios(), **kwargs)
+
+    def _cargar_ids(self):
+        """Lee una sola vez las llaves del catálogo del vendedor (sin instanciar modelos)."""
+        self._ids = {}
+        for pk, nombre, marca in Producto.objects.filter(vendedor=self.vendedor).order_by("id").values_list("id", "nombre", "marca"):
+            self._ids.setdefault(self._llave(nombre, marca), pk)
+
+    def _resolver_pendientes(self, llaves):
+        """Obtiene los ids de productos creados en lotes previos cuando el backend no los devuelve."""
+        nombres = {nombre for nombre, _ in llaves}
+        candidatos = (
+            Producto.objects.filter(vendedor=self.vendedor)
+            .annotate(nombre_llave=Lower("nombre"))
+            .filter(nombre_llave__in=nombres)
+            .values_list("id", "nombre", "marca")
+        )
+        for pk, nombre, marca in candidatos:
+            llave = self._llave(nombre, marca)
+            if self._ids.get(llave, 0) is None:
+                self._ids[llave] = pk
+
+    def _actualizar(self, existentes):
+        """Escribe solo los campos que cambiaron, con un UPDATE por grupo de cambios idénticos.
+
+        bulk_update arma un CASE por fila cuyo costo en Python domina al reimportar;
+        agrupar por cambios resuelve con pocas sentencias el caso típico (solo stock o
+        precio) y las filas sin cambios no se escriben.
+        """
+        grupos = {}
+        for actual in Producto.objects.filter(pk__in=existentes).values("id", *CAMPOS_PRODUCTO):
+            datos = existentes[actual["id"]]
+            cambios = tuple(sorted((campo, valor) for campo, valor in datos.items() if actual[campo] != valor))
+            if cambios:
+                grupos.setdefault(cambios, []).append(actual["id"])
+            else:
+                self.resultado.sin_cambios += 1
+        for cambios, ids in grupos.items():
+            Producto.objects.filter(pk__in=ids).update(actualizado=timezone.now(), **dict(cambios))
+            self.resultado.actualizados += len(ids)
+
+    def _guardar_lote(self, lote):
+        with transaction.atomic():
+            self._escribir_lote(lote)
+        if self.al_avanzar:
+            self.al_avanzar(self.resultado)
+
+    def _escribir_lote(self, lote):
+        if self._ids is None:
+            self._cargar_ids()
+        pendientes = [llave for llave in lote if llave in self._ids and self._ids[llave] is None]
+        if pendientes:
+            self._resolver_pendientes(pendientes)
+
+        nuevos, existentes = [], {}
+        hoy = timezone.localdate()
+        for llave, (numero, datos) in lote.items():
+            pk = self._ids.get(llave)
+            if pk is not None:
+                existentes[pk] = datos
+                continue
+            if "precio" not in datos:
+                self.resultado.registrar_error(numero, ["precio: obligatorio para productos nuevos"])
+                continue
+            nuevos.append(
+                Producto(
+                    vendedor=self.vendedor,
+                    nombre=datos["nombre"],
+                    marca=datos.get("marca", ""),
+                    calidad=datos.get("calidad", ""),
+                    categoria=datos.get("categoria", ""),
+                    precio=datos["precio"],
+                    existencias=datos.get("existencias", 0),
+                    fecha_ingreso=datos.get("fecha_ingreso") or hoy,
+                    descripcion=datos.get("descripcion", ""),
+                )
+            )
+
+        if nuevos:
+            Producto.objects.bulk_create(nuevos, batch_size=self.batch_size)
+            for producto in nuevos:
+                self._ids[self._llave(producto.nombre, producto.marca)] = producto.pk
+        if existentes:
+            self._actualizar(existentes)
+        self.resultado.creados += len(nuevos)
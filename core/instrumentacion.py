@@ -0,0 +1,228 @@
+"""Consultas SQL, tiempo y tamaño de respuesta por vista, en memoria.
+
+Expone:
+- InstrumentacionMiddleware: mide cada solicitud resuelta por el URLconf (cantidad de
+  consultas y su tiempo en todas las bases, tiempo total y bytes de la respuesta) y lo
+  agrega al histograma de su vista ("namespace:nombre" de la URL o la ruta).
+- Histograma: ventana móvil de las últimas VENTANA muestras por métrica, con
+  percentiles, más el total acumulado de solicitudes.
+- resumen / reiniciar: estado actual de todos los histogramas.
+- api_admin_instrumentacion: el resumen en JSON, solo para staff.
+
+Presupuestos: INSTRUMENTACION_PRESUPUESTOS = {"nombre_de_url": máximo de consultas}
+(y opcionalmente INSTRUMENTACION_PRESUPUESTO_DEFECTO para el resto). Una solicitud que
+lo supera deja un warning con la consulta más repetida, la pista habitual de un N+1.
+
+Las respuestas en streaming (CSV, descargas) se miden hasta que el servidor termina de
+enviarlas: las consultas que se hacen al recorrer el iterador, el tiempo total y los
+bytes enviados se registran al cerrarse la respuesta, no al salir de la vista (las
+asíncronas, que este proyecto no usa, se registran al salir de la vista y sin bytes).
+Las FileResponse no se envuelven, para no perder wsgi.file_wrapper (sendfile): sus
+bytes son los de Content-Length.
+
+Los histogramas son de cada proceso: con varios workers cada uno informa lo que atendió.
+INSTRUMENTACION = False desactiva el middleware.
+"""
+
+import logging
+import threading
+import time
+from collections import Counter, deque
+from contextlib import ExitStack
+from functools import partial
+
+from django.conf import settings
+from django.contrib.auth.decorators import login_required
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.http import HttpResponseForbidden, JsonResponse
+from django.views.decorators.http import require_http_methods
+
+logger = logging.getLogger(__name__)
+
+VENTANA = 500
+METRICAS = ("consultas", "db_ms", "total_ms", "bytes")
+PERCENTILES = (50, 95, 99)
+
+_LOCK = threading.Lock()
+_HISTOGRAMAS = {}
+
+
+class Histograma:
+    """Últimas `ventana` muestras de cada métrica de una vista."""
+
+    def __init__(self, ventana=VENTANA):
+        self.solicitudes = 0
+        self.excedidas = 0
+        self.muestras = {metrica: deque(maxlen=ventana) for metrica in METRICAS}
+
+    def agregar(self, valores: dict, excedida=False):
+        self.solicitudes += 1
+        self.excedidas += int(excedida)
+        for metrica in METRICAS:
+            self.muestras[metrica].append(valores[metrica])
+
+    def resumen(self) -> dict:
+        datos = {"solicitudes": self.solicitudes, "presupuesto_excedido": self.excedidas}
+        for metrica, muestras in self.muestras.items():
+            ordenadas = sorted(muestras)
+            if not ordenadas:
+                continue
+            datos[metrica] = {
+                **{f"p{p}": _percentil(ordenadas, p) for p in PERCENTILES},
+                "max": ordenadas[-1],
+                "media": round(sum(ordenadas) / len(ordenadas), 2),
+            }
+        return datos
+
+
+def _percentil(ordenadas, p):
+    # Método del rango más cercano: siempre devuelve una muestra real.
+    indice = max(0, min(len(ordenadas) - 1, -(-len(ordenadas) * p // 100) - 1))
+    return ordenadas[indice]
+
+
+def registrar(vista: str, valores: dict, excedida=False):
+    with _LOCK:
+        histograma = _HISTOGRAMAS.get(vista)
+        if histograma is None:
+            histograma = _HISTOGRAMAS[vista] = Histograma(getattr(settings, "INSTRUMENTACION_VENTANA", VENTANA))
+        histograma.agregar(valores, excedida)
+
+
+def resumen() -> dict:
+    with _LOCK:
+        return {vista: histograma.resumen() for vista, histograma in sorted(_HISTOGRAMAS.items())}
+
+
+def reiniciar():
+    with _LOCK:
+        _HISTOGRAMAS.clear()
+
+
+class _Medidor:
+    """execute_wrapper que cuenta las consultas, su tiempo y cuántas veces se repite cada SQL."""
+
+    def __init__(self):
+        self.consultas = 0
+        self.segundos = 0.0
+        self.repetidas = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        inicio = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.segundos += time.perf_counter() - inicio
+            self.consultas += 1
+            self.repetidas[sql] += 1
+
+
+class _Flujo:
+    """Bytes que el servidor ya pidió de una respuesta en streaming."""
+
+    def __init__(self):
+        self.enviados = 0
+
+    def contar(self, contenido):
+        for fragmento in contenido:
+            self.enviados += len(fragmento)
+            yield fragmento
+
+
+def _nombre_vista(request):
+    coincidencia = getattr(request, "resolver_match", None)
+    if coincidencia is None:
+        return None
+    return coincidencia.view_name or coincidencia.route
+
+
+def _presupuesto(vista: str):
+    presupuestos = getattr(settings, "INSTRUMENTACION_PRESUPUESTOS", {})
+    return presupuestos.get(vista, getattr(settings, "INSTRUMENTACION_PRESUPUESTO_DEFECTO", None))
+
+
+class InstrumentacionMiddleware:
+    """Mide cada solicitud y la registra en el histograma de su vista."""
+
+    def __init__(self, get_response):
+        if not getattr(settings, "INSTRUMENTACION", True):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        medidor = _Medidor()
+        inicio = time.perf_counter()
+        with ExitStack() as envolturas:
+            for conexion in connections.all():
+                envolturas.enter_context(conexion.execute_wrapper(medidor))
+            respuesta = self.get_response(request)
+            vista = _nombre_vista(request)
+            if vista is not None and respuesta.streaming and not respuesta.is_async:
+                # Las envolturas siguen activas hasta que el servidor cierra la respuesta, aunque
+                # la cierre sin haber pedido ningún fragmento.
+                flujo = _Flujo()
+                if getattr(respuesta, "file_to_stream", None) is None:
+                    respuesta.streaming_content = flujo.contar(respuesta.streaming_content)
+                else:
+                    # Reasignar streaming_content de una FileResponse descarta file_to_stream.
+                    flujo.enviados = int(respuesta.get("Content-Length") or 0)
+                respuesta._resource_closers.append(
+                    partial(self._cerrar_flujo, request, vista, medidor, inicio, envolturas.pop_all(), flujo)
+                )
+                return respuesta
+        if vista is None:
+            return respuesta
+        cuerpo = 0 if respuesta.streaming else len(respuesta.content)
+        self._registrar(request, vista, medidor, time.perf_counter() - inicio, cuerpo)
+        return respuesta
+
+    def _cerrar_flujo(self, request, vista, medidor, inicio, envolturas, flujo):
+        envolturas.close()
+        self._registrar(request, vista, medidor, time.perf_counter() - inicio, flujo.enviados)
+
+    def _registrar(self, request, vista, medidor, total, cuerpo):
+        presupuesto = _presupuesto(vista)
+        excedida = presupuesto is not None and medidor.consultas > presupuesto
+        if excedida:
+            sql, veces = medidor.repetidas.most_common(1)[0]
+            logger.warning(
+                "PRESUPUESTO DE CONSULTAS EXCEDIDO en %s (%s %s): %d consultas, presupuesto %d. "
+                "La más repetida (%d veces): %s",
+                vista, request.method, request.path, medidor.consultas, presupuesto, veces, sql[:300],
+            )
+        registrar(
+            vista,
+            {
+                "consultas": medidor.consultas,
+                "db_ms": round(medidor.segundos * 1000, 2),
+                "total_ms": round(total * 1000, 2),
+                "bytes": cuerpo,
+            },
+            excedida,
+        )
+
+
+@login_required
+@require_http_methods(["GET", "DELETE"])
+def api_admin_instrumentacion(request):
+    """Histogramas por vista de este proceso; DELETE los reinicia."""
+    if not (request.user.is_staff or request.user.is_superuser):
+        return HttpResponseForbidden("Solo administradores")
+    if request.method == "DELETE":
+        reiniciar()
+        return JsonResponse({"ok": True})
+    orden = request.GET.get("orden") or "total_ms"
+    vistas = resumen()
+    if orden in METRICAS:
+        vistas = dict(
+            sorted(vistas.items(), key=lambda item: item[1].get(orden, {}).get("p95", 0), reverse=True)
+        )
+    return JsonResponse(
+        {
+            "ventana": getattr(settings, "INSTRUMENTACION_VENTANA", VENTANA),
+            "presupuestos": getattr(settings, "INSTRUMENTACION_PRESUPUESTOS", {}),
+            "vistas": vistas,
+        },
+        json_dumps_params={"ensure_ascii": False},
+    )
@@ -0,0 +1,67 @@
+"""Crea las variantes precomprimidas (.gz y .br) de los archivos de texto en MEDIA_ROOT."""
+
+import gzip
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.media import CODIFICACIONES, es_publica
+
+# Las imágenes JPEG/PNG/WebP ya vienen comprimidas; solo vale la pena con formatos de texto.
+EXTENSIONES = {".svg", ".json", ".csv", ".txt", ".xml", ".css", ".js", ".html"}
+# Una variante que no ahorra al menos este porcentaje no se guarda.
+AHORRO_MINIMO = 0.05
+
+
+def _compresores():
+    compresores = {"gzip": lambda datos: gzip.compress(datos, compresslevel=9, mtime=0)}
+    try:
+        import brotli
+    except ImportError:
+        pass
+    else:
+        compresores["br"] = lambda datos: brotli.compress(datos, quality=11)
+    return compresores
+
+
+class Command(BaseCommand):
+    help = "Precomprime los archivos de texto de MEDIA_ROOT para que core.media los entregue con Content-Encoding."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--force", action="store_true", help="Regenera también las variantes existentes.")
+
+    def handle(self, *args, **options):
+        compresores = _compresores()
+        extension_de = dict(CODIFICACIONES)
+        creadas = ahorro = 0
+        for carpeta, _, archivos in os.walk(settings.MEDIA_ROOT):
+            for nombre in archivos:
+                if os.path.splitext(nombre)[1].lower() not in EXTENSIONES:
+                    continue
+                ruta = os.path.join(carpeta, nombre)
+                # Solo lo que core.media entrega; las exportaciones privadas no se copian.
+                if not es_publica(os.path.relpath(ruta, settings.MEDIA_ROOT).replace(os.sep, "/")):
+                    continue
+                datos = None
+                for codificacion, comprimir in compresores.items():
+                    destino = ruta + extension_de[codificacion]
+                    if not options["force"] and os.path.exists(destino) and (
+                        os.path.getmtime(destino) >= os.path.getmtime(ruta)
+                    ):
+                        continue
+                    if datos is None:
+                        with open(ruta, "rb") as archivo:
+                            datos = archivo.read()
+                    comprimido = comprimir(datos)
+                    if len(comprimido) > len(datos) * (1 - AHORRO_MINIMO):
+                        if os.path.exists(destino):
+                            os.remove(destino)
+                        continue
+                    with open(destino, "wb") as archivo:
+                        archivo.write(comprimido)
+                    creadas += 1
+                    ahorro += len(datos) - len(comprimido)
+        if "br" not in compresores:
+            self.stdout.write("brotli no está instalado: solo se generan variantes gzip.")
+        self.stdout.write(self.style.SUCCESS(f"{creadas} variantes comprimidas ({ahorro / 1024:.0f} KB menos)."))
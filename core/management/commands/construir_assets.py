@@ -0,0 +1,38 @@
+"""Genera los paquetes JS/CSS de static/dist/ y el subconjunto de Font Awesome."""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.assets import construir, diferencias, escribir
+
+
+class Command(BaseCommand):
+    help = (
+        "Concatena y minifica los paquetes de cada página y recorta Font Awesome a los íconos "
+        "usados en plantillas y scripts. Ejecútalo tras cambiar esos archivos y versiona static/dist/."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--check", action="store_true", help="No escribe nada; falla si static/dist/ está desactualizado."
+        )
+
+    def handle(self, *args, **options):
+        try:
+            generados, desconocidas = construir()
+        except (ImportError, RuntimeError) as exc:
+            raise CommandError(
+                f"{exc}. Para construir instala rjsmin, rcssmin, fonttools, brotli y fontawesomefree==6.5.1."
+            )
+        for clase in desconocidas:
+            self.stderr.write(f"Clase {clase} no existe en Font Awesome 6.5.1.")
+        if options["check"]:
+            distintas = diferencias(generados)
+            if distintas:
+                raise CommandError(
+                    "static/dist/ está desactualizado; ejecuta manage.py construir_assets. Cambian: "
+                    + ", ".join(distintas)
+                )
+            self.stdout.write(self.style.SUCCESS("static/dist/ está al día."))
+            return
+        total = escribir(generados)
+        self.stdout.write(self.style.SUCCESS(f"{len(generados)} archivos generados ({total / 1024:.0f} KB)."))
@@ -0,0 +1,100 @@
+"""Migra las imágenes al almacenamiento por contenido y elimina los archivos huérfanos."""
+
+from datetime import timedelta
+
+from django.core.files import File
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from core.almacenamiento import almacenamiento_contenido, es_nombre_hash, nombre_por_contenido
+from core.imagenes import FORMATO, VARIANTES, generar_variantes, nombre_variante
+from core.models import PerfilCliente, Producto
+
+CAMPOS = ((Producto, "imagen"), (PerfilCliente, "foto"))
+
+
+def _en_uso(nombre):
+    """Vuelve a consultar la base por un archivo a borrar (o por el original de una variante).
+
+    Entre el recorrido inicial y el borrado un registro puede haber pasado a usar un
+    archivo que ya existía (el almacenamiento por contenido reutiliza los duplicados).
+    """
+    for variante in VARIANTES:
+        sufijo = f".{variante}.{FORMATO}"
+        if nombre.endswith(sufijo):
+            filtro = "startswith", nombre[: -len(sufijo)] + "."
+            break
+    else:
+        filtro = "exact", nombre
+    return any(
+        modelo.objects.filter(**{f"{campo}__{filtro[0]}": filtro[1]}).exists() for modelo, campo in CAMPOS
+    )
+
+
+class Command(BaseCommand):
+    help = (
+        "Renombra las imágenes antiguas por el hash de su contenido (las copias idénticas quedan en un "
+        "solo archivo) y borra de productos/ y perfiles/ los archivos que ningún registro usa."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dry-run", action="store_true", help="Solo informa lo que haría.")
+        parser.add_argument(
+            "--gracia", type=float, default=24,
+            help="Horas de antigüedad mínima para borrar un huérfano (protege subidas en curso).",
+        )
+
+    def handle(self, *args, **options):
+        storage = almacenamiento_contenido
+        simular = options["dry_run"]
+        referenciados = set()
+        migrados = faltantes = 0
+
+        for modelo, campo in CAMPOS:
+            filas = modelo.objects.exclude(**{campo: ""}).exclude(**{f"{campo}__isnull": True})
+            for pk, nombre in filas.values_list("pk", campo).iterator(chunk_size=500):
+                if es_nombre_hash(nombre):
+                    referenciados.add(nombre)
+                    continue
+                if not storage.exists(nombre):
+                    faltantes += 1
+                    self.stderr.write(f"{modelo.__name__} {pk}: no existe {nombre}")
+                    continue
+                with storage.open(nombre, "rb") as archivo:
+                    if simular:
+                        nuevo = nombre_por_contenido(nombre, archivo)
+                    else:
+                        nuevo = storage.save(nombre, File(archivo, name=nombre))
+                if not simular:
+                    cambios = {campo: nuevo}
+                    if modelo is Producto:
+                        cambios["actualizado"] = timezone.now()
+                    modelo.objects.filter(pk=pk).update(**cambios)
+                    generar_variantes(getattr(modelo.objects.only("pk", campo).get(pk=pk), campo))
+                referenciados.add(nuevo)
+                migrados += 1
+
+        conservar = referenciados | {nombre_variante(n, v) for n in referenciados for v in VARIANTES}
+        limite = timezone.now() - timedelta(hours=options["gracia"])
+        borrados = liberados = 0
+        for carpeta in sorted({modelo._meta.get_field(campo).upload_to.strip("/") for modelo, campo in CAMPOS}):
+            if not storage.exists(carpeta):
+                continue
+            for archivo in storage.listdir(carpeta)[1]:
+                nombre = f"{carpeta}/{archivo}"
+                if nombre in conservar or storage.get_modified_time(nombre) > limite:
+                    continue
+                if not simular and _en_uso(nombre):
+                    continue
+                liberados += storage.size(nombre)
+                borrados += 1
+                if not simular:
+                    storage.delete(nombre)
+
+        prefijo = "[simulación] " if simular else ""
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{prefijo}{migrados} imágenes renombradas por contenido, {faltantes} faltantes; "
+                f"{borrados} archivos huérfanos o duplicados eliminados ({liberados / 1024:.0f} KB)."
+            )
+        )
@@ -0,0 +1,16 @@
+"""Entrena el modelo del chatbot fuera de línea y guarda sus artefactos."""
+
+from django.core.management.base import BaseCommand
+
+from core import chatbot
+
+
+class Command(BaseCommand):
+    help = "Entrena el clasificador del chatbot para la versión actual de chatbot_faq.txt."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--force", action="store_true", help="Reentrena aunque ya existan los artefactos.")
+
+    def handle(self, *args, **options):
+        destino = chatbot.entrenar_artefactos(forzar=options["force"])
+        self.stdout.write(self.style.SUCCESS(f"Artefactos del chatbot listos en {destino}"))
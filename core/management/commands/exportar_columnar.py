@@ -0,0 +1,52 @@
+"""Exporta ventas, compras o productos a Parquet/Arrow para cargas analíticas."""
+
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from core.columnar import ESQUEMAS, FORMATOS_COLUMNARES, escribir_columnar, filtrar_incremental, leer_marca_agua
+from core.exports import _parse_fecha
+
+
+class Command(BaseCommand):
+    help = "Exporta un modelo a Parquet o Arrow IPC, completo o de forma incremental."
+
+    def add_arguments(self, parser):
+        parser.add_argument("modelo", choices=sorted(ESQUEMAS))
+        parser.add_argument("--formato", choices=sorted(FORMATOS_COLUMNARES), default="parquet")
+        parser.add_argument("--salida", help="Ruta del archivo a generar (por defecto MEDIA_ROOT/analitica/).")
+        parser.add_argument("--desde", help="Exporta solo registros con fecha igual o posterior (YYYY-MM-DD).")
+        parser.add_argument(
+            "--incremental-de",
+            dest="previo",
+            help="Archivo de una exportación anterior; solo se exportan registros con id mayor a su marca de agua.",
+        )
+
+    def handle(self, *args, **options):
+        modelo = options["modelo"]
+        formato = options["formato"]
+        esquema = ESQUEMAS[modelo]
+
+        desde = None
+        if options["desde"]:
+            desde = _parse_fecha(options["desde"])
+            if desde is None:
+                raise CommandError("--desde debe tener formato YYYY-MM-DD")
+        marca_previa = (None, None)
+        if options["previo"]:
+            previo = Path(options["previo"])
+            formato_previo = "arrow" if previo.suffix == ".arrow" else "parquet"
+            marca_previa = leer_marca_agua(str(previo), formato_previo)
+        despues_de_id = marca_previa[1]
+
+        salida = options["salida"]
+        if not salida:
+            carpeta = Path(settings.MEDIA_ROOT) / "analitica"
+            carpeta.mkdir(parents=True, exist_ok=True)
+            salida = carpeta / f"{modelo}_{timezone.now():%Y%m%d%H%M%S}.{formato}"
+
+        qs = filtrar_incremental(esquema, esquema.modelo.objects.all(), desde=desde, despues_de_id=despues_de_id)
+        filas, fecha_max, id_max = escribir_columnar(str(salida), esquema, qs, formato, marca_previa=marca_previa)
+        self.stdout.write(f"{filas} filas escritas en {salida} (marca de agua: fecha={fecha_max}, id={id_max})")
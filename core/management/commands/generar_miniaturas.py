@@ -0,0 +1,48 @@
+"""Genera las variantes reducidas de las imágenes ya subidas.
+
+Los productos con variantes nuevas reciben un `actualizado` nuevo: las tarjetas del
+catálogo se guardan en caché por ese valor y de otro modo seguirían apuntando a la
+imagen original hasta vencer.
+"""
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from core.imagenes import generar_variantes
+from core.importers import catalogo_actualizado
+from core.models import PerfilCliente, Producto
+
+LOTE_ACTUALIZACION = 500
+
+
+class Command(BaseCommand):
+    help = "Crea las miniaturas WebP que falten para productos y fotos de perfil."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--force", action="store_true", help="Regenera también las variantes existentes.")
+
+    def handle(self, *args, **options):
+        creadas = errores = 0
+        productos = []
+        consultas = (
+            (Producto.objects.exclude(imagen="").exclude(imagen__isnull=True).only("id", "imagen"), "imagen"),
+            (PerfilCliente.objects.exclude(foto="").exclude(foto__isnull=True).only("id", "foto"), "foto"),
+        )
+        for queryset, campo in consultas:
+            for obj in queryset.iterator(chunk_size=500):
+                try:
+                    nuevas = generar_variantes(getattr(obj, campo), forzar=options["force"])
+                except Exception as exc:
+                    errores += 1
+                    self.stderr.write(f"{obj.__class__.__name__} {obj.pk}: {exc}")
+                    continue
+                creadas += len(nuevas)
+                if nuevas and isinstance(obj, Producto):
+                    productos.append(obj.pk)
+        if productos:
+            ahora = timezone.now()
+            for inicio in range(0, len(productos), LOTE_ACTUALIZACION):
+                Producto.objects.filter(pk__in=productos[inicio:inicio + LOTE_ACTUALIZACION]).update(actualizado=ahora)
+            # update() no emite post_save: se avisa una vez, como una importación masiva.
+            catalogo_actualizado.send(sender=self.__class__, vendedor=None)
+        self.stdout.write(self.style.SUCCESS(f"{creadas} variantes creadas, {errores} imágenes con errores."))
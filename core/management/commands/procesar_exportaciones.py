@@ -0,0 +1,29 @@
+"""Worker que procesa las exportaciones encoladas desde los paneles."""
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.export_jobs import RETENCION_DIAS, procesar_siguiente, purgar_vencidos
+
+
+class Command(BaseCommand):
+    help = "Procesa las exportaciones pendientes y purga los archivos vencidos."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--once", action="store_true", help="Vacía la cola una vez y termina.")
+        parser.add_argument("--intervalo", type=float, default=5.0, help="Segundos de espera cuando la cola está vacía.")
+        parser.add_argument("--retencion", type=int, default=RETENCION_DIAS, help="Días que se conservan los archivos.")
+
+    def handle(self, *args, **options):
+        purgados = purgar_vencidos(options["retencion"])
+        if purgados:
+            self.stdout.write(f"Purgadas {purgados} exportaciones vencidas.")
+        while True:
+            trabajo = procesar_siguiente()
+            if trabajo is not None:
+                self.stdout.write(f"Exportación {trabajo.pk}: {trabajo.estado} ({trabajo.filas} filas)")
+                continue
+            if options["once"]:
+                return
+            time.sleep(options["intervalo"])
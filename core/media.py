@@ -0,0 +1,233 @@
+"""Entrega de los archivos subidos (MEDIA_URL) con caché HTTP, al estilo de WhiteNoise.
+
+WhiteNoise solo cubre los estáticos, que conoce al arrancar; las imágenes de productos y
+perfiles llegan en cualquier momento, así que MediaMiddleware las busca en MEDIA_ROOT en
+cada solicitud, antes de sesiones y autenticación:
+
+- ETag fuerte: el hash del nombre en los archivos por contenido (core.almacenamiento) o
+  la huella SHA-256 del archivo, memorizada por ruta, fecha de modificación y tamaño.
+- Cache-Control: los originales nombrados por su hash nunca cambian de contenido y se
+  marcan `immutable` por un año; el resto (miniaturas, archivos antiguos) se revalida
+  pasado MEDIA_MAX_AGE.
+- Respuestas 304 con If-None-Match / If-Modified-Since y rangos de bytes (206/416, con If-Range).
+- Variantes precomprimidas: si existe "archivo.br" o "archivo.gz" y el cliente las
+  acepta, se entregan con Content-Encoding (`manage.py comprimir_media` las crea).
+- MEDIA_ENVIO_INTERNO = "x-accel-redirect" (nginx) o "x-sendfile" (Apache): Django
+  resuelve la caché y delega el envío del cuerpo al servidor web.
+
+Solo se entregan las carpetas de MEDIA_CARPETAS_PUBLICAS (imágenes de productos y
+perfiles). Las exportaciones e importaciones también viven en MEDIA_ROOT, con nombres
+predecibles, y se descargan únicamente por sus vistas con permisos: aquí responden 404.
+
+Con MEDIA_SERVIR = False el middleware se desactiva.
+"""
+
+import hashlib
+import mimetypes
+import os
+import posixpath
+import re
+from functools import lru_cache
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed, SuspiciousFileOperation
+from django.http import FileResponse, Http404, HttpResponse, HttpResponseNotAllowed, StreamingHttpResponse
+from django.utils._os import safe_join
+from django.utils.http import http_date, parse_http_date_safe
+
+from .almacenamiento import LARGO_HASH
+
+CACHE_INMUTABLE = "public, max-age=31536000, immutable"
+CARPETAS_PUBLICAS = ("productos", "perfiles")
+# Codificaciones precomprimidas, en orden de preferencia: (codificación, extensión).
+CODIFICACIONES = (("br", ".br"), ("gzip", ".gz"))
+BLOQUE = 64 * 1024
+
+_NOMBRE_INMUTABLE = re.compile(rf"^[0-9a-f]{{{LARGO_HASH}}}\.[a-z0-9]+$")
+_RANGO = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def es_inmutable(ruta: str) -> bool:
+    """Originales por contenido ("productos/<hash>.jpeg"); sus miniaturas pueden regenerarse."""
+    return bool(_NOMBRE_INMUTABLE.match(posixpath.basename(ruta)))
+
+
+@lru_cache(maxsize=4096)
+def _huella(ruta: str, mtime_ns: int, tamano: int) -> str:
+    digest = hashlib.sha256()
+    with open(ruta, "rb") as archivo:
+        for bloque in iter(lambda: archivo.read(BLOQUE), b""):
+            digest.update(bloque)
+    return digest.hexdigest()[:LARGO_HASH]
+
+
+def _etag(relativa: str, ruta: str, stat, codificacion: str | None) -> str:
+    if es_inmutable(relativa):
+        valor = posixpath.splitext(posixpath.basename(relativa))[0]
+    else:
+        valor = _huella(ruta, stat.st_mtime_ns, stat.st_size)
+    # Cada representación (comprimida o no) necesita su propio ETag fuerte.
+    return f'"{valor}-{codificacion}"' if codificacion else f'"{valor}"'
+
+
+def _acepta(request, codificacion: str) -> bool:
+    for parte in request.META.get("HTTP_ACCEPT_ENCODING", "").split(","):
+        nombre, _, parametros = parte.strip().partition(";")
+        if nombre.strip().lower() == codificacion:
+            return parametros.replace(" ", "") not in ("q=0", "q=0.0", "q=0.00", "q=0.000")
+    return False
+
+
+def _representacion(request, ruta: str):
+    """(ruta a enviar, codificación, hay variantes comprimidas) según Accept-Encoding."""
+    variantes = False
+    for codificacion, extension in CODIFICACIONES:
+        if os.path.isfile(ruta + extension):
+            variantes = True
+            if _acepta(request, codificacion):
+                return ruta + extension, codificacion, True
+    return ruta, None, variantes
+
+
+def _coincide_etag(cabecera: str, etag: str) -> bool:
+    # Comparación débil (RFC 9110 §13.1.2), la que corresponde a If-None-Match.
+    etiquetas = [e.strip().removeprefix("W/") for e in cabecera.split(",")]
+    return "*" in etiquetas or etag in etiquetas
+
+
+def _no_modificado(request, etag: str, mtime: float) -> bool:
+    if_none_match = request.META.get("HTTP_IF_NONE_MATCH")
+    if if_none_match is not None:
+        return _coincide_etag(if_none_match, etag)
+    desde = parse_http_date_safe(request.META.get("HTTP_IF_MODIFIED_SINCE", ""))
+    return desde is not None and int(mtime) <= desde
+
+
+def _rango(request, etag: str, mtime: float, tamano: int):
+    """(inicio, fin) inclusivo pedido en Range; None para enviar el archivo completo.
+
+    Lanza ValueError si el rango no se puede satisfacer. Los rangos múltiples se
+    ignoran (se responde completo, como permite la especificación).
+    """
+    cabecera = request.META.get("HTTP_RANGE")
+    if not cabecera or tamano == 0:
+        return None
+    if_range = request.META.get("HTTP_IF_RANGE")
+    if if_range:
+        fecha = parse_http_date_safe(if_range)
+        if if_range != etag and (fecha is None or int(mtime) > fecha):
+            return None
+    coincidencia = _RANGO.match(cabecera.strip())
+    if not coincidencia:
+        return None
+    inicio, fin = coincidencia.groups()
+    if not inicio:
+        if not fin or int(fin) == 0:
+            raise ValueError(cabecera)
+        return max(tamano - int(fin), 0), tamano - 1
+    inicio = int(inicio)
+    fin = min(int(fin), tamano - 1) if fin else tamano - 1
+    if inicio >= tamano:
+        raise ValueError(cabecera)
+    if fin < inicio:
+        return None
+    return inicio, fin
+
+
+def _leer(ruta: str, inicio: int, largo: int):
+    with open(ruta, "rb") as archivo:
+        archivo.seek(inicio)
+        while largo > 0:
+            bloque = archivo.read(min(BLOQUE, largo))
+            if not bloque:
+                break
+            largo -= len(bloque)
+            yield bloque
+
+
+def es_publica(relativa: str) -> bool:
+    partes = relativa.split("/")
+    publicas = getattr(settings, "MEDIA_CARPETAS_PUBLICAS", CARPETAS_PUBLICAS)
+    return len(partes) > 1 and partes[0] in publicas and not any(parte.startswith(".") for parte in partes)
+
+
+def servir(request, relativa: str):
+    """Respuesta para un archivo de MEDIA_ROOT; `relativa` es la ruta sin el prefijo MEDIA_URL."""
+    if request.method not in ("GET", "HEAD"):
+        return HttpResponseNotAllowed(["GET", "HEAD"])
+    if not es_publica(relativa):
+        raise Http404(relativa)
+    try:
+        ruta = safe_join(settings.MEDIA_ROOT, relativa)
+    except SuspiciousFileOperation:
+        raise Http404(relativa)
+    if not os.path.isfile(ruta):
+        raise Http404(relativa)
+
+    enviar, codificacion, variantes = _representacion(request, ruta)
+    stat = os.stat(enviar)
+    etag = _etag(relativa, enviar, stat, codificacion)
+    cabeceras = {
+        "ETag": etag,
+        "Last-Modified": http_date(stat.st_mtime),
+        "Cache-Control": (
+            CACHE_INMUTABLE if es_inmutable(relativa) else f"public, max-age={getattr(settings, 'MEDIA_MAX_AGE', 3600)}"
+        ),
+        "Accept-Ranges": "bytes",
+    }
+    if variantes:
+        cabeceras["Vary"] = "Accept-Encoding"
+    if _no_modificado(request, etag, stat.st_mtime):
+        return HttpResponse(status=304, headers=cabeceras)
+
+    tipo = mimetypes.guess_type(ruta)[0] or "application/octet-stream"
+    if codificacion:
+        cabeceras["Content-Encoding"] = codificacion
+
+    interno = getattr(settings, "MEDIA_ENVIO_INTERNO", "")
+    if interno == "x-accel-redirect":
+        prefijo = getattr(settings, "MEDIA_PREFIJO_INTERNO", "/media-interno/")
+        destino = os.path.relpath(enviar, settings.MEDIA_ROOT).replace(os.sep, "/")
+        cabeceras["X-Accel-Redirect"] = prefijo + quote(destino)
+        return HttpResponse(content_type=tipo, headers=cabeceras)
+    if interno == "x-sendfile":
+        cabeceras["X-Sendfile"] = enviar
+        return HttpResponse(content_type=tipo, headers=cabeceras)
+
+    try:
+        rango = _rango(request, etag, stat.st_mtime, stat.st_size)
+    except ValueError:
+        return HttpResponse(status=416, headers={"Content-Range": f"bytes */{stat.st_size}"})
+    inicio, fin = rango or (0, stat.st_size - 1)
+    largo = fin - inicio + 1
+    cabeceras["Content-Length"] = str(largo)
+    if rango:
+        cabeceras["Content-Range"] = f"bytes {inicio}-{fin}/{stat.st_size}"
+    if request.method == "HEAD":
+        respuesta = HttpResponse(content_type=tipo, status=206 if rango else 200, headers=cabeceras)
+    elif rango:
+        respuesta = StreamingHttpResponse(_leer(enviar, inicio, largo), content_type=tipo, status=206, headers=cabeceras)
+    else:
+        # FileResponse aprovecha wsgi.file_wrapper (sendfile) cuando el servidor lo ofrece.
+        respuesta = FileResponse(open(enviar, "rb"), content_type=tipo, headers=cabeceras)
+        respuesta.headers.pop("Content-Disposition", None)
+    return respuesta
+
+
+class MediaMiddleware:
+    """Atiende las rutas bajo MEDIA_URL sin pasar por sesiones, autenticación ni URLconf."""
+
+    def __init__(self, get_response):
+        if not getattr(settings, "MEDIA_SERVIR", True) or not settings.MEDIA_URL.startswith("/"):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.prefijo = settings.MEDIA_URL
+
+    def __call__(self, request):
+        if request.path_info.startswith(self.prefijo):
+            try:
+                return servir(request, request.path_info[len(self.prefijo):])
+            except Http404:
+                return HttpResponse("Archivo no encontrado.", status=404, content_type="text/plain; charset=utf-8")
+        return self.get_response(request)
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.6 on 2026-10-19 16:42
+
+import core.almacenamiento
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0016_trabajoimportacion'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='perfilcliente',
+            name='foto',
+            field=models.ImageField(blank=True, help_text='Fotografía de perfil usada en el área de cliente.', null=True, storage=core.almacenamiento.AlmacenamientoPorContenido(), upload_to='perfiles/'),
+        ),
+        migrations.AlterField(
+            model_name='producto',
+            name='imagen',
+            field=models.ImageField(blank=True, null=True, storage=core.almacenamiento.AlmacenamientoPorContenido(), upload_to='productos/'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-10-19 17:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0018_producto_actualizado'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='postulacionvendedor',
+            name='actualizado',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
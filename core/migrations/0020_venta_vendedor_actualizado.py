@@ -0,0 +1,23 @@
+# Generated by Django 5.2.6 on 2026-10-19 17:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0019_postulacionvendedor_actualizado'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='vendedor',
+            name='actualizado',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='venta',
+            name='actualizado',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
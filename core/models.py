@@ -7,6 +7,8 @@ from django.db import models
 from django.contrib.auth.models import User
 from django.utils import timezone
 
+from .almacenamiento import almacenamiento_contenido
+
 
 class Vendedor(models.Model):
     """Representa a un vendedor asociado a un usuario interno."""
@@ -15,6 +17,7 @@ class Vendedor(models.Model):
     telefono = models.CharField(max_length=20, blank=True, null=True)
     direccion = models.CharField(max_length=120, blank=True, null=True)
     fecha_ingreso = models.DateField(auto_now_add=True)
+    actualizado = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return f"{self.usuario.username}"
@@ -32,7 +35,10 @@ class Producto(models.Model):
     precio = models.DecimalField(max_digits=10, decimal_places=2)
     existencias = models.IntegerField()
     categoria = models.CharField(max_length=40)
-    imagen = models.ImageField(upload_to='productos/', null=True, blank=True)
+    imagen = models.ImageField(upload_to='productos/', storage=almacenamiento_contenido, null=True, blank=True)
+    # Cambia en cada guardado; versiona los fragmentos en caché de las tarjetas del producto.
+    # Los QuerySet.update() y save(update_fields=...) deben incluirlo explícitamente.
+    actualizado = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ("-fecha_ingreso", "nombre")
@@ -49,6 +55,7 @@ class Venta(models.Model):
     cantidad = models.IntegerField()
     total = models.DecimalField(max_digits=10, decimal_places=2, default=0)
     fecha_venta = models.DateField(auto_now_add=True)
+    actualizado = models.DateTimeField(auto_now=True)
 
     def save(self, *args, **kwargs):
         """Calcula el total a partir de la cantidad y del precio del producto."""
@@ -114,7 +121,7 @@ class PerfilCliente(models.Model):
     ciudad = models.CharField(max_length=80, blank=True)
     codigo_postal = models.CharField(max_length=20, blank=True)
     pais = models.CharField(max_length=60, blank=True, default="Chile")
-    foto = models.ImageField(upload_to="perfiles/", blank=True, null=True, help_text="Fotografía de perfil usada en el área de cliente.")
+    foto = models.ImageField(upload_to="perfiles/", storage=almacenamiento_contenido, blank=True, null=True, help_text="Fotografía de perfil usada en el área de cliente.")
     actualizado = models.DateTimeField(auto_now=True)
 
     def __str__(self):
@@ -146,6 +153,7 @@ class PostulacionVendedor(models.Model):
     notas = models.TextField(blank=True, help_text="Notas internas del equipo")
     fecha_envio = models.DateTimeField(auto_now_add=True)
     estado = models.CharField(max_length=20, default="nuevo")
+    actualizado = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ("-fecha_envio",)
@@ -167,3 +175,86 @@ class NewsletterSubscriber(models.Model):
 
     def __str__(self):
         return self.email
+
+
+class TrabajoExportacion(models.Model):
+    """Registra una exportación procesada en segundo plano y su archivo resultante."""
+
+    FORMATO_CHOICES = [
+        ("csv", "CSV"),
+        ("xlsx", "Excel"),
+        ("parquet", "Parquet"),
+        ("arrow", "Arrow IPC"),
+    ]
+    ESTADO_CHOICES = [
+        ("pendiente", "Pendiente"),
+        ("procesando", "Procesando"),
+        ("listo", "Listo"),
+        ("error", "Error"),
+    ]
+
+    usuario = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="exportaciones",
+    )
+    vendedor = models.ForeignKey(Vendedor, on_delete=models.CASCADE, null=True, blank=True, related_name="exportaciones")
+    tipo = models.CharField(max_length=30)
+    formato = models.CharField(max_length=10, choices=FORMATO_CHOICES, default="csv")
+    filtros = models.JSONField(default=dict, blank=True)
+    huella = models.CharField(max_length=64, unique=True, help_text="Hash de tipo, formato, filtros y versión de los datos.")
+    estado = models.CharField(max_length=20, choices=ESTADO_CHOICES, default="pendiente", db_index=True)
+    archivo = models.FileField(upload_to="exportaciones/", blank=True)
+    filas = models.PositiveIntegerField(default=0)
+    error = models.TextField(blank=True)
+    creado = models.DateTimeField(auto_now_add=True)
+    iniciado = models.DateTimeField(null=True, blank=True)
+    finalizado = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ("-creado",)
+
+    def __str__(self):
+        return f"Exportación {self.tipo}.{self.formato} ({self.estado})"
+
+
+class TrabajoImportacion(models.Model):
+    """Registra una importación de productos subida por un vendedor y procesada en segundo plano."""
+
+    FORMATO_CHOICES = [
+        ("csv", "CSV"),
+        ("xlsx", "Excel"),
+    ]
+    ESTADO_CHOICES = TrabajoExportacion.ESTADO_CHOICES
+
+    usuario = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="importaciones",
+    )
+    vendedor = models.ForeignKey(Vendedor, on_delete=models.CASCADE, related_name="importaciones")
+    formato = models.CharField(max_length=10, choices=FORMATO_CHOICES, default="csv")
+    archivo = models.FileField(upload_to="importaciones/")
+    nombre_original = models.CharField(max_length=255, blank=True)
+    estricto = models.BooleanField(default=False)
+    estado = models.CharField(max_length=20, choices=ESTADO_CHOICES, default="pendiente", db_index=True)
+    filas = models.PositiveIntegerField(default=0, help_text="Filas leídas hasta el momento.")
+    creados = models.PositiveIntegerField(default=0)
+    actualizados = models.PositiveIntegerField(default=0)
+    sin_cambios = models.PositiveIntegerField(default=0)
+    total_errores = models.PositiveIntegerField(default=0)
+    errores = models.JSONField(default=list, blank=True)
+    error = models.TextField(blank=True)
+    creado = models.DateTimeField(auto_now_add=True)
+    iniciado = models.DateTimeField(null=True, blank=True)
+    finalizado = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ("-creado",)
+
+    def __str__(self):
+        return f"Importación {self.formato} de {self.vendedor} ({self.estado})"
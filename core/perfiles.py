@@ -0,0 +1,86 @@
+"""Perfil de cliente (PerfilCliente) de las plantillas, sin consultas ni escrituras de más.
+
+Expone:
+- perfil_de: perfil del usuario de la solicitud o None. Nunca lo crea. La primera vez
+  lo lee de la base y guarda sus campos en la sesión; las solicitudes siguientes lo
+  reconstruyen desde ahí mientras la marca del usuario no cambie (core.roles.marca).
+- crear_perfil: crea el perfil al registrarse, con el nombre y correo de la cuenta. El
+  checkout (_resolver_datos_cliente) también lo crea al guardar los datos de envío.
+- conectar_senales: publica una marca nueva al guardar o eliminar un PerfilCliente.
+
+El context processor `perfil_cliente` lo expone como objeto perezoso: las páginas que
+no muestran el perfil no lo resuelven.
+
+Como en core.roles, la copia de la sesión vence a los ROL_TTL segundos: con la caché
+local por proceso un worker no ve la marca nueva que publicó otro, y los cambios hechos
+con QuerySet.update() no la publican.
+"""
+
+import time
+
+from django.db.models.signals import post_delete, post_save
+
+from .roles import ROL_TTL, marca, renovar_marcas
+
+SESION_KEY = "_perfil_cliente"
+MARCA_KEY = "perfiles:marca"
+# Campos que se guardan en la sesión; los demás (p. ej. `actualizado`) quedan diferidos.
+CAMPOS = ("id", "user_id", "nombre", "email", "telefono", "direccion", "ciudad", "codigo_postal", "pais", "foto")
+
+
+def _valores(perfil):
+    valores = [getattr(perfil, campo) for campo in CAMPOS]
+    valores[CAMPOS.index("foto")] = perfil.foto.name or ""
+    return valores
+
+
+def perfil_de(request):
+    """PerfilCliente del usuario autenticado, memorizado en la solicitud y la sesión."""
+    from .models import PerfilCliente
+
+    user = request.user
+    if not user.is_authenticated:
+        return None
+    if hasattr(request, "_perfil_cliente"):
+        return request._perfil_cliente
+
+    marca_actual = marca(MARCA_KEY, user.pk)
+    guardado = request.session.get(SESION_KEY) or {}
+    vigente = (
+        guardado.get("pk") == user.pk
+        and guardado.get("marca") == marca_actual
+        and time.time() - guardado.get("ts", 0) < ROL_TTL
+    )
+    if vigente:
+        valores = guardado["valores"]
+        perfil = PerfilCliente.from_db(PerfilCliente.objects.db, CAMPOS, valores) if valores else None
+    else:
+        perfil = PerfilCliente.objects.filter(user=user).first()
+        request.session[SESION_KEY] = {
+            "pk": user.pk,
+            "marca": marca_actual,
+            "valores": _valores(perfil) if perfil else None,
+            "ts": time.time(),
+        }
+    request._perfil_cliente = perfil
+    return perfil
+
+
+def crear_perfil(user):
+    from .models import PerfilCliente
+
+    perfil, _ = PerfilCliente.objects.get_or_create(
+        user=user, defaults={"nombre": user.get_full_name(), "email": user.email or ""}
+    )
+    return perfil
+
+
+def _perfil_cambiado(sender, instance, **kwargs):
+    renovar_marcas(MARCA_KEY, [instance.user_id])
+
+
+def conectar_senales():
+    from .models import PerfilCliente
+
+    post_save.connect(_perfil_cambiado, sender=PerfilCliente, dispatch_uid="perfiles_perfil_guardado")
+    post_delete.connect(_perfil_cambiado, sender=PerfilCliente, dispatch_uid="perfiles_perfil_eliminado")
@@ -0,0 +1,128 @@
+"""Rol del usuario (anonimo, comprador, vendedor, administrador) sin repetir consultas.
+
+Expone:
+- es_vendedor: pertenencia al grupo Vendedores, memorizada en el objeto usuario. Como
+  request.user es un objeto nuevo en cada solicitud, la consulta se hace a lo sumo una
+  vez por solicitud aunque varias funciones pregunten.
+- rol_de_usuario: el rol a partir de is_staff/is_superuser y es_vendedor.
+- RolUsuarioMiddleware: guarda es_vendedor en la sesión y lo entrega a request.user en
+  las solicitudes siguientes, así que un usuario ya identificado no vuelve a consultar
+  sus grupos.
+- conectar_senales: publica una marca nueva para los usuarios cuyos grupos cambian
+  (User.groups, Group.user_set, grupos renombrados o borrados); la sesión con una marca
+  anterior se descarta y se vuelve a consultar.
+
+La marca vive en la caché de Django: con una caché compartida todos los workers ven el
+cambio al instante; con la caché local por proceso ROL_TTL acota cuánto puede tardar.
+Mientras nadie la renueve la marca vale MARCA_INICIAL en todos los workers, así que una
+sesión guardada por uno sigue vigente en los demás; solo renovar_marcas crea valores nuevos.
+"""
+
+import time
+import uuid
+
+from django.contrib.auth.models import Group, User
+from django.core.cache import cache
+from django.db.models.signals import m2m_changed, post_save, pre_delete
+
+GRUPO_VENDEDORES = "Vendedores"
+SESION_KEY = "_rol_usuario"
+MARCA_KEY = "roles:marca"
+ROL_TTL = 300
+MARCA_INICIAL = "0"
+
+
+def es_vendedor(user) -> bool:
+    if not user.is_authenticated:
+        return False
+    valor = getattr(user, "_es_vendedor", None)
+    if valor is None:
+        valor = user._es_vendedor = user.groups.filter(name=GRUPO_VENDEDORES).exists()
+    return valor
+
+
+def rol_de_usuario(user) -> str:
+    if not user.is_authenticated:
+        return "anonimo"
+    if user.is_superuser or user.is_staff:
+        return "administrador"
+    if es_vendedor(user):
+        return "vendedor"
+    return "comprador"
+
+
+def marca(prefijo: str, pk) -> str:
+    """Marca vigente de un dato del usuario guardado en su sesión (core.perfiles la reutiliza)."""
+    clave = f"{prefijo}:{pk}"
+    valor = cache.get(clave)
+    if valor is None:
+        # Determinista: los workers con la caché vacía coinciden entre sí. Una renovación que
+        # este worker no vio (o que se desalojó) queda cubierta por ROL_TTL.
+        cache.add(clave, MARCA_INICIAL, None)
+        valor = cache.get(clave, MARCA_INICIAL)
+    return valor
+
+
+def renovar_marcas(prefijo: str, pks):
+    cache.set_many({f"{prefijo}:{pk}": uuid.uuid4().hex for pk in pks}, None)
+
+
+def invalidar(pks):
+    """Obliga a volver a consultar los grupos de esos usuarios en su próxima solicitud."""
+    renovar_marcas(MARCA_KEY, pks)
+
+
+class RolUsuarioMiddleware:
+    """Recupera de la sesión la pertenencia a Vendedores y la guarda cuando se calculó."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        user = getattr(request, "user", None)
+        if user is None or not user.is_authenticated:
+            return self.get_response(request)
+
+        marca_actual = marca(MARCA_KEY, user.pk)
+        guardado = request.session.get(SESION_KEY) or {}
+        vigente = (
+            guardado.get("pk") == user.pk
+            and guardado.get("marca") == marca_actual
+            and time.time() - guardado.get("ts", 0) < ROL_TTL
+        )
+        if vigente:
+            user._es_vendedor = guardado["vendedor"]
+
+        respuesta = self.get_response(request)
+
+        # Tras un login o logout request.user es otro objeto y la sesión ya no es la del usuario.
+        valor = getattr(user, "_es_vendedor", None)
+        if not vigente and valor is not None and request.user is user:
+            request.session[SESION_KEY] = {"pk": user.pk, "vendedor": valor, "marca": marca_actual, "ts": time.time()}
+        return respuesta
+
+
+def _grupos_cambiados(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ("post_add", "post_remove", "pre_clear"):
+        return
+    if not reverse:
+        invalidar([instance.pk])
+    elif action == "pre_clear":
+        invalidar(instance.user_set.values_list("pk", flat=True))
+    else:
+        invalidar(pk_set or ())
+
+
+def _grupo_guardado(sender, instance, created, **kwargs):
+    if not created:
+        invalidar(instance.user_set.values_list("pk", flat=True))
+
+
+def _grupo_eliminado(sender, instance, **kwargs):
+    invalidar(instance.user_set.values_list("pk", flat=True))
+
+
+def conectar_senales():
+    m2m_changed.connect(_grupos_cambiados, sender=User.groups.through, dispatch_uid="roles_grupos_cambiados")
+    post_save.connect(_grupo_guardado, sender=Group, dispatch_uid="roles_grupo_guardado")
+    pre_delete.connect(_grupo_eliminado, sender=Group, dispatch_uid="roles_grupo_eliminado")
@@ -0,0 +1,13 @@
+"""Filtros de plantilla para usar las variantes reducidas de las imágenes."""
+
+from django import template
+
+from core.imagenes import url_variante
+
+register = template.Library()
+
+
+@register.filter
+def variante(campo, nombre):
+    """`{{ producto.imagen|variante:"tarjeta" }}`: URL de la variante o del original."""
+    return url_variante(campo, nombre) or ""
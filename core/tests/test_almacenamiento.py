@@ -0,0 +1,96 @@
+import os
+import shutil
+import tempfile
+from decimal import Decimal
+from io import BytesIO, StringIO
+from unittest import mock
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from PIL import Image
+
+from core import imagenes
+from core.almacenamiento import almacenamiento_contenido, es_nombre_hash
+from core.models import Producto
+
+
+def _jpeg(color=(10, 120, 200), nombre="Vegetta.jpeg"):
+    salida = BytesIO()
+    Image.new("RGB", (64, 64), color).save(salida, "JPEG")
+    return SimpleUploadedFile(nombre, salida.getvalue(), content_type="image/jpeg")
+
+
+class ContentAddressedStorageTests(TestCase):
+    def setUp(self):
+        self.media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media, ignore_errors=True)
+        override = override_settings(MEDIA_ROOT=self.media)
+        override.enable()
+        self.addCleanup(override.disable)
+        imagenes._EXISTENTES.clear()
+
+    def _crear(self, nombre, imagen=None):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Producto.objects.create(
+                nombre=nombre, marca="Bandai", calidad="Nuevo", precio=Decimal("1000"), existencias=1, imagen=imagen
+            )
+
+    def _archivos(self):
+        return sorted(os.listdir(os.path.join(self.media, "productos")))
+
+    def test_identical_uploads_share_one_hashed_file(self):
+        primero = self._crear("Figura Vegetta", _jpeg())
+        segundo = self._crear("Poster Vegetta", _jpeg(nombre="otra.JPEG"))
+        self.assertEqual(primero.imagen.name, segundo.imagen.name)
+        self.assertTrue(es_nombre_hash(primero.imagen.name))
+        self.assertTrue(primero.imagen.name.endswith(".jpeg"))
+        originales = [a for a in self._archivos() if a.count(".") == 1]
+        self.assertEqual(originales, [os.path.basename(primero.imagen.name)])
+
+    def test_depurar_media_migrates_legacy_names_and_removes_duplicates(self):
+        carpeta = os.path.join(self.media, "productos")
+        os.makedirs(carpeta)
+        contenido = _jpeg().read()
+        for nombre in ("Vegetta.jpeg", "Vegetta_6TBUPxu.jpeg", "huerfano.jpg"):
+            with open(os.path.join(carpeta, nombre), "wb") as archivo:
+                archivo.write(contenido)
+        a = self._crear("Figura Vegetta")
+        b = self._crear("Poster Vegetta")
+        Producto.objects.filter(pk=a.pk).update(imagen="productos/Vegetta.jpeg")
+        Producto.objects.filter(pk=b.pk).update(imagen="productos/Vegetta_6TBUPxu.jpeg")
+
+        salida = StringIO()
+        call_command("depurar_media", "--dry-run", "--gracia", "0", stdout=salida, stderr=StringIO())
+        self.assertIn("3 archivos", salida.getvalue())
+        self.assertEqual(len(self._archivos()), 3)
+
+        call_command("depurar_media", "--gracia", "0", stdout=StringIO(), stderr=StringIO())
+        a.refresh_from_db()
+        b.refresh_from_db()
+        self.assertEqual(a.imagen.name, b.imagen.name)
+        self.assertTrue(es_nombre_hash(a.imagen.name))
+        self.assertEqual(
+            self._archivos(),
+            sorted([os.path.basename(a.imagen.name)] + [
+                os.path.basename(imagenes.nombre_variante(a.imagen.name, v)) for v in ("miniatura", "tarjeta", "detalle")
+            ]),
+        )
+
+    def test_depurar_media_keeps_files_referenced_after_the_scan(self):
+        carpeta = os.path.join(self.media, "productos")
+        os.makedirs(carpeta)
+        nombre = "productos/" + "a" * 64 + ".jpg"
+        with open(os.path.join(self.media, nombre), "wb") as archivo:
+            archivo.write(_jpeg().read())
+        producto = self._crear("Figura Vegetta")
+        listdir = almacenamiento_contenido.listdir
+
+        def listar_tras_subida(carpeta):
+            # Una subida idéntica reutiliza el archivo mientras el comando recorre la carpeta.
+            Producto.objects.filter(pk=producto.pk).update(imagen=nombre)
+            return listdir(carpeta)
+
+        with mock.patch.object(almacenamiento_contenido, "listdir", listar_tras_subida):
+            call_command("depurar_media", "--gracia", "0", stdout=StringIO(), stderr=StringIO())
+        self.assertIn(os.path.basename(nombre), self._archivos())
@@ -0,0 +1,31 @@
+import importlib.util
+import unittest
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import SimpleTestCase
+
+from core import assets
+
+HERRAMIENTAS = all(importlib.util.find_spec(m) for m in ("rjsmin", "rcssmin", "fontTools", "brotli", "fontawesomefree"))
+
+
+class AssetBundleTests(SimpleTestCase):
+    def test_pages_use_local_bundles_instead_of_cdns(self):
+        for plantilla, paquetes in (
+            ("templates/public/index.html", ("dist/index.css", "dist/index.js")),
+            ("templates/dashboards/dashboard_administrador.html", ("dist/admin.css", "dist/admin.js")),
+            ("templates/dashboards/dashboard_vendedor.html", ("dist/vendedor.css", "dist/vendedor.js")),
+        ):
+            texto = (assets._raiz_static().parent / plantilla).read_text(encoding="utf-8-sig")
+            self.assertNotIn("cdnjs.cloudflare.com", texto)
+            self.assertNotIn("cdn.jsdelivr.net/npm/chart.js", texto)
+            self.assertNotIn("?v=", texto)
+            for paquete in paquetes:
+                self.assertIn(f"{{% static '{paquete}' %}}", texto)
+                self.assertIn(paquete, assets.PAQUETES)
+
+    @unittest.skipUnless(HERRAMIENTAS, "faltan las herramientas de construcción de assets")
+    def test_committed_bundles_are_up_to_date(self):
+        # Falla si se cambió un script, una hoja o un ícono sin ejecutar construir_assets.
+        call_command("construir_assets", check=True, stdout=StringIO(), stderr=StringIO())
@@ -0,0 +1,82 @@
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from core.cache_paginas import MARCA_CSRF
+from core.models import Producto
+
+
+class AnonymousPageCacheTests(TestCase):
+    def setUp(self):
+        caches["paginas"].clear()
+        self.addCleanup(caches["paginas"].clear)
+        self.producto = Producto.objects.create(
+            nombre="Figura Gojo", marca="Bandai", calidad="Nuevo", precio=Decimal("14990"),
+            existencias=3, categoria="Figuras",
+        )
+
+    def test_repeated_anonymous_visits_skip_the_database(self):
+        self.client.get(reverse("index"), {"categoria": "Figuras"})
+
+        # Otro visitante, con parámetros de campaña y el orden por defecto explícito.
+        visitante = self.client_class(enforce_csrf_checks=True)
+        with self.assertNumQueries(0):
+            respuesta = visitante.get(reverse("index"), {"categoria": " Figuras ", "orden": "recientes", "utm_source": "ig"})
+        self.assertContains(respuesta, "Figura Gojo")
+        self.assertNotContains(respuesta, MARCA_CSRF)
+
+        # El token de la página guardada corresponde a la cookie de este visitante.
+        token = respuesta.content.decode().split('name="csrfmiddlewaretoken" value="')[1].split('"')[0]
+        self.assertIn("csrftoken", respuesta.cookies)
+        enviado = visitante.post(reverse("newsletter_suscribir"), {"email": "x@example.com", "csrfmiddlewaretoken": token})
+        self.assertNotEqual(enviado.status_code, 403)
+
+    def test_cached_detail_page_gives_each_visitor_a_valid_meta_token(self):
+        url = reverse("producto_detalle", args=[self.producto.pk])
+        primera = self.client.get(url).content.decode()
+
+        visitante = self.client_class(enforce_csrf_checks=True)
+        with self.assertNumQueries(0):
+            respuesta = visitante.get(url)
+        self.assertNotContains(respuesta, MARCA_CSRF)
+
+        # La meta "csrf-token" que usa el chatbot también es la de este visitante.
+        token = respuesta.content.decode().split('name="csrf-token" content="')[1].split('"')[0]
+        self.assertNotIn(token, primera)
+        enviado = visitante.post(
+            reverse("api_chatbot_ask"), '{"message": "hola"}',
+            content_type="application/json", headers={"X-CSRFToken": token},
+        )
+        self.assertNotEqual(enviado.status_code, 403)
+
+    def test_filters_logged_in_users_and_carts_bypass_the_cached_page(self):
+        self.client.get(reverse("index"))
+        with self.assertNumQueries(0):
+            self.client.get(reverse("index"))
+        self.assertNotContains(self.client.get(reverse("index"), {"marca": "Otra"}), "<h3>Figura Gojo</h3>")
+
+        sesion = self.client.session
+        sesion["cart"] = {str(self.producto.pk): 1}
+        sesion.save()
+        self.assertGreater(self._consultas(reverse("index")), 1)
+
+        self.client.force_login(User.objects.create_user("cliente"))
+        self.assertGreater(self._consultas(reverse("index")), 1)
+
+    def test_product_writes_invalidate_the_pages(self):
+        url = reverse("producto_detalle", args=[self.producto.pk])
+        self.client.get(url)
+        self.producto.nombre = "Figura Sukuna"
+        with self.captureOnCommitCallbacks(execute=True):
+            self.producto.save()
+        self.assertContains(self.client.get(url), "Figura Sukuna")
+
+    def _consultas(self, url):
+        with CaptureQueriesContext(connection) as consultas:
+            self.client.get(url)
+        return len(consultas)
@@ -0,0 +1,66 @@
+import json
+from decimal import Decimal
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from core import chatbot, chatbot_cache, chatbot_productos
+from core.models import Producto
+
+
+class ChatbotCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        chatbot_productos.invalidar()
+
+    def _preguntar(self, mensaje, **extra):
+        return self.client.post(
+            reverse("api_chatbot_ask"), json.dumps({"message": mensaje}), content_type="application/json", **extra
+        )
+
+    def test_repeated_question_is_answered_from_cache(self):
+        producto = Producto.objects.create(
+            nombre="Figura Gojo", marca="Bandai", calidad="Nuevo", precio=Decimal("1000"), existencias=1
+        )
+        chatbot_productos.invalidar()
+        with mock.patch.object(chatbot, "responder", wraps=chatbot.responder) as responder:
+            primera = self._preguntar("Hola").json()
+            segunda = self._preguntar("  HOLA ").json()
+            self.assertEqual(responder.call_count, 1)
+            self.assertEqual(primera["answer"], segunda["answer"])
+            self.assertIn("1 unidades", self._preguntar("figura gojo").json()["answer"])
+            self.assertEqual(responder.call_count, 2)
+
+            # Un cambio de stock solo invalida las respuestas que muestran productos.
+            producto.existencias = 4
+            with self.captureOnCommitCallbacks(execute=True):
+                producto.save()
+            self._preguntar("hola")
+            self.assertEqual(responder.call_count, 2)
+            self.assertIn("4 unidades", self._preguntar("figura gojo").json()["answer"])
+            self.assertEqual(responder.call_count, 3)
+
+    @override_settings(CHATBOT_LIMITE_CAPACIDAD=2, CHATBOT_LIMITE_RECARGA_SEGUNDOS=60)
+    def test_rate_limit_per_client(self):
+        self.assertEqual(self._preguntar("hola").status_code, 200)
+        self.assertEqual(self._preguntar("hola").status_code, 200)
+        bloqueada = self._preguntar("hola")
+        self.assertEqual(bloqueada.status_code, 429)
+        self.assertGreater(int(bloqueada["Retry-After"]), 0)
+        self.assertEqual(self._preguntar("hola", REMOTE_ADDR="10.0.0.2").status_code, 200)
+        self.assertEqual(chatbot_cache.identidad_cliente(bloqueada.wsgi_request), "ip:127.0.0.1")
+
+    @override_settings(PROXIES_CONFIABLES=["10.0.0.0/8"], CHATBOT_LIMITE_CAPACIDAD=1, CHATBOT_LIMITE_RECARGA_SEGUNDOS=60)
+    def test_rate_limit_uses_forwarded_ip_only_behind_trusted_proxy(self):
+        detras = {"REMOTE_ADDR": "10.1.2.3"}
+        self.assertEqual(self._preguntar("hola", HTTP_X_FORWARDED_FOR="203.0.113.7", **detras).status_code, 200)
+        # Otro cliente detrás del mismo proxy tiene su propia cubeta; uno que inventa la cabecera no.
+        self.assertEqual(self._preguntar("hola", HTTP_X_FORWARDED_FOR="198.51.100.9", **detras).status_code, 200)
+        falsa = self._preguntar("hola", HTTP_X_FORWARDED_FOR="1.1.1.1, 203.0.113.7", **detras)
+        self.assertEqual(falsa.status_code, 429)
+        self.assertEqual(chatbot_cache.identidad_cliente(falsa.wsgi_request), "ip:203.0.113.7")
+        directa = self._preguntar("hola", HTTP_X_FORWARDED_FOR="8.8.8.8", REMOTE_ADDR="192.0.2.1")
+        self.assertEqual(chatbot_cache.identidad_cliente(directa.wsgi_request), "ip:192.0.2.1")
@@ -21,3 +21,112 @@ class ChatbotCoreTests(SimpleTestCase):
     def test_special_response_help_triggers_role_help(self):
         response = chatbot._special_response("ayuda", user_role="vendedor")
         self.assertIn("dashboard", response.lower())
+
+    def test_role_help_message_lists_questions_not_dicts(self):
+        hint = chatbot._role_help_message("anonimo")
+        self.assertIn("¿Qué es EpicAnimes?", hint)
+        self.assertNotIn("'pregunta'", hint)
+
+    def test_special_phrases_match_whole_words(self):
+        self.assertIsNone(chatbot._special_response("¿Cómo valido facturas sospechosas?"))
+        self.assertIsNone(chatbot._special_response("hacen envíos a Holanda"))
+        self.assertIn("Hasta luego", chatbot._special_response("bueno, nos vemos"))
+
+    def test_phrase_automaton_finds_overlapping_phrases(self):
+        from core.chatbot_reglas import AutomataFrases
+
+        automata = AutomataFrases([(["nos", "vemos"], "a"), (["vemos"], "b"), (["como", "va"], "c")])
+        self.assertEqual(automata.buscar("bueno nos vemos".split()), {"a", "b"})
+        self.assertEqual(automata.buscar("como valido".split()), set())
+
+    def test_importing_views_does_not_load_tensorflow(self):
+        import subprocess
+        import sys
+        import textwrap
+
+        # Un tensorflow falso en sys.modules registra cualquier import o atributo pedido,
+        # así la prueba vale también donde TensorFlow no está instalado.
+        codigo = textwrap.dedent(
+            """
+            import builtins, sys, types
+
+            tocado = []
+
+            class Trampa(types.ModuleType):
+                def __getattr__(self, nombre):
+                    tocado.append(nombre)
+                    raise AttributeError(nombre)
+
+            sys.modules["tensorflow"] = Trampa("tensorflow")
+            importar = builtins.__import__
+
+            def vigilar(nombre, *args, **kwargs):
+                if nombre.partition(".")[0] == "tensorflow":
+                    tocado.append("import")
+                return importar(nombre, *args, **kwargs)
+
+            builtins.__import__ = vigilar
+            import django
+
+            django.setup()
+            import core.views
+            import EpicAnimes.urls
+            print(tocado)
+            """
+        )
+        salida = subprocess.run([sys.executable, "-c", codigo], capture_output=True, text=True, check=True)
+        self.assertEqual(salida.stdout.strip(), "[]")
+
+    def test_artifacts_are_keyed_by_faq_content(self):
+        import tempfile
+        from pathlib import Path
+
+        with tempfile.TemporaryDirectory() as tmp:
+            faq = Path(tmp) / "faq.txt"
+            faq.write_text("Pregunta: a\nRespuesta: b\n", encoding="utf-8")
+            primera = chatbot.huella_faq(faq)
+            self.assertEqual(primera, chatbot.huella_faq(faq))
+            faq.write_text("Pregunta: a\nRespuesta: c\n", encoding="utf-8")
+            self.assertNotEqual(primera, chatbot.huella_faq(faq))
+            self.assertEqual(chatbot.directorio_artefactos(primera).name, primera)
+
+    def test_numpy_classifier_matches_faq_reformulations(self):
+        from core.chatbot_intents import conjunto_evaluacion
+
+        preguntas, _ = chatbot._ensure_faq_cache()
+        clasificador = chatbot.entrenar_clasificador(preguntas)
+        casos = conjunto_evaluacion([chatbot._tokenize(p) for p in preguntas])
+        self.assertGreaterEqual(clasificador.precision(casos), 0.98)
+
+    def test_artifacts_roundtrip_without_retraining(self):
+        import tempfile
+
+        from django.test import override_settings
+
+        with tempfile.TemporaryDirectory() as tmp, override_settings(CHATBOT_MODEL_DIR=tmp):
+            destino = chatbot.entrenar_artefactos()
+            clasificador, respuestas = chatbot._cargar_artefactos(destino)
+            preguntas, esperadas = chatbot._ensure_faq_cache()
+            idx, confianza = clasificador.predecir(chatbot._tokenize(preguntas[3]))
+            self.assertEqual(respuestas[idx], esperadas[3])
+            self.assertGreater(confianza, 0.55)
+
+    def test_sparse_semantic_space_matches_dense_cosine(self):
+        import numpy as np
+
+        from core.chatbot_semantica import EspacioSemantico
+
+        documentos = [["envio", "gratis", "envio"], ["pago", "tarjeta"], ["envio", "tarjeta", "regalo"]]
+        espacio = EspacioSemantico.construir(documentos)
+        densa = np.zeros(espacio.matriz.shape)
+        for fila, tokens in enumerate(documentos):
+            indices, valores = espacio.vector(tokens)
+            densa[fila, indices] = valores
+        consultas = [["envio", "tarjeta"], ["desconocido"], ["pago"]]
+        esperadas = []
+        for tokens in consultas:
+            q = np.zeros(espacio.matriz.shape[1])
+            indices, valores = espacio.vector(tokens)
+            q[indices] = valores
+            esperadas.append(densa @ q)
+        np.testing.assert_allclose(espacio.similitudes_lote(consultas), np.array(esperadas))
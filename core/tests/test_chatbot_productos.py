@@ -0,0 +1,41 @@
+from decimal import Decimal
+
+from django.test import TestCase
+
+from core import chatbot, chatbot_productos
+from core.models import Producto
+
+
+class ChatbotProductIndexTests(TestCase):
+    def setUp(self):
+        Producto.objects.all().delete()
+        chatbot_productos.invalidar()
+        self.addCleanup(chatbot_productos.invalidar)
+        self.gojo = self._crear("Figura Gojo", "Figuras", 5)
+        self._crear("Poster Naruto", "Posters", 0)
+
+    def _crear(self, nombre, categoria, existencias):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Producto.objects.create(
+                nombre=nombre, marca="Bandai", calidad="Nuevo", precio=Decimal("1000"),
+                existencias=existencias, categoria=categoria,
+            )
+
+    def test_product_answer_uses_index_without_queries(self):
+        chatbot._product_answer("figura gojo", ["figura", "gojo"])
+        with self.assertNumQueries(0):
+            respuesta = chatbot._product_answer("precio figura gojo", ["precio", "figura", "gojo"])
+        self.assertIn(f"/producto/{self.gojo.pk}/", respuesta["answer"])
+
+    def test_signals_keep_index_current(self):
+        chatbot_productos.obtener_indice()
+        nuevo = self._crear("Taza Luffy", "Tazas", 9)
+        with self.assertNumQueries(0):
+            respuesta = chatbot._product_answer("taza luffy", ["taza", "luffy"])
+        self.assertIn(f"/producto/{nuevo.pk}/", respuesta["answer"])
+        self.assertEqual(chatbot._product_answer("recomiendame", ["recomiendame"])["answer"].count("Taza Luffy"), 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            nuevo.delete()
+        self.assertIsNone(chatbot._product_answer("taza luffy", ["taza", "luffy"]))
+        self.assertIn("Figura Gojo", chatbot._product_answer("recomiendame", ["recomiendame"])["answer"])
@@ -0,0 +1,88 @@
+import tempfile
+from decimal import Decimal
+from pathlib import Path
+from unittest import mock
+
+import pyarrow.parquet as pq
+from django.contrib.auth.models import User
+from django.test import TestCase
+
+from core import columnar
+from core.models import Producto, Vendedor, Venta
+
+
+class ColumnarExportTests(TestCase):
+    def setUp(self):
+        Producto.objects.all().delete()
+        vendedor = Vendedor.objects.create(usuario=User.objects.create_user("vend", password="x"))
+        self.producto = Producto.objects.create(
+            vendedor=vendedor,
+            nombre="Taza One Piece",
+            marca="Toei",
+            calidad="Nuevo",
+            precio=Decimal("7990"),
+            existencias=20,
+            categoria="Tazas",
+        )
+        self.vendedor = vendedor
+        for cantidad in range(1, 6):
+            Venta.objects.create(vendedor=vendedor, producto=self.producto, cantidad=cantidad)
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def test_parquet_roundtrip_keeps_types_and_watermark(self):
+        esquema = columnar.ESQUEMAS["venta"]
+        destino = str(Path(self.tmp.name) / "ventas.parquet")
+        filas, _, id_max = columnar.escribir_columnar(destino, esquema, Venta.objects.all(), batch_size=2)
+        self.assertEqual(filas, 5)
+
+        tabla = pq.read_table(destino)
+        self.assertEqual(tabla.num_rows, 5)
+        self.assertEqual(tabla.column("total").to_pylist()[0], Decimal("7990.00"))
+        self.assertEqual(columnar.leer_marca_agua(destino)[1], id_max)
+
+    def test_incremental_export_reads_only_new_rows(self):
+        esquema = columnar.ESQUEMAS["venta"]
+        previo = str(Path(self.tmp.name) / "ventas.arrow")
+        columnar.escribir_columnar(previo, esquema, Venta.objects.all(), "arrow")
+        _, ultimo_id = columnar.leer_marca_agua(previo, "arrow")
+
+        Venta.objects.create(vendedor=self.vendedor, producto=self.producto, cantidad=9)
+        qs = columnar.filtrar_incremental(esquema, Venta.objects.all(), despues_de_id=ultimo_id)
+        batches = list(columnar.iterar_record_batches(esquema, qs))
+        self.assertEqual(sum(batch.num_rows for batch in batches), 1)
+        self.assertEqual(batches[0].column(7).to_pylist(), [9])
+
+    def test_watermark_covers_exactly_the_rows_written(self):
+        esquema = columnar.ESQUEMAS["venta"]
+        original = columnar.iterar_record_batches
+
+        def con_venta_concurrente(*args, **kwargs):
+            Venta.objects.create(vendedor=self.vendedor, producto=self.producto, cantidad=7)
+            return original(*args, **kwargs)
+
+        destino = str(Path(self.tmp.name) / "ventas.parquet")
+        with mock.patch.object(columnar, "iterar_record_batches", con_venta_concurrente):
+            filas, _, id_max = columnar.escribir_columnar(destino, esquema, Venta.objects.all())
+        self.assertEqual(filas, 5)
+        self.assertEqual(max(pq.read_table(destino).column("id").to_pylist()), id_max)
+
+        # Sin registros nuevos la marca anterior se conserva en el archivo vacío.
+        vacio = str(Path(self.tmp.name) / "vacio.parquet")
+        qs = columnar.filtrar_incremental(esquema, Venta.objects.all(), despues_de_id=id_max + 1)
+        marca = columnar.leer_marca_agua(destino)
+        self.assertEqual(columnar.escribir_columnar(vacio, esquema, qs, marca_previa=marca)[0], 0)
+        self.assertEqual(columnar.leer_marca_agua(vacio), marca)
+
+    def test_admin_endpoint_streams_parquet(self):
+        self.client.force_login(User.objects.create_user("admin", password="x", is_staff=True))
+        resp = self.client.get("/api/admin/export/producto.parquet")
+        self.assertEqual(resp.status_code, 200)
+        destino = Path(self.tmp.name) / "productos.parquet"
+        destino.write_bytes(b"".join(resp.streaming_content))
+        self.assertEqual(pq.read_table(destino).column("nombre").to_pylist(), ["Taza One Piece"])
+
+    def test_admin_endpoint_rejects_impossible_dates(self):
+        self.client.force_login(User.objects.create_user("admin", password="x", is_staff=True))
+        resp = self.client.get("/api/admin/export/venta.parquet", {"desde": "2024-02-30"})
+        self.assertEqual(resp.status_code, 400)
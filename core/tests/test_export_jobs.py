@@ -0,0 +1,148 @@
+import json
+import os
+import shutil
+import tempfile
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from core import export_jobs
+from core.models import PostulacionVendedor, Producto, TrabajoExportacion, Vendedor, Venta
+
+
+class ExportJobTests(TestCase):
+    def setUp(self):
+        self.media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media, ignore_errors=True)
+        override = override_settings(MEDIA_ROOT=self.media)
+        override.enable()
+        self.addCleanup(override.disable)
+
+        Producto.objects.all().delete()
+        self.admin = User.objects.create_user("admin", password="x", is_staff=True)
+        self.vendedor = Vendedor.objects.create(usuario=User.objects.create_user("vend", password="x"))
+        self.producto = Producto.objects.create(
+            vendedor=self.vendedor,
+            nombre="Poster Naruto",
+            marca="Toei",
+            calidad="Nuevo",
+            precio=Decimal("500"),
+            existencias=10,
+            categoria="Posters",
+        )
+        for cantidad in (1, 2, 3):
+            Venta.objects.create(vendedor=self.vendedor, producto=self.producto, cantidad=cantidad)
+
+    def test_identical_requests_share_job_until_data_changes(self):
+        primero = export_jobs.encolar_exportacion(self.admin, "ventas_admin", "csv", {"days": "800"})
+        segundo = export_jobs.encolar_exportacion(self.admin, "ventas_admin", "csv", {"days": 800})
+        self.assertEqual(primero.pk, segundo.pk)
+
+        Venta.objects.create(vendedor=self.vendedor, producto=self.producto, cantidad=1)
+        tercero = export_jobs.encolar_exportacion(self.admin, "ventas_admin", "csv", {"days": "800"})
+        self.assertNotEqual(primero.pk, tercero.pk)
+
+    def test_editing_an_application_from_the_panel_changes_the_export(self):
+        postulacion = PostulacionVendedor.objects.create(nombre="Tienda Otaku", email="t@example.com")
+        primero = export_jobs.encolar_exportacion(self.admin, "postulaciones", "csv")
+
+        self.client.force_login(self.admin)
+        self.client.patch(
+            reverse("api_admin_postulaciones"),
+            json.dumps({"id": postulacion.pk, "estado": "contactado"}),
+            content_type="application/json",
+        )
+        segundo = export_jobs.encolar_exportacion(self.admin, "postulaciones", "csv")
+        self.assertNotEqual(primero.pk, segundo.pk)
+
+    def test_renames_and_moved_sales_change_the_sales_export(self):
+        anterior = export_jobs.encolar_exportacion(self.admin, "ventas_admin", "csv")
+
+        self.producto.nombre = "Poster Naruto Shippuden"
+        self.producto.save()
+        renombrado = export_jobs.encolar_exportacion(self.admin, "ventas_admin", "csv")
+        self.assertNotEqual(anterior.pk, renombrado.pk)
+
+        usuario = self.vendedor.usuario
+        usuario.username = "vend_nuevo"
+        usuario.save()
+        vendedor = export_jobs.encolar_exportacion(self.admin, "ventas_admin", "csv")
+        self.assertNotEqual(renombrado.pk, vendedor.pk)
+
+        otro = Producto.objects.create(
+            vendedor=self.vendedor,
+            nombre="Poster Bleach",
+            marca="Toei",
+            calidad="Nuevo",
+            precio=Decimal("500"),
+            existencias=1,
+            categoria="Posters",
+        )
+        propias = export_jobs.encolar_exportacion(self.vendedor.usuario, "ventas_vendedor", "csv", vendedor=self.vendedor)
+        venta = Venta.objects.filter(cantidad=1).get()
+        venta.producto = otro
+        venta.save()
+        movida = export_jobs.encolar_exportacion(self.vendedor.usuario, "ventas_vendedor", "csv", vendedor=self.vendedor)
+        self.assertNotEqual(propias.pk, movida.pk)
+
+    def test_worker_writes_artifact_and_download_serves_it(self):
+        trabajo = export_jobs.encolar_exportacion(self.admin, "ventas_admin", "csv")
+        procesado = export_jobs.procesar_siguiente()
+        self.assertEqual(procesado.pk, trabajo.pk)
+        self.assertEqual(procesado.estado, "listo")
+        self.assertEqual(procesado.filas, 3)
+        self.assertIsNone(export_jobs.procesar_siguiente())
+
+        self.client.force_login(self.admin)
+        estado = self.client.get(reverse("api_exportacion_estado", args=[trabajo.pk])).json()
+        self.assertEqual(estado["trabajo"]["estado"], "listo")
+        resp = self.client.get(estado["trabajo"]["descarga_url"])
+        contenido = b"".join(resp.streaming_content).decode("utf-8").splitlines()
+        self.assertEqual(contenido[0], "fecha,vendedor,producto,cantidad,total")
+        self.assertEqual(len(contenido), 4)
+
+    def test_worker_reclaims_jobs_abandoned_while_processing(self):
+        trabajo = export_jobs.encolar_exportacion(self.admin, "ventas_admin", "csv")
+        TrabajoExportacion.objects.filter(pk=trabajo.pk).update(estado="procesando", iniciado=timezone.now())
+        self.assertIsNone(export_jobs.procesar_siguiente())
+
+        atascado = timezone.now() - timedelta(minutes=export_jobs.ABANDONO_MINUTOS + 1)
+        TrabajoExportacion.objects.filter(pk=trabajo.pk).update(iniciado=atascado)
+        self.assertEqual(export_jobs.procesar_siguiente().estado, "listo")
+
+    def test_heartbeat_keeps_a_long_export_from_being_reclaimed(self):
+        export_jobs.encolar_exportacion(self.admin, "ventas_admin", "csv")
+        trabajo = export_jobs._tomar_pendiente()
+        atascado = timezone.now() - timedelta(minutes=export_jobs.ABANDONO_MINUTOS + 1)
+        TrabajoExportacion.objects.filter(pk=trabajo.pk).update(iniciado=atascado)
+        trabajo.iniciado = atascado
+
+        with mock.patch.object(export_jobs, "LATIDO_SEGUNDOS", 0):
+            export_jobs._Latido(trabajo)()
+        self.assertIsNone(export_jobs.procesar_siguiente())
+
+    def test_worker_discards_its_file_when_the_job_was_reclaimed(self):
+        export_jobs.encolar_exportacion(self.admin, "ventas_admin", "csv")
+        trabajo = export_jobs._tomar_pendiente()
+        # Otro worker lo dio por abandonado y lo retomó mientras este escribía.
+        TrabajoExportacion.objects.filter(pk=trabajo.pk).update(iniciado=timezone.now() + timedelta(seconds=1))
+
+        resultado = export_jobs.procesar_trabajo(trabajo)
+        self.assertEqual(resultado.estado, "procesando")
+        self.assertFalse(resultado.archivo)
+        self.assertEqual(os.listdir(os.path.join(self.media, "exportaciones")), [])
+
+    def test_create_endpoint_requires_admin_for_global_datasets(self):
+        self.client.force_login(self.vendedor.usuario)
+        resp = self.client.post(
+            reverse("api_exportaciones_crear"),
+            data=json.dumps({"tipo": "ventas_admin", "formato": "xlsx"}),
+            content_type="application/json",
+        )
+        self.assertEqual(resp.status_code, 403)
+        self.assertFalse(TrabajoExportacion.objects.exists())
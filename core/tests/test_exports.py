@@ -0,0 +1,72 @@
+from datetime import date
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+
+from core import exports
+from core.models import Producto, Vendedor, Venta
+
+
+class StreamingExportTests(TestCase):
+    def setUp(self):
+        Producto.objects.all().delete()
+        self.vendedor = Vendedor.objects.create(usuario=User.objects.create_user("vend", password="x"))
+        self.producto = Producto.objects.create(
+            vendedor=self.vendedor,
+            nombre="Figura Gojo",
+            marca="Bandai",
+            calidad="Nuevo",
+            precio=Decimal("1000"),
+            existencias=50,
+            categoria="Figuras",
+        )
+        for dia in (3, 1, 2, 1, 3, 2, 1):
+            venta = Venta.objects.create(vendedor=self.vendedor, producto=self.producto, cantidad=dia)
+            Venta.objects.filter(pk=venta.pk).update(fecha_venta=date(2025, 1, dia))
+
+    def test_iterar_valores_matches_ordered_queryset_across_batches(self):
+        esperado = list(Venta.objects.order_by("fecha_venta", "vendedor_id", "id").values_list("id"))
+        obtenido = list(
+            exports.iterar_valores(Venta.objects.all(), ("id",), ("fecha_venta", "vendedor_id", "id"), batch_size=2)
+        )
+        self.assertEqual(obtenido, esperado)
+
+    def test_iterar_valores_supports_descending_keys(self):
+        esperado = list(Venta.objects.order_by("-fecha_venta", "-id").values_list("id"))
+        obtenido = list(exports.iterar_valores(Venta.objects.all(), ("id",), ("-fecha_venta", "-id"), batch_size=3))
+        self.assertEqual(obtenido, esperado)
+
+    def test_respuesta_csv_streams_header_and_rows(self):
+        resp = exports.respuesta_csv(
+            "ventas.csv",
+            ["fecha", "vendedor", "producto", "cantidad", "total"],
+            exports.filas_ventas_admin(Venta.objects.all()),
+        )
+        self.assertTrue(resp.streaming)
+        lineas = b"".join(resp.streaming_content).decode("utf-8").splitlines()
+        self.assertEqual(lineas[0], "fecha,vendedor,producto,cantidad,total")
+        self.assertEqual(len(lineas), 8)
+        self.assertEqual(lineas[1], "2025-01-01,vend,Figura Gojo,1,1000.00")
+
+    def test_filtrar_rango_fechas_uses_from_and_to(self):
+        qs = exports.filtrar_rango_fechas(Venta.objects.all(), {"from": "2025-01-02", "to": "2025-01-02"}, "fecha_venta")
+        self.assertEqual(qs.count(), 2)
+
+    def test_respuesta_xlsx_writes_readable_workbook(self):
+        from io import BytesIO
+
+        from openpyxl import load_workbook
+
+        resp = exports.respuesta_xlsx(
+            "ventas.xlsx",
+            "Ventas",
+            ["Fecha", "Producto", "Cantidad", "Total"],
+            exports.filas_ventas_vendedor(Venta.objects.filter(vendedor=self.vendedor)),
+        )
+        self.assertEqual(resp["Content-Type"], exports.XLSX_CONTENT_TYPE)
+        wb = load_workbook(BytesIO(b"".join(resp.streaming_content)), read_only=True)
+        filas = list(wb["Ventas"].iter_rows(values_only=True))
+        self.assertEqual(filas[0], ("Fecha", "Producto", "Cantidad", "Total"))
+        self.assertEqual(len(filas), 8)
+        self.assertEqual(filas[1][3], 1000)
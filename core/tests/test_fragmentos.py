@@ -0,0 +1,50 @@
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.cache import caches
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from core.exports import DATASETS
+from core.models import Producto, Vendedor
+from django.contrib.auth.models import User
+
+
+# Sin la caché de páginas completas (core.cache_paginas) para ver solo la de fragmentos.
+@override_settings(CACHES={**settings.CACHES, "paginas": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}})
+class ProductFragmentCacheTests(TestCase):
+    def setUp(self):
+        caches["fragmentos"].clear()
+        self.addCleanup(caches["fragmentos"].clear)
+        self.producto = Producto.objects.create(
+            nombre="Figura Gojo", marca="Bandai", calidad="Nuevo", precio=Decimal("14990"),
+            existencias=3, categoria="Figuras",
+        )
+
+    def test_catalog_card_is_reused_until_the_product_changes(self):
+        self.assertContains(self.client.get(reverse("index")), "Figura Gojo")
+
+        # Un UPDATE que no toca `actualizado` no invalida: la tarjeta sale del caché.
+        Producto.objects.filter(pk=self.producto.pk).update(nombre="Figura Sukuna")
+        self.assertContains(self.client.get(reverse("index")), "Figura Gojo")
+
+        self.producto.refresh_from_db()
+        self.producto.save()
+        respuesta = self.client.get(reverse("index"))
+        self.assertContains(respuesta, "Figura Sukuna")
+        self.assertNotContains(respuesta, "Figura Gojo")
+
+    def test_stock_changes_bump_the_version_of_cards_and_exports(self):
+        vendedor = Vendedor.objects.create(usuario=User.objects.create_user("vendedor"))
+        Producto.objects.filter(pk=self.producto.pk).update(vendedor=vendedor)
+        dataset = DATASETS["inventario"]
+        qs = dataset.consulta({}, vendedor)
+        antes = (Producto.objects.get(pk=self.producto.pk).actualizado, dataset.version_datos(qs))
+
+        # Mismas sumas de stock y precio, pero el producto cambió.
+        self.producto.refresh_from_db()
+        self.producto.nombre = "Figura Gojo (edición especial)"
+        self.producto.save()
+        despues = (Producto.objects.get(pk=self.producto.pk).actualizado, dataset.version_datos(qs))
+        self.assertGreater(despues[0], antes[0])
+        self.assertNotEqual(despues[1], antes[1])
@@ -0,0 +1,108 @@
+import shutil
+import tempfile
+from decimal import Decimal
+from io import BytesIO, StringIO
+from unittest import mock
+
+from django.core.exceptions import ValidationError
+from django.core.management import call_command
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from PIL import Image
+
+from core import imagenes
+from core.importers import catalogo_actualizado
+from core.models import Producto
+
+
+def _png(ancho=1200, alto=900):
+    salida = BytesIO()
+    Image.new("RGB", (ancho, alto), (200, 30, 60)).save(salida, "PNG")
+    return SimpleUploadedFile("goku.png", salida.getvalue(), content_type="image/png")
+
+
+class ImageVariantTests(TestCase):
+    def setUp(self):
+        self.media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media, ignore_errors=True)
+        override = override_settings(MEDIA_ROOT=self.media)
+        override.enable()
+        self.addCleanup(override.disable)
+        imagenes._EXISTENTES.clear()
+
+    def _crear(self, **extra):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Producto.objects.create(
+                nombre="Figura Goku", marca="Bandai", calidad="Nuevo", precio=Decimal("1000"), existencias=3, **extra
+            )
+
+    def test_upload_generates_webp_variants_next_to_original(self):
+        producto = self._crear(imagen=_png())
+        storage = producto.imagen.storage
+        for variante in ("miniatura", "tarjeta", "detalle"):
+            nombre = imagenes.nombre_variante(producto.imagen.name, variante)
+            self.assertTrue(storage.exists(nombre))
+            with storage.open(nombre) as archivo, Image.open(archivo) as img:
+                self.assertEqual(img.format, "WEBP")
+                self.assertLessEqual(max(img.size), imagenes.VARIANTES[variante][0])
+        self.assertTrue(
+            imagenes.url_variante(producto.imagen, "tarjeta").endswith(".tarjeta.webp")
+        )
+
+        resp = self.client.get(reverse("producto_detalle", args=[producto.pk]))
+        self.assertContains(resp, ".detalle.webp")
+
+    def test_missing_variant_falls_back_to_original(self):
+        producto = self._crear()
+        self.assertEqual(imagenes.url_variante(producto.imagen, "tarjeta", "/static/x.png"), "/static/x.png")
+        producto.imagen.save("naruto.png", _png(), save=False)
+        self.assertEqual(imagenes.url_variante(producto.imagen, "tarjeta"), producto.imagen.url)
+
+    def test_command_bumps_products_that_get_new_variants(self):
+        producto = self._crear()
+        producto.imagen.save("naruto.png", _png(), save=False)
+        Producto.objects.filter(pk=producto.pk).update(imagen=producto.imagen.name)
+        sin_imagen = self._crear()
+        antes = {p.pk: p.actualizado for p in Producto.objects.all()}
+        # Los productos sembrados por las migraciones apuntan a imágenes que no están en MEDIA_ROOT.
+        sin_archivo = Producto.objects.exclude(imagen="").exclude(pk=producto.pk).count()
+
+        avisos = []
+        receptor = lambda **kwargs: avisos.append(kwargs["sender"])  # noqa: E731
+        catalogo_actualizado.connect(receptor)
+        self.addCleanup(catalogo_actualizado.disconnect, receptor)
+        salida, errores = StringIO(), StringIO()
+        call_command("generar_miniaturas", stdout=salida, stderr=errores)
+        self.assertIn(f"{sin_archivo} imágenes con errores", salida.getvalue())
+        self.assertEqual(len(errores.getvalue().splitlines()), sin_archivo)
+
+        self.assertGreater(Producto.objects.get(pk=producto.pk).actualizado, antes[producto.pk])
+        self.assertEqual(Producto.objects.get(pk=sin_imagen.pk).actualizado, antes[sin_imagen.pk])
+        self.assertEqual(len(avisos), 1)
+
+        # Sin variantes nuevas no se toca el catálogo.
+        call_command("generar_miniaturas", stdout=StringIO(), stderr=StringIO())
+        self.assertEqual(len(avisos), 1)
+
+    def test_upload_is_decoded_once_and_exif_is_applied(self):
+        exif = Image.Exif()
+        exif[0x0112] = 6  # rotar 90°: la imagen de 400x200 se ve de 200x400
+        salida = BytesIO()
+        Image.new("RGB", (400, 200), (0, 90, 200)).save(salida, "JPEG", exif=exif)
+        subida = SimpleUploadedFile("foto.jpg", salida.getvalue(), content_type="image/jpeg")
+
+        with mock.patch("PIL.Image.open", wraps=Image.open) as abrir:
+            producto = self._crear(imagen=imagenes.procesar_imagen(subida, max_mb=2, max_ancho=1200, max_alto=1200))
+        self.assertEqual(abrir.call_count, 1)
+        with producto.imagen.open("rb") as archivo, Image.open(archivo) as guardada:
+            self.assertEqual(guardada.size, (200, 400))
+            self.assertFalse(guardada.getexif())
+        self.assertTrue(producto.imagen.storage.exists(imagenes.nombre_variante(producto.imagen.name, "tarjeta")))
+
+    def test_processing_rejects_oversized_or_invalid_files(self):
+        with self.assertRaisesMessage(ValidationError, "como máximo 1200x1200"):
+            imagenes.procesar_imagen(_png(1600, 900), max_mb=2, max_ancho=1200, max_alto=1200)
+        texto = SimpleUploadedFile("falsa.png", b"no soy una imagen", content_type="image/png")
+        with self.assertRaisesMessage(ValidationError, "No pude leer la imagen"):
+            imagenes.procesar_imagen(texto, max_mb=2, max_ancho=1200, max_alto=1200)
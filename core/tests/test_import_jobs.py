@@ -0,0 +1,87 @@
+import shutil
+import tempfile
+from datetime import timedelta
+
+from django.contrib.auth.models import Group, User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from core import import_jobs
+from core.importers import catalogo_actualizado
+from core.models import Producto, TrabajoImportacion, Vendedor
+
+
+@override_settings(IMPORTACIONES_EN_SEGUNDO_PLANO=True)
+class ImportJobTests(TestCase):
+    def setUp(self):
+        self.media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media, ignore_errors=True)
+        override = override_settings(MEDIA_ROOT=self.media)
+        override.enable()
+        self.addCleanup(override.disable)
+
+        Producto.objects.all().delete()
+        usuario = User.objects.create_user("vend", password="x")
+        usuario.groups.add(Group.objects.get_or_create(name="Vendedores")[0])
+        self.vendedor = Vendedor.objects.create(usuario=usuario)
+        self.client.force_login(usuario)
+
+    def _subir(self, contenido, nombre="productos.csv"):
+        archivo = SimpleUploadedFile(nombre, contenido.encode("utf-8"))
+        resp = self.client.post(reverse("api_importaciones_crear"), {"file": archivo})
+        self.assertEqual(resp.status_code, 202)
+        return resp.json()["trabajo"]
+
+    def test_upload_is_queued_and_worker_reports_progress(self):
+        trabajo = self._subir("nombre,precio\nPoster Zoro,4990\nTaza Nami,abc\nPoster Sanji,5990\n")
+        self.assertEqual(trabajo["estado"], "pendiente")
+        self.assertFalse(Producto.objects.exists())
+
+        avisos = []
+        receptor = lambda **kwargs: avisos.append(kwargs["vendedor"])  # noqa: E731
+        catalogo_actualizado.connect(receptor)
+        self.addCleanup(catalogo_actualizado.disconnect, receptor)
+        with self.captureOnCommitCallbacks(execute=True):
+            import_jobs.procesar_siguiente()
+
+        data = self.client.get(trabajo["estado_url"]).json()["trabajo"]
+        self.assertEqual(data["estado"], "listo")
+        self.assertEqual((data["filas"], data["creados"], data["total_errores"]), (3, 2, 1))
+        self.assertEqual(data["errores"][0]["fila"], 3)
+        self.assertEqual(avisos, [self.vendedor])
+
+    def test_strict_job_rolls_back_and_fails(self):
+        trabajo = self._subir("nombre,precio\nPoster Zoro,4990\nTaza Nami,abc\n")
+        import_jobs.procesar_siguiente()
+        estado = TrabajoImportacion.objects.get(pk=trabajo["id"])
+        self.assertEqual(estado.estado, "listo")
+
+        archivo = SimpleUploadedFile("productos.csv", b"nombre,precio\nTaza Nami,abc\n")
+        resp = self.client.post(reverse("api_importaciones_crear"), {"file": archivo, "estricto": "1"})
+        import_jobs.procesar_siguiente()
+        estricto = TrabajoImportacion.objects.get(pk=resp.json()["trabajo"]["id"])
+        self.assertEqual((estricto.estado, estricto.total_errores), ("error", 1))
+        self.assertFalse(Producto.objects.filter(nombre="Taza Nami").exists())
+
+    def test_jobs_abandoned_while_processing_are_failed(self):
+        trabajo = self._subir("nombre,precio\nPoster Zoro,4990\n")
+        atascado = timezone.now() - timedelta(minutes=import_jobs.ABANDONO_MINUTOS + 1)
+        TrabajoImportacion.objects.filter(pk=trabajo["id"]).update(estado="procesando", iniciado=atascado)
+        self.assertIsNone(import_jobs.procesar_siguiente())
+        data = self.client.get(trabajo["estado_url"]).json()["trabajo"]
+        self.assertEqual(data["estado"], "error")
+
+    def test_status_is_private_to_the_vendor(self):
+        trabajo = self._subir("nombre,precio\nPoster Zoro,4990\n")
+        self.client.force_login(User.objects.create_user("otro", password="x"))
+        self.assertEqual(self.client.get(trabajo["estado_url"]).status_code, 404)
+
+    @override_settings(IMPORTACIONES_EN_SEGUNDO_PLANO=False)
+    def test_without_worker_the_upload_is_processed_in_the_request(self):
+        archivo = SimpleUploadedFile("productos.csv", b"nombre,precio\nPoster Zoro,4990\n")
+        resp = self.client.post(reverse("api_importaciones_crear"), {"file": archivo})
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual((resp.json()["trabajo"]["estado"], resp.json()["trabajo"]["creados"]), ("listo", 1))
+        self.assertTrue(Producto.objects.filter(nombre="Poster Zoro").exists())
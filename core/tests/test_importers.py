@@ -0,0 +1,90 @@
+from decimal import Decimal
+from io import BytesIO
+
+from django.contrib.auth.models import Group, User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase
+from django.urls import reverse
+
+from core.importers import ImportadorProductos, leer_csv, mapear_encabezados
+from core.models import Producto, Vendedor
+
+
+class ProductImportTests(TestCase):
+    def setUp(self):
+        Producto.objects.all().delete()
+        usuario = User.objects.create_user("vend", password="x")
+        usuario.groups.add(Group.objects.get_or_create(name="Vendedores")[0])
+        self.vendedor = Vendedor.objects.create(usuario=usuario)
+
+    def _importar(self, contenido, **kwargs):
+        importador = ImportadorProductos(self.vendedor, batch_size=2, **kwargs)
+        return importador.importar_tabla(leer_csv(BytesIO(contenido.encode("utf-8"))))
+
+    def test_headers_map_accents_and_aliases(self):
+        self.assertEqual(
+            mapear_encabezados(["Nombre", "Categoría", "Stock", "Descripción", "otra"]),
+            ["nombre", "categoria", "existencias", "descripcion", None],
+        )
+
+    def test_upserts_by_name_and_brand_and_reports_bad_rows(self):
+        Producto.objects.create(
+            vendedor=self.vendedor, nombre="Figura Luffy", marca="Bandai", calidad="Nuevo",
+            precio=Decimal("100"), existencias=1, categoria="Figuras",
+        )
+        resultado = self._importar(
+            "nombre;marca;precio;existencias\n"
+            "figura luffy;BANDAI;15990;7\n"
+            "Poster Zoro;Toei;4990;3\n"
+            "Taza Nami;Toei;abc;2\n"
+            "Llavero Chopper;Toei;1990;-1\n"
+            "Poster Sanji;Toei;5990;\n"
+        )
+        self.assertEqual((resultado.creados, resultado.actualizados, resultado.total_errores), (2, 1, 2))
+        self.assertEqual([e["fila"] for e in resultado.errores], [4, 5])
+        luffy = Producto.objects.get(nombre__iexact="figura luffy")
+        self.assertEqual((luffy.precio, luffy.existencias), (Decimal("15990.00"), 7))
+        self.assertEqual(Producto.objects.get(nombre="Poster Sanji").existencias, 0)
+        self.assertFalse(Producto.objects.filter(nombre="Taza Nami").exists())
+
+    def test_reimport_only_writes_changed_rows(self):
+        contenido = "nombre,marca,precio,existencias\nPoster Zoro,Toei,4990,3\nPoster Sanji,Toei,5990,3\n"
+        self._importar(contenido)
+        resultado = self._importar(contenido.replace("Sanji,Toei,5990,3", "Sanji,Toei,5990,8"))
+        self.assertEqual((resultado.creados, resultado.actualizados, resultado.sin_cambios), (0, 1, 1))
+        self.assertEqual(Producto.objects.get(nombre="Poster Sanji").existencias, 8)
+
+    def test_strict_mode_rolls_back_everything(self):
+        resultado = self._importar("nombre,precio\nPoster Zoro,4990\nTaza Nami,abc\n", estricto=True)
+        self.assertEqual(resultado.total_errores, 1)
+        self.assertFalse(Producto.objects.exists())
+
+    def test_endpoint_returns_json_report(self):
+        self.client.force_login(self.vendedor.usuario)
+        archivo = SimpleUploadedFile("productos.csv", "nombre,precio\nPoster Zoro,4990\n,10\nTaza,x\n".encode("utf-8"))
+        resp = self.client.post(reverse("api_vendedor_importar"), {"file": archivo})
+        data = resp.json()
+        self.assertTrue(data["ok"])
+        self.assertEqual(data["creados"], 1)
+        self.assertEqual(data["total_errores"], 2)
+
+    def test_excel_endpoint_uses_shared_mapping(self):
+        from openpyxl import Workbook
+
+        wb = Workbook()
+        wb.active.append(["Nombre", "Categoría", "Precio", "Stock"])
+        wb.active.append(["Poster Zoro", "Posters", 4990, 3])
+        wb.active.append(["Taza Nami", "Tazas", "abc", 1])
+        buffer = BytesIO()
+        wb.save(buffer)
+        self.client.force_login(self.vendedor.usuario)
+        archivo = SimpleUploadedFile("productos.xlsx", buffer.getvalue())
+        data = self.client.post(reverse("api_vendedor_importar_excel"), {"file": archivo}).json()
+        self.assertEqual((data["creados"], data["total_errores"]), (1, 1))
+        self.assertEqual(Producto.objects.get(nombre="Poster Zoro").categoria, "Posters")
+
+    def test_excel_endpoint_rejects_invalid_file(self):
+        self.client.force_login(self.vendedor.usuario)
+        archivo = SimpleUploadedFile("productos.xlsx", b"no es un zip")
+        resp = self.client.post(reverse("api_vendedor_importar_excel"), {"file": archivo})
+        self.assertEqual(resp.status_code, 400)
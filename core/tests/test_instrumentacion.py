@@ -0,0 +1,82 @@
+from io import BytesIO
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.http import FileResponse, StreamingHttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import resolve, reverse
+
+from core import instrumentacion
+
+
+class ViewInstrumentationTests(TestCase):
+    def setUp(self):
+        instrumentacion.reiniciar()
+        self.addCleanup(instrumentacion.reiniciar)
+
+    def test_requests_are_aggregated_per_view(self):
+        for _ in range(3):
+            self.client.get(reverse("producto_detalle", args=[999]))
+        self.client.get("/media/no-existe.jpg")
+
+        datos = instrumentacion.resumen()
+        self.assertEqual(list(datos), ["producto_detalle"])
+        detalle = datos["producto_detalle"]
+        self.assertEqual(detalle["solicitudes"], 3)
+        self.assertGreaterEqual(detalle["consultas"]["p50"], 1)
+        self.assertGreater(detalle["bytes"]["max"], 0)
+        self.assertLessEqual(detalle["db_ms"]["max"], detalle["total_ms"]["max"])
+
+    @override_settings(INSTRUMENTACION_PRESUPUESTOS={"producto_detalle": 0})
+    def test_exceeding_the_query_budget_logs_a_warning(self):
+        with self.assertLogs("core.instrumentacion", "WARNING") as registros:
+            self.client.get(reverse("producto_detalle", args=[999]))
+        self.assertIn("PRESUPUESTO DE CONSULTAS EXCEDIDO en producto_detalle", registros.output[0])
+        self.assertEqual(instrumentacion.resumen()["producto_detalle"]["presupuesto_excedido"], 1)
+
+    def test_streaming_responses_are_measured_until_they_are_sent(self):
+        self.client.force_login(User.objects.create_user("admin", is_staff=True))
+        respuesta = self.client.get(reverse("export_admin_ventas_csv"))
+        self.assertNotIn("export_admin_ventas_csv", instrumentacion.resumen())
+
+        # Las ventas se leen recién al recorrer el iterador; esas consultas también cuentan.
+        with CaptureQueriesContext(connection) as al_enviar:
+            contenido = b"".join(respuesta.streaming_content)
+        self.assertGreater(len(al_enviar), 0)
+        datos = instrumentacion.resumen()["export_admin_ventas_csv"]
+        self.assertEqual(datos["bytes"]["max"], len(contenido))
+        self.assertGreater(datos["consultas"]["max"], len(al_enviar))
+
+    def _atender(self, respuesta):
+        # Middleware sin servidor de por medio: la prueba decide cuándo se recorre y se cierra.
+        peticion = RequestFactory().get(reverse("export_admin_ventas_csv"))
+
+        def vista(request):
+            request.resolver_match = resolve(request.path)
+            return respuesta
+
+        return instrumentacion.InstrumentacionMiddleware(vista)(peticion)
+
+    def test_file_responses_keep_the_file_for_sendfile(self):
+        respuesta = self._atender(FileResponse(BytesIO(b"xlsx" * 10)))
+        self.assertIsNotNone(respuesta.file_to_stream)
+        self.assertNotIn("export_admin_ventas_csv", instrumentacion.resumen())
+
+        respuesta.close()
+        self.assertEqual(instrumentacion.resumen()["export_admin_ventas_csv"]["bytes"]["max"], 40)
+
+    def test_streams_closed_before_the_first_chunk_are_recorded(self):
+        self._atender(StreamingHttpResponse(iter([b"a", b"b"]))).close()
+        datos = instrumentacion.resumen()["export_admin_ventas_csv"]
+        self.assertEqual(datos["solicitudes"], 1)
+        self.assertEqual(datos["bytes"]["max"], 0)
+
+    def test_endpoint_is_staff_only(self):
+        self.client.force_login(User.objects.create_user("cliente"))
+        self.assertEqual(self.client.get(reverse("api_admin_instrumentacion")).status_code, 403)
+
+        self.client.force_login(User.objects.create_user("admin", is_staff=True))
+        datos = self.client.get(reverse("api_admin_instrumentacion")).json()
+        self.assertIn("api_admin_instrumentacion", datos["vistas"])
+        self.assertEqual(datos["presupuestos"]["index"], 20)
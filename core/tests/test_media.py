@@ -0,0 +1,86 @@
+import gzip
+import os
+import shutil
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from core.media import CACHE_INMUTABLE
+
+HASH = "0123456789abcdef0123456789abcdef"
+
+
+class MediaServingTests(TestCase):
+    def setUp(self):
+        self.media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media, ignore_errors=True)
+        override = override_settings(MEDIA_ROOT=self.media, MEDIA_ENVIO_INTERNO="")
+        override.enable()
+        self.addCleanup(override.disable)
+        os.makedirs(os.path.join(self.media, "productos"))
+        self.contenido = bytes(range(256)) * 4
+        for nombre in (f"{HASH}.jpeg", f"{HASH}.tarjeta.webp"):
+            with open(os.path.join(self.media, "productos", nombre), "wb") as archivo:
+                archivo.write(self.contenido)
+
+    def _contenido(self, respuesta):
+        return b"".join(respuesta.streaming_content) if respuesta.streaming else respuesta.content
+
+    def test_hashed_originals_are_immutable_and_revalidate_with_304(self):
+        respuesta = self.client.get(f"/media/productos/{HASH}.jpeg")
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertEqual(respuesta["Cache-Control"], CACHE_INMUTABLE)
+        self.assertEqual(respuesta["ETag"], f'"{HASH}"')
+        self.assertEqual(respuesta["Content-Type"], "image/jpeg")
+        self.assertEqual(self._contenido(respuesta), self.contenido)
+        self.assertNotIn("sessionid", respuesta.cookies)
+
+        respuesta = self.client.get(f"/media/productos/{HASH}.jpeg", headers={"if-none-match": f'"{HASH}"'})
+        self.assertEqual(respuesta.status_code, 304)
+
+        variante = self.client.get(f"/media/productos/{HASH}.tarjeta.webp")
+        self.assertNotIn("immutable", variante["Cache-Control"])
+        self.assertTrue(variante["ETag"].startswith('"') and not variante["ETag"].startswith("W/"))
+
+    def test_byte_ranges(self):
+        url = f"/media/productos/{HASH}.jpeg"
+        respuesta = self.client.get(url, headers={"range": "bytes=10-19"})
+        self.assertEqual(respuesta.status_code, 206)
+        self.assertEqual(respuesta["Content-Range"], f"bytes 10-19/{len(self.contenido)}")
+        self.assertEqual(self._contenido(respuesta), self.contenido[10:20])
+
+        respuesta = self.client.get(url, headers={"range": "bytes=-4"})
+        self.assertEqual(self._contenido(respuesta), self.contenido[-4:])
+
+        respuesta = self.client.get(url, headers={"range": "bytes=5000-"})
+        self.assertEqual(respuesta.status_code, 416)
+
+        respuesta = self.client.get(url, headers={"range": "bytes=0-9", "if-range": '"otro"'})
+        self.assertEqual(respuesta.status_code, 200)
+
+    def test_precompressed_variant_and_missing_files(self):
+        ruta = os.path.join(self.media, "productos", "catalogo.json")
+        with open(ruta, "w", encoding="utf-8") as archivo:
+            archivo.write('{"productos": []}' * 200)
+        call_command("comprimir_media", stdout=StringIO())
+
+        respuesta = self.client.get("/media/productos/catalogo.json", headers={"accept-encoding": "gzip, br;q=0"})
+        self.assertEqual(respuesta["Content-Encoding"], "gzip")
+        self.assertEqual(respuesta["Vary"], "Accept-Encoding")
+        self.assertEqual(gzip.decompress(self._contenido(respuesta)), b'{"productos": []}' * 200)
+
+        sin_gzip = self.client.get("/media/productos/catalogo.json")
+        self.assertNotIn("Content-Encoding", sin_gzip)
+        self.assertNotEqual(sin_gzip["ETag"], respuesta["ETag"])
+
+        self.assertEqual(self.client.get("/media/productos/no-existe.jpeg").status_code, 404)
+        self.assertEqual(self.client.get("/media/../EpicAnimes/settings.py").status_code, 404)
+
+    def test_private_folders_are_not_served(self):
+        os.makedirs(os.path.join(self.media, "exportaciones"))
+        with open(os.path.join(self.media, "exportaciones", "postulaciones_1.csv"), "w", encoding="utf-8") as archivo:
+            archivo.write("nombre,email\nAna,ana@example.com\n")
+        self.assertEqual(self.client.get("/media/exportaciones/postulaciones_1.csv").status_code, 404)
+        self.assertEqual(self.client.get(f"/media/{HASH}.jpeg").status_code, 404)
@@ -0,0 +1,78 @@
+import time
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from core.models import PerfilCliente
+from core.roles import ROL_TTL
+
+
+class LazyProfileTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.usuario = User.objects.create_user("cliente", password="x")
+        self.client.force_login(self.usuario)
+
+    def _consultas_perfil(self, url):
+        with CaptureQueriesContext(connection) as consultas:
+            respuesta = self.client.get(url)
+        return respuesta, [c["sql"] for c in consultas if "core_perfilcliente" in c["sql"]]
+
+    def test_rendering_pages_never_creates_the_profile(self):
+        respuesta, consultas = self._consultas_perfil(reverse("index"))
+        self.assertFalse(respuesta.context["perfil_cliente"])
+        self.assertEqual(len(consultas), 1)
+        self.client.get(reverse("editar_perfil"))
+        self.assertFalse(PerfilCliente.objects.exists())
+
+        # La sesión recuerda que no hay perfil.
+        self.assertEqual(self._consultas_perfil(reverse("index"))[1], [])
+
+    def test_profile_is_read_from_the_session_until_it_changes(self):
+        perfil = PerfilCliente.objects.create(user=self.usuario, nombre="Yuji")
+        self.client.get(reverse("index"))
+
+        respuesta, consultas = self._consultas_perfil(reverse("index"))
+        self.assertEqual(consultas, [])
+        self.assertEqual(respuesta.context["perfil_cliente"].nombre, "Yuji")
+
+        perfil.nombre = "Itadori"
+        perfil.save()
+        respuesta, consultas = self._consultas_perfil(reverse("index"))
+        self.assertEqual(len(consultas), 1)
+        self.assertEqual(respuesta.context["perfil_cliente"].nombre, "Itadori")
+
+    def test_cart_reuses_the_session_copy_on_a_cold_worker(self):
+        PerfilCliente.objects.create(user=self.usuario, nombre="Yuji")
+        # Sin renovaciones pendientes: ambos workers parten de la marca inicial.
+        cache.clear()
+        self.client.get(reverse("carrito"))
+        cache.clear()
+        respuesta, consultas = self._consultas_perfil(reverse("carrito"))
+        self.assertEqual(consultas, [])
+        self.assertEqual(respuesta.context["checkout_prefill"]["nombre"], "Yuji")
+
+    def test_session_copy_expires_after_the_ttl(self):
+        PerfilCliente.objects.create(user=self.usuario, nombre="Yuji")
+        self.client.get(reverse("index"))
+        # QuerySet.update() no publica una marca nueva; el TTL acota cuánto se ve el valor viejo.
+        PerfilCliente.objects.filter(user=self.usuario).update(nombre="Itadori")
+        self.assertEqual(self._consultas_perfil(reverse("index"))[0].context["perfil_cliente"].nombre, "Yuji")
+        with mock.patch("core.perfiles.time.time", return_value=time.time() + ROL_TTL + 1):
+            respuesta, consultas = self._consultas_perfil(reverse("index"))
+        self.assertEqual(len(consultas), 1)
+        self.assertEqual(respuesta.context["perfil_cliente"].nombre, "Itadori")
+
+    def test_signup_creates_the_profile(self):
+        self.client.logout()
+        self.client.post(
+            reverse("signup"),
+            {"username": "nuevo", "email": "nuevo@example.com", "password1": "Clave-Segura-123", "password2": "Clave-Segura-123", "terms": "on"},
+        )
+        self.assertEqual(PerfilCliente.objects.get(user__username="nuevo").email, "nuevo@example.com")
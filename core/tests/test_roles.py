@@ -0,0 +1,43 @@
+from django.contrib.auth.models import Group, User
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+
+class RoleResolutionTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.usuario = User.objects.create_user("cliente", password="x")
+        self.client.force_login(self.usuario)
+
+    def test_groups_are_queried_once_per_session(self):
+        self.assertRedirects(self.client.get(reverse("redireccion_usuario")), reverse("index"), fetch_redirect_response=False)
+
+        # Sesión y usuario; ni grupos ni perfil.
+        with self.assertNumQueries(2):
+            self.client.get(reverse("redireccion_usuario"))
+
+        with CaptureQueriesContext(connection) as consultas:
+            self.assertEqual(self.client.get(reverse("index")).context["rol_usuario"], "comprador")
+        self.assertFalse([c for c in consultas if "auth_user_groups" in c["sql"]])
+
+    def test_a_cold_worker_accepts_the_stored_role(self):
+        self.client.get(reverse("redireccion_usuario"))
+        # Otro worker con su propia caché local vacía: misma marca, ni grupos ni escrituras de sesión.
+        cache.clear()
+        with self.assertNumQueries(2):
+            self.client.get(reverse("redireccion_usuario"))
+
+    def test_group_changes_invalidate_the_stored_role(self):
+        self.client.get(reverse("redireccion_usuario"))
+
+        Group.objects.create(name="Vendedores").user_set.add(self.usuario)
+        self.assertRedirects(
+            self.client.get(reverse("redireccion_usuario")), reverse("dashboard_vendedor"), fetch_redirect_response=False
+        )
+
+        self.usuario.groups.clear()
+        self.assertRedirects(self.client.get(reverse("redireccion_usuario")), reverse("index"), fetch_redirect_response=False)
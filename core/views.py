@@ -7,6 +7,7 @@ from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
 from difflib import SequenceMatcher
 
 import json
+import math
 
 import unicodedata
 from urllib.parse import urlsplit
@@ -35,7 +36,6 @@ from django.core.mail import EmailMultiAlternatives, send_mail
 from django.core.validators import validate_email
 
 from django.core.cache import cache
-from django.core.files.images import get_image_dimensions
 
 from django.contrib.auth.password_validation import validate_password
 
@@ -93,7 +93,13 @@ from .payments import (
     get_paypal_conversion_rate,
     normalize_paypal_totals,
 )
-from .chatbot import responder as chatbot_responder
+from .cache_paginas import cache_anonima, casilla, distinto_de, texto
+from .chatbot_cache import consumir_consulta, identidad_cliente, responder_con_cache
+from .exports import DATASETS as EXPORT_DATASETS, respuesta_csv, respuesta_xlsx
+from .imagenes import procesar_imagen, url_variante
+from .importers import ExcelInvalido, ImportadorProductos, leer_csv, leer_excel
+from .perfiles import crear_perfil, perfil_de
+from .roles import es_vendedor, rol_de_usuario
 
 logger = logging.getLogger(__name__)
 
@@ -101,34 +107,34 @@ PRODUCT_IMAGE_MAX_MB = 2
 PRODUCT_IMAGE_MAX_WIDTH = 1200
 PRODUCT_IMAGE_MAX_HEIGHT = 1200
 
+# Filtros de la portada que cambian la página guardada para visitantes anónimos (core.cache_paginas).
+FILTROS_INDEX = {
+    "q": texto,
+    "categoria": texto,
+    "marca": texto,
+    "calidad": texto,
+    "precio_min": texto,
+    "precio_max": texto,
+    "en_stock": casilla,
+    "orden": distinto_de("recientes"),
+}
 
-def _validar_imagen_producto(imagen, *, max_mb=PRODUCT_IMAGE_MAX_MB, max_width=PRODUCT_IMAGE_MAX_WIDTH, max_height=PRODUCT_IMAGE_MAX_HEIGHT):
-    """Verifica el tamaño en MB y las dimensiones máximas permitidas para las imágenes de productos."""
-    if not imagen:
-        return
-    max_bytes = int(max_mb * 1024 * 1024)
-    if getattr(imagen, "size", 0) > max_bytes:
-        raise ValidationError(f"La imagen es muy pesada. Usa archivos de hasta {max_mb} MB.")
-    try:
-        imagen.seek(0)
-    except Exception:
-        pass
-    width, height = get_image_dimensions(imagen)
-    try:
-        imagen.seek(0)
-    except Exception:
-        pass
-    if not width or not height:
-        raise ValidationError("No pude leer la imagen. Usa formatos JPG o PNG válidos.")
-    if width > max_width or height > max_height:
-        raise ValidationError(f"La imagen debe medir como máximo {max_width}x{max_height} px.")
+
+def _procesar_imagen_producto(imagen, *, max_mb=PRODUCT_IMAGE_MAX_MB, max_width=PRODUCT_IMAGE_MAX_WIDTH, max_height=PRODUCT_IMAGE_MAX_HEIGHT):
+    """Valida peso, formato y dimensiones de la imagen de un producto y la deja lista para guardar.
+
+    Decodifica el archivo una sola vez (ver core.imagenes.procesar_imagen); las miniaturas
+    se generan después a partir de esa misma imagen.
+    """
+    return procesar_imagen(imagen, max_mb=max_mb, max_ancho=max_width, max_alto=max_height)
 
 
 @login_required
 @require_http_methods(["GET", "POST"])
 def editar_perfil(request):
     """Permite al cliente actualizar sus datos de contacto y contraseña."""
-    perfil, _ = PerfilCliente.objects.get_or_create(user=request.user)
+    # Sin perfil todavía (cuentas anteriores) se edita uno nuevo; se crea solo al guardar.
+    perfil = PerfilCliente.objects.filter(user=request.user).first() or PerfilCliente(user=request.user)
     perfil_form = PerfilClienteForm(instance=perfil)
     def _decorate_password_form(form):
         for field in form.fields.values():
@@ -307,6 +313,14 @@ def newsletter_suscribir(request):
 @require_http_methods(["POST"])
 def api_chatbot_ask(request):
     """Responde preguntas enviadas al chatbot con mensajes JSON."""
+    espera = consumir_consulta(identidad_cliente(request))
+    if espera:
+        response = JsonResponse(
+            {"ok": False, "error": "Estás enviando preguntas muy rápido. Espera unos segundos e intenta nuevamente."},
+            status=429,
+        )
+        response["Retry-After"] = str(math.ceil(espera))
+        return response
     rol_usuario = obtener_rol_usuario(request.user)
     try:
         payload = json.loads(request.body.decode("utf-8"))
@@ -318,7 +332,7 @@ def api_chatbot_ask(request):
         return JsonResponse({"ok": False, "error": "Por favor escribe una pregunta para que pueda ayudarte."}, status=400)
 
     try:
-        result = chatbot_responder(question, rol_usuario)
+        result = responder_con_cache(question, rol_usuario)
     except RuntimeError as exc:
         logger.warning("Chatbot temporalmente inhabilitado: %s", exc)
         return JsonResponse({"ok": False, "error": str(exc)}, status=503)
@@ -342,20 +356,8 @@ class CarritoError(Exception):
 
 def obtener_rol_usuario(user):
 
-    """Determina el rol actual del usuario autenticado."""
-    if not user.is_authenticated:
-
-        return "anonimo"
-
-    if user.is_superuser or user.is_staff:
-
-        return "administrador"
-
-    if user.groups.filter(name="Vendedores").exists():
-
-        return "vendedor"
-
-    return "comprador"
+    """Determina el rol actual del usuario autenticado (memorizado en el usuario, ver core.roles)."""
+    return rol_de_usuario(user)
 
 
 
@@ -779,7 +781,7 @@ def _build_cart_items(cart):
 
                 "sin_stock": producto.existencias < cantidad,
 
-                "imagen_url": producto.imagen.url if getattr(producto, "imagen", None) else default_image_url,
+                "imagen_url": url_variante(producto.imagen, "miniatura", default_image_url),
 
             }
 
@@ -911,7 +913,7 @@ def _smart_match_score(producto, query_tokens, query_full):
 
 
 @require_http_methods(["GET", "POST"])
-
+@cache_anonima(FILTROS_INDEX)
 def VistaIndex(request):
 
     """Construye la página principal con listados y destacados."""
@@ -1012,10 +1014,10 @@ def VistaIndex(request):
 
 
 
-    default_image_url = static("images/Imagen1.png")
+    # Las URLs de las miniaturas se resuelven en la plantilla, dentro del fragmento en caché
+    # de cada tarjeta, para no consultar el almacenamiento cuando la tarjeta ya está cacheada.
     now_date = timezone.now().date()
     for prod in productos:
-        prod.imagen_url = prod.imagen.url if getattr(prod, "imagen", None) else default_image_url
         try:
             prod.is_new = (now_date - (prod.fecha_ingreso or now_date)).days <= 14
         except Exception:
@@ -1121,6 +1123,8 @@ def VistaIndex(request):
 
                     user.groups.add(grupo_clientes)
 
+                    crear_perfil(user)
+
                 # Notificar por correo que la cuenta fue creada
                 try:
                     if user.email:
@@ -1154,6 +1158,7 @@ def VistaIndex(request):
     contexto = {
 
         "productos": productos,
+        "imagen_por_defecto": static("images/Imagen1.png"),
         "categorias": categorias,
         "marcas": marcas,
         "calidades": calidades,
@@ -1234,6 +1239,7 @@ def VistaContacto(request):
 
 
 
+@cache_anonima({})
 def VistaProductoDetalle(request, producto_id):
 
     """Presenta el detalle de un producto específico."""
@@ -1255,7 +1261,7 @@ def VistaProductoDetalle(request, producto_id):
 
 
 
-    producto.imagen_url = producto.imagen.url if getattr(producto, "imagen", None) else default_image_url
+    producto.imagen_url = url_variante(producto.imagen, "detalle", default_image_url)
 
     vendedor_nombre = None
 
@@ -1277,10 +1283,6 @@ def VistaProductoDetalle(request, producto_id):
 
     relacionados = list(relacionados_qs)
 
-    for rel in relacionados:
-
-        rel.imagen_url = rel.imagen.url if getattr(rel, "imagen", None) else default_image_url
-
 
 
     contexto = {
@@ -1291,6 +1293,8 @@ def VistaProductoDetalle(request, producto_id):
 
         "relacionados": relacionados,
 
+        "imagen_por_defecto": default_image_url,
+
         "rol_usuario": rol_usuario,
 
         "puede_comprar": rol_usuario == "comprador",
@@ -1387,6 +1391,8 @@ def VistaRegistro(request):
 
         u.groups.add(grupo_clientes)
 
+        crear_perfil(u)
+
         # Enviar correo de bienvenida al registrarse por este flujo simple
         try:
             if email:
@@ -1514,7 +1520,7 @@ def _procesar_compra(request, referencia_pago=None, datos_cliente=None, *, force
 
             producto.existencias -= cantidad
 
-            producto.save(update_fields=["existencias"])
+            producto.save(update_fields=["existencias", "actualizado"])
 
 
 
@@ -1597,15 +1603,9 @@ def VistaCarrito(request):
 
 
 
-    perfil_cliente = None
-
-    if request.user.is_authenticated:
-
-        perfil_cliente = getattr(request.user, "perfil_cliente", None)
-
-        if perfil_cliente is None:
+    # Copia del perfil en la sesión (core.perfiles); None para visitantes anónimos.
 
-            perfil_cliente = PerfilCliente.objects.filter(user=request.user).first()
+    perfil_cliente = perfil_de(request)
 
 
 
@@ -2355,6 +2355,7 @@ def VistaContacto(request):
 
 
 
+@cache_anonima({})
 def VistaProductoDetalle(request, producto_id):
 
     """Presenta el detalle de un producto específico."""
@@ -2376,7 +2377,7 @@ def VistaProductoDetalle(request, producto_id):
 
 
 
-    producto.imagen_url = producto.imagen.url if getattr(producto, "imagen", None) else default_image_url
+    producto.imagen_url = url_variante(producto.imagen, "detalle", default_image_url)
 
     vendedor_nombre = None
 
@@ -2398,10 +2399,6 @@ def VistaProductoDetalle(request, producto_id):
 
     relacionados = list(relacionados_qs)
 
-    for rel in relacionados:
-
-        rel.imagen_url = rel.imagen.url if getattr(rel, "imagen", None) else default_image_url
-
 
 
     contexto = {
@@ -2412,6 +2409,8 @@ def VistaProductoDetalle(request, producto_id):
 
         "relacionados": relacionados,
 
+        "imagen_por_defecto": default_image_url,
+
         "rol_usuario": rol_usuario,
 
         "puede_comprar": rol_usuario == "comprador",
@@ -2503,6 +2502,8 @@ def VistaRegistro(request):
 
         u.groups.add(grupo_clientes)
 
+        crear_perfil(u)
+
         messages.success(request, "Cuenta creada. Ahora puedes iniciar sesión.")
 
         return redirect("login")
@@ -2614,7 +2615,7 @@ def _procesar_compra(request, referencia_pago=None, datos_cliente=None, *, force
 
             producto.existencias -= cantidad
 
-            producto.save(update_fields=["existencias"])
+            producto.save(update_fields=["existencias", "actualizado"])
 
 
 
@@ -2683,15 +2684,9 @@ def VistaCarrito(request):
 
 
 
-    perfil_cliente = None
-
-    if request.user.is_authenticated:
-
-        perfil_cliente = getattr(request.user, "perfil_cliente", None)
-
-        if perfil_cliente is None:
+    # Copia del perfil en la sesión (core.perfiles); None para visitantes anónimos.
 
-            perfil_cliente = PerfilCliente.objects.filter(user=request.user).first()
+    perfil_cliente = perfil_de(request)
 
 
 
@@ -3316,7 +3311,7 @@ def VistaVendedor(request):
         errores = []
         if imagen:
             try:
-                _validar_imagen_producto(imagen)
+                imagen = _procesar_imagen_producto(imagen)
             except ValidationError as exc:
                 errores.append(str(exc))
 
@@ -4021,6 +4016,8 @@ def api_admin_productos_bajo_stock(request):
 
             "imagen": imagen_url,
 
+            "imagen_miniatura": url_variante(p.imagen, "miniatura", imagen_url),
+
             "descripcion": p.descripcion or "",
 
         })
@@ -4147,10 +4144,9 @@ def api_admin_producto_update_full(request, pk):
 
     if imagen is not None:
         try:
-            _validar_imagen_producto(imagen)
+            p.imagen = _procesar_imagen_producto(imagen)
         except ValidationError as exc:
             return HttpResponseBadRequest(str(exc))
-        p.imagen = imagen
 
     p.save()
 
@@ -4283,7 +4279,7 @@ def api_admin_producto_update_stock(request, pk):
 
     p.existencias = nuevo_stock
 
-    p.save(update_fields=["existencias"])
+    p.save(update_fields=["existencias", "actualizado"])
 
     return JsonResponse({"ok": True, "id": p.id, "nombre": p.nombre, "existencias": p.existencias})
 
@@ -5157,7 +5153,7 @@ def redireccion_usuario(request):
 
         return redirect("dashboard_administrador")
 
-    if user.groups.filter(name="Vendedores").exists():
+    if es_vendedor(user):
 
         return redirect("dashboard_vendedor")
 
@@ -5296,7 +5292,7 @@ def api_admin_postulaciones(request):
 
         return HttpResponseBadRequest("sin cambios")
 
-    p.save(update_fields=updates)
+    p.save(update_fields=updates + ["actualizado"])
 
     return JsonResponse({"ok": True, "id": p.id, "estado": p.estado})
 
@@ -5451,7 +5447,7 @@ def export_vendedor_inventario_csv(request):
                    
 
     """Construye un CSV con el inventario del vendedor."""
-    if not request.user.groups.filter(name="Vendedores").exists():
+    if not es_vendedor(request.user):
 
         return HttpResponseForbidden("Solo vendedores")
 
@@ -5490,7 +5486,7 @@ def export_vendedor_inventario_csv(request):
 def export_vendedor_ventas_csv(request):
 
     """Exporta las ventas del vendedor en CSV."""
-    if not request.user.groups.filter(name="Vendedores").exists():
+    if not es_vendedor(request.user):
 
         return HttpResponseForbidden("Solo vendedores")
 
@@ -5567,7 +5563,7 @@ def api_vendedor_importar(request):
                    
 
     """Permite cargar productos en lote para el vendedor autenticado."""
-    if not request.user.groups.filter(name="Vendedores").exists():
+    if not es_vendedor(request.user):
 
         return HttpResponseForbidden("Solo vendedores")
 
@@ -5888,7 +5884,7 @@ def export_admin_ventas_xlsx(request):
 def export_vendedor_inventario_xlsx(request):
 
     """Genera un XLSX del inventario del vendedor."""
-    if not request.user.groups.filter(name="Vendedores").exists():
+    if not es_vendedor(request.user):
 
         return HttpResponseForbidden("Solo vendedores")
 
@@ -5955,7 +5951,7 @@ def export_vendedor_inventario_xlsx(request):
 def export_vendedor_ventas_xlsx(request):
 
     """Exporta las ventas del vendedor en XLSX."""
-    if not request.user.groups.filter(name="Vendedores").exists():
+    if not es_vendedor(request.user):
 
         return HttpResponseForbidden("Solo vendedores")
 
@@ -6046,7 +6042,7 @@ def export_vendedor_ventas_xlsx(request):
 def api_vendedor_importar_excel(request):
 
     """Procesa archivos Excel para crear o actualizar productos."""
-    if not request.user.groups.filter(name="Vendedores").exists():
+    if not es_vendedor(request.user):
 
         return HttpResponseForbidden("Solo vendedores")
 
@@ -6239,15 +6235,9 @@ def VistaCarrito(request):
 
 
 
-    perfil_cliente = None
-
-    if request.user.is_authenticated:
-
-        perfil_cliente = getattr(request.user, "perfil_cliente", None)
+    # Copia del perfil en la sesión (core.perfiles); None para visitantes anónimos.
 
-        if perfil_cliente is None:
-
-            perfil_cliente = PerfilCliente.objects.filter(user=request.user).first()
+    perfil_cliente = perfil_de(request)
 
 
 
@@ -6875,7 +6865,7 @@ def VistaVendedor(request):
         errores = []
         if imagen:
             try:
-                _validar_imagen_producto(imagen)
+                imagen = _procesar_imagen_producto(imagen)
             except ValidationError as exc:
                 errores.append(str(exc))
 
@@ -7516,6 +7506,8 @@ def api_admin_productos_bajo_stock(request):
 
             "imagen": imagen_url,
 
+            "imagen_miniatura": url_variante(p.imagen, "miniatura", imagen_url),
+
             "descripcion": p.descripcion or "",
 
         })
@@ -7642,10 +7634,9 @@ def api_admin_producto_update_full(request, pk):
 
     if imagen is not None:
         try:
-            _validar_imagen_producto(imagen)
+            p.imagen = _procesar_imagen_producto(imagen)
         except ValidationError as exc:
             return HttpResponseBadRequest(str(exc))
-        p.imagen = imagen
 
     p.save()
 
@@ -7778,7 +7769,7 @@ def api_admin_producto_update_stock(request, pk):
 
     p.existencias = nuevo_stock
 
-    p.save(update_fields=["existencias"])
+    p.save(update_fields=["existencias", "actualizado"])
 
     return JsonResponse({"ok": True, "id": p.id, "nombre": p.nombre, "existencias": p.existencias})
 
@@ -8645,7 +8636,7 @@ def redireccion_usuario(request):
 
         return redirect("dashboard_administrador")
 
-    if user.groups.filter(name="Vendedores").exists():
+    if es_vendedor(user):
 
         return redirect("dashboard_vendedor")
 
@@ -8784,7 +8775,7 @@ def api_admin_postulaciones(request):
 
         return HttpResponseBadRequest("sin cambios")
 
-    p.save(update_fields=updates)
+    p.save(update_fields=updates + ["actualizado"])
 
     return JsonResponse({"ok": True, "id": p.id, "estado": p.estado})
 
@@ -8797,741 +8788,160 @@ def api_admin_postulaciones(request):
 
 
 @login_required
-
 @require_http_methods(["GET"])
-
 def export_admin_postulaciones_csv(request):
-
     """Genera un CSV con las postulaciones recibidas."""
     if not (request.user.is_staff or request.user.is_superuser):
-
         return HttpResponseForbidden("Solo admin")
-
-    import csv
-
-    resp = HttpResponse(content_type='text/csv; charset=utf-8')
-
-    resp["Content-Disposition"] = 'attachment; filename="postulaciones.csv"'
-
-    writer = csv.writer(resp)
-
-    writer.writerow(["id","nombre","email","telefono","tienda","instagram","mensaje","notas","fecha_envio","estado"])
-
-    qs = PostulacionVendedor.objects.all().order_by("-fecha_envio")
-
-    q = (request.GET.get("q") or "").strip().lower()
-
-    estado = (request.GET.get("estado") or "").strip().lower()
-
-    desde_s = request.GET.get("from")
-
-    hasta_s = request.GET.get("to")
-
-    if estado in {"nuevo","contactado","archivado"}: qs = qs.filter(estado=estado)
-
-    if q: qs = qs.filter(Q(nombre__icontains=q)|Q(email__icontains=q)|Q(mensaje__icontains=q))
-
-    try:
-
-        d=parse_date(desde_s) if desde_s else None
-
-        if d: qs=qs.filter(fecha_envio__date__gte=d)
-
-    except Exception: pass
-
-    try:
-
-        h=parse_date(hasta_s) if hasta_s else None
-
-        if h: qs=qs.filter(fecha_envio__date__lte=h)
-
-    except Exception: pass
-
-    for p in qs:
-
-        writer.writerow([p.id, p.nombre, p.email, p.telefono or '', p.tienda or '', p.instagram or '', (p.mensaje or '').replace('\n',' ').strip(), (p.notas or '').replace('\n',' ').strip(), p.fecha_envio.isoformat(sep=' '), p.estado])
-
-    return resp
-
-
-
+    ds = EXPORT_DATASETS["postulaciones"]
+    return respuesta_csv("postulaciones.csv", ds.encabezados_csv, ds.filas_csv(ds.consulta(request.GET)))
 
 
 @login_required
-
 @require_http_methods(["GET"])
-
 def export_admin_ventas_csv(request):
-
     """Exporta las ventas en formato CSV para administradores."""
     if not (request.user.is_staff or request.user.is_superuser):
-
         return HttpResponseForbidden("Solo admin")
-
-    import csv
-
-    desde_s = request.GET.get('from') or request.GET.get('start')
-
-    hasta_s = request.GET.get('to') or request.GET.get('end')
-
-    days = request.GET.get('days')
-
-    qs = Venta.objects.select_related('vendedor__usuario','producto')
-
-    if desde_s:
-
-        try:
-
-            d = parse_date(desde_s)
-
-            if d: qs = qs.filter(fecha_venta__gte=d)
-
-        except Exception: pass
-
-    if hasta_s:
-
-        try:
-
-            h = parse_date(hasta_s)
-
-            if h: qs = qs.filter(fecha_venta__lte=h)
-
-        except Exception: pass
-
-    if not desde_s and not hasta_s and days:
-
-        try:
-
-            n = int(days)
-
-            n = max(1, min(365, n))
-
-            hoy = timezone.localdate()
-
-            qs = qs.filter(fecha_venta__gte=hoy - timedelta(days=n))
-
-        except Exception: pass
-
-    resp = HttpResponse(content_type='text/csv; charset=utf-8')
-
-    resp["Content-Disposition"] = 'attachment; filename="ventas.csv"'
-
-    writer = csv.writer(resp)
-
-    writer.writerow(["fecha","vendedor","producto","cantidad","total"])
-
-    for v in qs.order_by('fecha_venta','vendedor_id'):
-
-        writer.writerow([v.fecha_venta.isoformat(), getattr(getattr(v.vendedor,'usuario',None),'username',''), v.producto.nombre, v.cantidad, f"{v.total}"])
-
-    return resp
-
-
-
+    ds = EXPORT_DATASETS["ventas_admin"]
+    return respuesta_csv("ventas.csv", ds.encabezados_csv, ds.filas_csv(ds.consulta(request.GET)))
 
 
 @login_required
-
 @require_http_methods(["GET"])
-
 def export_vendedor_inventario_csv(request):
-
-                   
-
     """Construye un CSV con el inventario del vendedor."""
-    if not request.user.groups.filter(name="Vendedores").exists():
-
+    if not es_vendedor(request.user):
         return HttpResponseForbidden("Solo vendedores")
-
     try:
-
         vend = Vendedor.objects.get(usuario=request.user)
-
     except Vendedor.DoesNotExist:
-
         return HttpResponseForbidden("Perfil vendedor requerido")
+    ds = EXPORT_DATASETS["inventario"]
+    return respuesta_csv("inventario.csv", ds.encabezados_csv, ds.filas_csv(ds.consulta(request.GET, vend)))
 
-    import csv
 
-    resp = HttpResponse(content_type='text/csv; charset=utf-8')
+@login_required
+@require_http_methods(["GET"])
+def export_vendedor_ventas_csv(request):
+    """Exporta las ventas del vendedor en CSV."""
+    if not es_vendedor(request.user):
+        return HttpResponseForbidden("Solo vendedores")
+    try:
+        vend = Vendedor.objects.get(usuario=request.user)
+    except Vendedor.DoesNotExist:
+        return HttpResponseForbidden("Perfil vendedor requerido")
+    ds = EXPORT_DATASETS["ventas_vendedor"]
+    return respuesta_csv("ventas_vendedor.csv", ds.encabezados_csv, ds.filas_csv(ds.consulta(request.GET, vend)))
 
-    resp["Content-Disposition"] = 'attachment; filename="inventario.csv"'
 
-    writer = csv.writer(resp)
 
-    writer.writerow(["nombre","marca","calidad","categoria","precio","existencias","fecha_ingreso","descripcion"])
 
-    for p in Producto.objects.filter(vendedor=vend).order_by('nombre'):
 
-        writer.writerow([p.nombre, p.marca, p.calidad, p.categoria, f"{p.precio}", int(p.existencias or 0), (p.fecha_ingreso.isoformat() if p.fecha_ingreso else ''), (p.descripcion or '').replace('\n',' ')])
+@login_required
+@require_http_methods(["POST"])
+def api_vendedor_importar(request):
+    """Permite cargar productos en lote para el vendedor autenticado.
 
-    return resp
+    Actualiza los productos que ya existen (mismo nombre y marca) y devuelve el
+    detalle de las filas rechazadas. Con `estricto=1` no guarda nada si hay errores.
+    """
+    if not es_vendedor(request.user):
+        return HttpResponseForbidden("Solo vendedores")
+    try:
+        vend = Vendedor.objects.get(usuario=request.user)
+    except Vendedor.DoesNotExist:
+        return HttpResponseForbidden("Perfil vendedor requerido")
+    f = request.FILES.get('file') or request.FILES.get('csv')
+    if not f:
+        return HttpResponseBadRequest("Archivo 'file' CSV requerido")
+    estricto = (request.POST.get("estricto") or "").lower() in {"1", "true", "si"}
+    importador = ImportadorProductos(vend, estricto=estricto)
+    resultado = importador.importar_tabla(leer_csv(f))
+    ok = not (estricto and resultado.total_errores)
+    return JsonResponse({"ok": ok, **resultado.as_dict()}, status=200 if ok else 400)
 
 
 
 
 
 @login_required
-
 @require_http_methods(["GET"])
+def export_admin_postulaciones_xlsx(request):
+    """Genera un archivo XLSX de postulaciones."""
+    if not (request.user.is_staff or request.user.is_superuser):
+        return HttpResponseForbidden("Solo administradores")
+    try:
+        import openpyxl  # noqa: F401
+    except Exception:
+        return HttpResponseBadRequest("Falta dependencia 'openpyxl'")
+    ds = EXPORT_DATASETS["postulaciones"]
+    return respuesta_xlsx("postulaciones.xlsx", ds.titulo, ds.encabezados_xlsx, ds.filas_xlsx(ds.consulta(request.GET)))
 
-def export_vendedor_ventas_csv(request):
 
-    """Exporta las ventas del vendedor en CSV."""
-    if not request.user.groups.filter(name="Vendedores").exists():
+@login_required
+@require_http_methods(["GET"])
+def export_admin_ventas_xlsx(request):
+    """Exporta las ventas en formato XLSX."""
+    if not (request.user.is_staff or request.user.is_superuser):
+        return HttpResponseForbidden("Solo administradores")
+    try:
+        import openpyxl  # noqa: F401
+    except Exception:
+        return HttpResponseBadRequest("Falta dependencia 'openpyxl'")
+    ds = EXPORT_DATASETS["ventas_admin"]
+    return respuesta_xlsx("ventas.xlsx", ds.titulo, ds.encabezados_xlsx, ds.filas_xlsx(ds.consulta(request.GET)))
 
-        return HttpResponseForbidden("Solo vendedores")
 
+@login_required
+@require_http_methods(["GET"])
+def export_vendedor_inventario_xlsx(request):
+    """Genera un XLSX del inventario del vendedor."""
+    if not es_vendedor(request.user):
+        return HttpResponseForbidden("Solo vendedores")
     try:
-
         vend = Vendedor.objects.get(usuario=request.user)
-
     except Vendedor.DoesNotExist:
-
         return HttpResponseForbidden("Perfil vendedor requerido")
+    try:
+        import openpyxl  # noqa: F401
+    except Exception:
+        return HttpResponseBadRequest("Falta dependencia 'openpyxl'")
+    ds = EXPORT_DATASETS["inventario"]
+    return respuesta_xlsx("inventario.xlsx", ds.titulo, ds.encabezados_xlsx, ds.filas_xlsx(ds.consulta(request.GET, vend)))
 
-    desde_s = request.GET.get('from')
 
-    hasta_s = request.GET.get('to')
+@login_required
+@require_http_methods(["GET"])
+def export_vendedor_ventas_xlsx(request):
+    """Exporta las ventas del vendedor en XLSX."""
+    if not es_vendedor(request.user):
+        return HttpResponseForbidden("Solo vendedores")
+    try:
+        vend = Vendedor.objects.get(usuario=request.user)
+    except Vendedor.DoesNotExist:
+        return HttpResponseForbidden("Perfil vendedor requerido")
+    try:
+        import openpyxl  # noqa: F401
+    except Exception:
+        return HttpResponseBadRequest("Falta dependencia 'openpyxl'")
+    ds = EXPORT_DATASETS["ventas_vendedor"]
+    return respuesta_xlsx(
+        "ventas_vendedor.xlsx", ds.titulo, ds.encabezados_xlsx, ds.filas_xlsx(ds.consulta(request.GET, vend))
+    )
 
-    days = request.GET.get('days')
 
-    qs = Venta.objects.filter(vendedor=vend).select_related('producto')
 
-    if desde_s:
 
-        d = parse_date(desde_s)
 
-        if d: qs = qs.filter(fecha_venta__gte=d)
+@login_required
+@require_http_methods(["POST"])
+def api_vendedor_importar_excel(request):
+    """Procesa archivos Excel para crear o actualizar productos.
 
-    if hasta_s:
-
-        h = parse_date(hasta_s)
-
-        if h: qs = qs.filter(fecha_venta__lte=h)
-
-    if not desde_s and not hasta_s and days:
-
-        try:
-
-            n = int(days)
-
-            n = max(1, min(365, n))
-
-            hoy = timezone.localdate()
-
-            qs = qs.filter(fecha_venta__gte=hoy - timedelta(days=n))
-
-        except Exception:
-
-            pass
-
-    import csv
-
-    resp = HttpResponse(content_type='text/csv; charset=utf-8')
-
-    resp["Content-Disposition"] = 'attachment; filename="ventas_vendedor.csv"'
-
-    w = csv.writer(resp)
-
-    w.writerow(["fecha","producto","cantidad","total"])
-
-    for v in qs.order_by('fecha_venta'):
-
-        w.writerow([v.fecha_venta.isoformat(), v.producto.nombre, v.cantidad, f"{v.total}"])
-
-    return resp
-
-
-
-
-
-@login_required
-
-@require_http_methods(["POST"])
-
-def api_vendedor_importar(request):
-
-                   
-
-    """Permite cargar productos en lote para el vendedor autenticado."""
-    if not request.user.groups.filter(name="Vendedores").exists():
-
-        return HttpResponseForbidden("Solo vendedores")
-
-    try:
-
-        vend = Vendedor.objects.get(usuario=request.user)
-
-    except Vendedor.DoesNotExist:
-
-        return HttpResponseForbidden("Perfil vendedor requerido")
-
-    f = request.FILES.get('file') or request.FILES.get('csv')
-
-    if not f:
-
-        return HttpResponseBadRequest("Archivo 'file' CSV requerido")
-
-    import csv, io
-
-    try:
-
-        data = f.read().decode('utf-8', errors='ignore')
-
-        sample = data[:1024]
-
-        dialect = csv.Sniffer().sniff(sample, delimiters=",;\t")
-
-    except Exception:
-
-        dialect = csv.excel
-
-    reader = csv.DictReader(io.StringIO(data), dialect=dialect)
-
-    created = 0
-
-    for row in reader:
-
-        nombre = (row.get('nombre') or row.get('Nombre') or '').strip()
-
-        if not nombre:
-
-            continue
-
-        marca = (row.get('marca') or row.get('Marca') or '').strip()
-
-        calidad = (row.get('calidad') or row.get('Calidad') or '').strip()
-
-        categoria = (row.get('categoria') or row.get('Categoría') or row.get('Categoria') or '').strip()
-
-        try:
-
-            precio = Decimal(str(row.get('precio') or row.get('Precio') or '0')).quantize(Decimal('0.01'))
-
-        except Exception:
-
-            precio = Decimal('0.00')
-
-        try:
-
-            exist = int((row.get('existencias') or row.get('stock') or row.get('Existencias') or '0').strip() or 0)
-
-        except Exception:
-
-            exist = 0
-
-        fecha = parse_date((row.get('fecha_ingreso') or row.get('Fecha') or '').strip() or '') or timezone.localdate()
-
-        desc = (row.get('descripcion') or row.get('Descripción') or '').strip()
-
-        Producto.objects.create(
-
-            vendedor=vend,
-
-            nombre=nombre,
-
-            marca=marca,
-
-            calidad=calidad,
-
-            categoria=categoria,
-
-            precio=precio,
-
-            existencias=exist,
-
-            fecha_ingreso=fecha,
-
-            descripcion=desc,
-
-        )
-
-        created += 1
-
-    return JsonResponse({"ok": True, "creados": created})
-
-
-
-                       
-
-                       
-
-                       
-
-@login_required
-
-@require_http_methods(["GET"])
-
-def export_admin_postulaciones_xlsx(request):
-
-    """Genera un archivo XLSX de postulaciones."""
-    if not (request.user.is_staff or request.user.is_superuser):
-
-        return HttpResponseForbidden("Solo administradores")
-
-    try:
-
-        from openpyxl import Workbook
-
-    except Exception:
-
-        return HttpResponseBadRequest("Falta dependencia 'openpyxl'")
-
-    from io import BytesIO
-
-    wb = Workbook()
-
-    ws = wb.active
-
-    ws.title = "Postulaciones"
-
-    ws.append(["ID","Nombre","Email","Teléfono","Tienda","Instagram/Web","Mensaje","Fecha","Estado","Notas"])
-
-    q = (request.GET.get("q") or "").strip().lower()
-
-    estado = (request.GET.get("estado") or "").strip().lower()
-
-    desde_s = request.GET.get("from")
-
-    hasta_s = request.GET.get("to")
-
-    qs = PostulacionVendedor.objects.all()
-
-    if estado in {"nuevo","contactado","archivado"}:
-
-        qs = qs.filter(estado=estado)
-
-    if q:
-
-        qs = qs.filter(Q(nombre__icontains=q) | Q(email__icontains=q) | Q(mensaje__icontains=q))
-
-    try:
-
-        d = parse_date(desde_s) if desde_s else None
-
-        if d:
-
-            qs = qs.filter(fecha_envio__date__gte=d)
-
-    except Exception:
-
-        pass
-
-    try:
-
-        h = parse_date(hasta_s) if hasta_s else None
-
-        if h:
-
-            qs = qs.filter(fecha_envio__date__lte=h)
-
-    except Exception:
-
-        pass
-
-    for p in qs.order_by("-fecha_envio"):
-
-        ws.append([
-
-            p.id,
-
-            p.nombre,
-
-            p.email,
-
-            p.telefono or "",
-
-            p.tienda or "",
-
-            p.instagram or "",
-
-            (p.mensaje or "")[:500],
-
-            p.fecha_envio.isoformat(sep=" "),
-
-            p.estado,
-
-            (p.notas or "")[:500],
-
-        ])
-
-    bio = BytesIO(); wb.save(bio); bio.seek(0)
-
-    resp = HttpResponse(bio.read(), content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
-
-    resp["Content-Disposition"] = 'attachment; filename="postulaciones.xlsx"'
-
-    return resp
-
-
-
-
-
-@login_required
-
-@require_http_methods(["GET"])
-
-def export_admin_ventas_xlsx(request):
-
-    """Exporta las ventas en formato XLSX."""
-    if not (request.user.is_staff or request.user.is_superuser):
-
-        return HttpResponseForbidden("Solo administradores")
-
-    try:
-
-        from openpyxl import Workbook
-
-    except Exception:
-
-        return HttpResponseBadRequest("Falta dependencia 'openpyxl'")
-
-    desde_s = request.GET.get('from') or request.GET.get('start')
-
-    hasta_s = request.GET.get('to') or request.GET.get('end')
-
-    days = request.GET.get('days')
-
-    qs = Venta.objects.select_related('vendedor__usuario','producto')
-
-    if desde_s:
-
-        try:
-
-            d = parse_date(desde_s)
-
-            if d: qs = qs.filter(fecha_venta__gte=d)
-
-        except Exception:
-
-            pass
-
-    if hasta_s:
-
-        try:
-
-            h = parse_date(hasta_s)
-
-            if h: qs = qs.filter(fecha_venta__lte=h)
-
-        except Exception:
-
-            pass
-
-    if not desde_s and not hasta_s and days:
-
-        try:
-
-            n = int(days)
-
-            n = max(1, min(365, n))
-
-            hoy = timezone.localdate()
-
-            qs = qs.filter(fecha_venta__gte=hoy - timedelta(days=n))
-
-        except Exception:
-
-            pass
-
-    from io import BytesIO
-
-    wb = Workbook(); ws = wb.active; ws.title = "Ventas"
-
-    ws.append(["Fecha","Vendedor","Producto","Cantidad","Total"])
-
-    for v in qs.order_by('fecha_venta','vendedor_id'):
-
-        ws.append([
-
-            v.fecha_venta.isoformat(),
-
-            getattr(getattr(v.vendedor,'usuario',None),'username',''),
-
-            v.producto.nombre,
-
-            v.cantidad,
-
-            float(v.total),
-
-        ])
-
-    bio = BytesIO(); wb.save(bio); bio.seek(0)
-
-    resp = HttpResponse(bio.read(), content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
-
-    resp["Content-Disposition"] = 'attachment; filename="ventas.xlsx"'
-
-    return resp
-
-
-
-
-
-@login_required
-
-@require_http_methods(["GET"])
-
-def export_vendedor_inventario_xlsx(request):
-
-    """Genera un XLSX del inventario del vendedor."""
-    if not request.user.groups.filter(name="Vendedores").exists():
-
-        return HttpResponseForbidden("Solo vendedores")
-
-    try:
-
-        vend = Vendedor.objects.get(usuario=request.user)
-
-    except Vendedor.DoesNotExist:
-
-        return HttpResponseForbidden("Perfil vendedor requerido")
-
-    try:
-
-        from openpyxl import Workbook
-
-    except Exception:
-
-        return HttpResponseBadRequest("Falta dependencia 'openpyxl'")
-
-    from io import BytesIO
-
-    wb = Workbook(); ws = wb.active; ws.title = "Inventario"
-
-    ws.append(["Nombre","Marca","Calidad","Categoría","Precio","Existencias","Fecha ingreso","Descripción"])
-
-    for p in Producto.objects.filter(vendedor=vend).order_by('nombre'):
-
-        ws.append([
-
-            p.nombre,
-
-            p.marca,
-
-            p.calidad,
-
-            p.categoria,
-
-            float(p.precio),
-
-            int(p.existencias or 0),
-
-            (p.fecha_ingreso.isoformat() if p.fecha_ingreso else ''),
-
-            (p.descripcion or ''),
-
-        ])
-
-    bio = BytesIO(); wb.save(bio); bio.seek(0)
-
-    resp = HttpResponse(bio.read(), content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
-
-    resp["Content-Disposition"] = 'attachment; filename="inventario.xlsx"'
-
-    return resp
-
-
-
-
-
-@login_required
-
-@require_http_methods(["GET"])
-
-def export_vendedor_ventas_xlsx(request):
-
-    """Exporta las ventas del vendedor en XLSX."""
-    if not request.user.groups.filter(name="Vendedores").exists():
-
-        return HttpResponseForbidden("Solo vendedores")
-
-    try:
-
-        vend = Vendedor.objects.get(usuario=request.user)
-
-    except Vendedor.DoesNotExist:
-
-        return HttpResponseForbidden("Perfil vendedor requerido")
-
-    try:
-
-        from openpyxl import Workbook
-
-    except Exception:
-
-        return HttpResponseBadRequest("Falta dependencia 'openpyxl'")
-
-    desde_s = request.GET.get('from')
-
-    hasta_s = request.GET.get('to')
-
-    days = request.GET.get('days')
-
-    qs = Venta.objects.filter(vendedor=vend).select_related('producto')
-
-    if desde_s:
-
-        d = parse_date(desde_s)
-
-        if d: qs = qs.filter(fecha_venta__gte=d)
-
-    if hasta_s:
-
-        h = parse_date(hasta_s)
-
-        if h: qs = qs.filter(fecha_venta__lte=h)
-
-    if not desde_s and not hasta_s and days:
-
-        try:
-
-            n = int(days)
-
-            n = max(1, min(365, n))
-
-            hoy = timezone.localdate()
-
-            qs = qs.filter(fecha_venta__gte=hoy - timedelta(days=n))
-
-        except Exception:
-
-            pass
-
-    from io import BytesIO
-
-    wb = Workbook(); ws = wb.active; ws.title = "Ventas"
-
-    ws.append(["Fecha","Producto","Cantidad","Total"])
-
-    for v in qs.order_by('fecha_venta'):
-
-        ws.append([v.fecha_venta.isoformat(), v.producto.nombre, v.cantidad, float(v.total)])
-
-    bio = BytesIO(); wb.save(bio); bio.seek(0)
-
-    resp = HttpResponse(bio.read(), content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
-
-    resp["Content-Disposition"] = 'attachment; filename="ventas_vendedor.xlsx"'
-
-    return resp
-
-
-
-
-
-                            
-
-                        
-
-                            
-
-@login_required
-@require_http_methods(["POST"])
-def api_vendedor_importar_excel(request):
-    """Procesa archivos Excel para crear o actualizar productos."""
-    if not request.user.groups.filter(name="Vendedores").exists():
+    Usa el mismo mapeo de encabezados y upsert por lotes que la importación CSV.
+    """
+    if not es_vendedor(request.user):
         return HttpResponseForbidden("Solo vendedores")
     try:
         vend = Vendedor.objects.get(usuario=request.user)
@@ -9541,60 +8951,13 @@ def api_vendedor_importar_excel(request):
     if not f:
         return HttpResponseBadRequest("Archivo Excel requerido")
     try:
-        from openpyxl import load_workbook
-        from io import BytesIO
-        content = f.read()
-        wb = load_workbook(filename=BytesIO(content), data_only=True)
-        ws = wb.active
-        rows = list(ws.iter_rows(values_only=True))
-        if not rows:
-            return JsonResponse({"ok": True, "creados": 0})
-        def _norm(s):
-            if not s:
-                return ''
-            import unicodedata
-            s = str(s)
-            s = ''.join(c for c in unicodedata.normalize('NFKD', s) if not unicodedata.combining(c))
-            return s.strip()
-        headers = [(_norm(h) or '').lower().replace(' ', '_') for h in (rows[0] or [])]
-        created = 0
-        for r in rows[1:]:
-            row = {}
-            for idx, val in enumerate(r or []):
-                key = headers[idx] if idx < len(headers) else f'col_{idx}'
-                row[key] = val if val is not None else ''
-            nombre = _norm(row.get('nombre') or row.get('name'))
-            if not nombre:
-                continue
-            marca = _norm(row.get('marca'))
-            calidad = _norm(row.get('calidad'))
-            categoria = _norm(row.get('categoria') or row.get('categoria_'))
-            try:
-                precio = Decimal(str(row.get('precio') or '0')).quantize(Decimal('0.01'))
-            except Exception:
-                precio = Decimal('0.00')
-            try:
-                exist = int(str(row.get('existencias') or row.get('stock') or '0'))
-            except Exception:
-                exist = 0
-            fecha_raw = str(row.get('fecha_ingreso') or '')
-            fecha = parse_date(fecha_raw) or timezone.localdate()
-            desc = str(row.get('descripcion') or '')
-            Producto.objects.create(
-                vendedor=vend,
-                nombre=nombre,
-                marca=marca,
-                calidad=calidad,
-                categoria=categoria,
-                precio=precio,
-                existencias=exist,
-                fecha_ingreso=fecha,
-                descripcion=desc,
-            )
-            created += 1
-        return JsonResponse({"ok": True, "creados": created})
-    except Exception:
+        filas = leer_excel(f)
+    except ExcelInvalido:
         return HttpResponseBadRequest("No se pudo procesar el Excel")
+    estricto = (request.POST.get("estricto") or "").lower() in {"1", "true", "si"}
+    resultado = ImportadorProductos(vend, estricto=estricto).importar_tabla(filas)
+    ok = not (estricto and resultado.total_errores)
+    return JsonResponse({"ok": ok, **resultado.as_dict()}, status=200 if ok else 400)
 
 
 
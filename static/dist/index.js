@@ -0,0 +1,21 @@
+(()=>{const canvas=document.getElementById("stars");if(canvas){const ctx=canvas.getContext("2d");let W=0,H=0,stars=[];const resize=()=>{W=canvas.width=window.innerWidth;H=canvas.height=window.innerHeight;};const createStars=(count=180)=>{stars=Array.from({length:count}).map(()=>({x:Math.random()*W,y:Math.random()*H,r:Math.random()*1.2+0.2,a:Math.random()*1,}));};const draw=()=>{ctx.clearRect(0,0,W,H);for(const s of stars){ctx.globalAlpha=s.a;ctx.beginPath();ctx.arc(s.x,s.y,s.r,0,Math.PI*2);ctx.fillStyle="#ffffff";ctx.fill();s.a+=(Math.random()-0.5)*0.03;if(s.a<0.2)s.a=0.2;if(s.a>1)s.a=1;}
+requestAnimationFrame(draw);};window.addEventListener("resize",()=>{resize();createStars();});resize();createStars();draw();}
+const yearEl=document.getElementById("year");if(yearEl)yearEl.textContent=new Date().getFullYear();const navToggle=document.querySelector(".nav-toggle");const navGroup=document.getElementById("navGroup");if(navToggle&&navGroup){navToggle.addEventListener("click",()=>{navGroup.classList.toggle("show");});}
+const initUserDropdowns=()=>{const dropdowns=Array.from(document.querySelectorAll(".user-pill--dropdown"));if(!dropdowns.length)return;const setExpanded=(toggle,state)=>{if(!toggle)return;toggle.setAttribute("aria-expanded",state?"true":"false");};const closeAll=(except=null)=>{dropdowns.forEach((pill)=>{if(pill===except)return;pill.classList.remove("is-open");setExpanded(pill.querySelector(".user-pill__toggle"),false);});};dropdowns.forEach((pill)=>{const toggle=pill.querySelector(".user-pill__toggle");const menu=pill.querySelector(".user-menu");if(!toggle||!menu)return;toggle.addEventListener("click",(event)=>{event.preventDefault();event.stopPropagation();const shouldOpen=!pill.classList.contains("is-open");closeAll();pill.classList.toggle("is-open",shouldOpen);setExpanded(toggle,shouldOpen);});menu.addEventListener("click",(event)=>event.stopPropagation());});document.addEventListener("click",(event)=>{if(!event.target.closest(".user-pill--dropdown")){closeAll();}});document.addEventListener("keydown",(event)=>{if(event.key==="Escape"){closeAll();}});};initUserDropdowns();const themeBtn=document.getElementById("themeToggle");if(themeBtn){const prefersDark=window.matchMedia("(prefers-color-scheme: dark)").matches;const storedTheme=localStorage.getItem("theme");if(storedTheme==="light"||(!prefersDark&&!storedTheme)){document.body.classList.add("light");}
+themeBtn.addEventListener("click",()=>{document.body.classList.toggle("light");localStorage.setItem("theme",document.body.classList.contains("light")?"light":"dark");});}
+const chips=document.querySelectorAll("[data-category-chip]");const categoriaSelect=document.getElementById("categoriaSelect");const filterForm=document.getElementById("catalogFilters");chips.forEach((chip)=>{chip.addEventListener("click",()=>{chips.forEach((c)=>c.classList.remove("active"));chip.classList.add("active");if(categoriaSelect){categoriaSelect.value=chip.value||"";}
+if(filterForm&&typeof filterForm.requestSubmit==="function"){filterForm.requestSubmit();}else if(filterForm){filterForm.submit();}});});const authTabs=document.querySelectorAll(".auth-tab");const authForms=document.querySelectorAll(".auth-form");authTabs.forEach((tab)=>{tab.addEventListener("click",()=>{const target=tab.dataset.authTarget;authTabs.forEach((t)=>t.classList.remove("active"));tab.classList.add("active");authForms.forEach((form)=>{form.classList.toggle("show",form.dataset.authPanel===target);});});});const navLinks=document.querySelectorAll(".nav-links a[data-nav-target]");const sectionTriggers=document.querySelectorAll("[data-nav-target]");const sections=document.querySelectorAll("[data-section]");if(sections.length){const scrollToSection=(name)=>{const target=document.querySelector(`[data-section="${name}"]`);if(target){target.scrollIntoView({behavior:"smooth",block:"start"});}};const activateSection=(name,{scroll=true}={})=>{if(!name)return;let found=false;sections.forEach((section)=>{const match=section.dataset.section===name;section.classList.toggle("is-active",match);if(match)found=true;});if(!found)return;navLinks.forEach((link)=>{link.classList.toggle("active",link.dataset.navTarget===name);});if(navGroup)navGroup.classList.remove("show");const hash=`#${name}`;if(window.location.hash!==hash){history.replaceState(null,"",hash);}
+if(scroll){scrollToSection(name);}};sectionTriggers.forEach((link)=>{link.addEventListener("click",(event)=>{event.preventDefault();activateSection(link.dataset.navTarget);});});const initialHash=window.location.hash.replace("#","")||(sections[0]&&sections[0].dataset.section);activateSection(initialHash,{scroll:false});}
+const getCookie=(name)=>{const value=`; ${document.cookie}`;const parts=value.split(`; ${name}=`);if(parts.length===2)return decodeURIComponent(parts.pop().split(';').shift());return null;};const syncCsrfForForms=()=>{const cookieToken=getCookie('csrftoken');if(!cookieToken)return;document.querySelectorAll('form[action$="/newsletter/suscribir/"]').forEach((form)=>{let input=form.querySelector('input[name="csrfmiddlewaretoken"]');if(!input){input=document.createElement('input');input.type='hidden';input.name='csrfmiddlewaretoken';form.prepend(input);}
+input.value=cookieToken;form.addEventListener('submit',()=>{input.value=getCookie('csrftoken')||input.value;});});};syncCsrfForForms();})();
+;
+(()=>{const bubble=document.getElementById("chatbot-bubble");const panel=document.getElementById("chatbot-panel");if(!bubble||!panel)return;const dismissBtn=document.getElementById("chatbot-dismiss");const reopenBtn=document.getElementById("chatbot-reopen");const form=document.getElementById("chatbot-form");const input=document.getElementById("chatbot-input");const messages=document.getElementById("chatbot-messages");const suggestionButtons=Array.from(document.querySelectorAll(".chatbot-suggestion"));const csrfTokenMeta=document.querySelector('meta[name="csrf-token"]');const csrfToken=csrfTokenMeta?csrfTokenMeta.getAttribute("content"):"";const API_URL="/api/chatbot/ask/";const panelRole=panel.dataset.chatbotRole||"anonimo";const ROLE_HINTS={anonimo:"Navegas como invitado; regístrate o inicia sesión para personalizar tu experiencia.",comprador:"Modo comprador activo; puedo ayudarte con pedidos, envíos y pagos.",vendedor:"Modo vendedor activo; revisemos stock, productos y métricas.",administrador:"Modo administrador activo; revisemos dashboards, usuarios o incidencias.",};const ROLE_GREETINGS={anonimo:"¡Hola! ¿Qué tal?\nBienvenido a EpicAnimes, la tienda online de coleccionables de anime.\nPuedes registrarte o iniciar sesión desde el menú principal para guardar tus pedidos.",comprador:"¡Hola! ¿Qué tal?\nVeo tu sesión como comprador; te ayudo con compras, envíos y pagos.\nSi buscas un pedido revisa Mis compras o tu correo de confirmación.",vendedor:"¡Hola! ¿Qué tal?\nEstás en modo vendedor certificado; gestionemos productos, stock y alertas.\nRecuerda que avisamos cuando tu stock baja de 5 unidades.",administrador:"Veo que eres administrador; puedo ayudarte a navegar informes y tareas operativas.\n¡Hola! Soy EpicChat para administradores.\n¿En qué proceso necesitas apoyo con dashboards, usuarios o configuraciones?",};const ROLE_SUGGESTIONS={anonimo:["¿Qué es EpicAnimes?","¿Cómo me registro?","¿Qué categorías tienen?",],comprador:["¿Cómo hago seguimiento a mi pedido?","¿Qué métodos de pago aceptan?","¿Cuánto demora el envío?",],vendedor:["¿Cómo agrego un producto?","¿Dónde veo mis ventas?","¿Qué pasa si tengo poco stock?",],administrador:["¿Dónde veo las métricas globales?","¿Cómo gestiono incidencias?","¿Cómo van los vendedores hoy?",],};let hintedRole=null;const getRoleHint=(role)=>{if(!role||hintedRole===role){return null;}
+const hint=ROLE_HINTS[role]||`Tu rol actual es ${role}.`;hintedRole=role;return hint;};const scrollToBottom=()=>{messages.scrollTop=messages.scrollHeight;};const appendMessage=(text,sender="bot",{roleHint}={})=>{const wrapper=document.createElement("div");wrapper.className=`chatbot-message ${sender}`;if(roleHint){const hint=document.createElement("div");hint.className="chatbot-message__hint";hint.textContent=roleHint;wrapper.appendChild(hint);}
+const body=document.createElement("div");body.className="chatbot-message__body";body.textContent=text;wrapper.appendChild(body);messages.appendChild(wrapper);scrollToBottom();return wrapper;};const renderInitialMessage=()=>{if(!messages)return;const initial=messages.querySelector(".chatbot-message.bot[data-initial='true']");if(!initial)return;const hintText=ROLE_HINTS[panelRole]||"";const greetingText=ROLE_GREETINGS[panelRole]||ROLE_GREETINGS.comprador||"¡Hola! Soy EpicChat.";initial.innerHTML="";if(hintText){const hintEl=document.createElement("div");hintEl.className="chatbot-message__hint";hintEl.textContent=hintText;initial.appendChild(hintEl);}
+const bodyEl=document.createElement("div");bodyEl.className="chatbot-message__body";bodyEl.textContent=greetingText;initial.appendChild(bodyEl);hintedRole=panelRole;};const configureSuggestions=()=>{if(!suggestionButtons.length)return;const suggestions=ROLE_SUGGESTIONS[panelRole]||ROLE_SUGGESTIONS.comprador||[];suggestionButtons.forEach((btn,index)=>{const text=suggestions[index]||suggestions[0]||"¿Qué puedo hacer en EpicAnimes?";btn.textContent=text;btn.dataset.suggestionText=text;});const title=document.getElementById("chatbot-suggestions-title");if(title){title.textContent=panelRole==="anonimo"?"¿Nueva o nuevo por aquí? Intenta con estas preguntas:":"¿Necesitas ideas? Pregunta por:";}};const addTypingIndicator=()=>{const typing=document.createElement("div");typing.className="chatbot-message bot";typing.dataset.typing="true";typing.textContent="Buscando la mejor respuesta…";messages.appendChild(typing);scrollToBottom();return typing;};const setBusy=(isBusy)=>{const submitBtn=form?.querySelector("button[type='submit']");if(submitBtn)submitBtn.disabled=isBusy;if(input)input.disabled=isBusy;};const openPanel=()=>{panel.hidden=false;bubble.classList.add("is-open");bubble.setAttribute("aria-expanded","true");setTimeout(()=>input&&input.focus(),150);};const closePanel=()=>{panel.hidden=true;bubble.classList.remove("is-open");bubble.setAttribute("aria-expanded","false");};const HIDE_KEY="epicChatbotHidden";const root=document.documentElement;const applyHiddenState=(hidden)=>{if(hidden){root.classList.add("chatbot-hidden");localStorage.setItem(HIDE_KEY,"1");closePanel();}else{root.classList.remove("chatbot-hidden");localStorage.removeItem(HIDE_KEY);}
+if(reopenBtn)reopenBtn.hidden=!hidden;};const initialHidden=localStorage.getItem(HIDE_KEY)==="1";applyHiddenState(initialHidden);if(!initialHidden){if(reopenBtn)reopenBtn.hidden=true;}
+renderInitialMessage();configureSuggestions();bubble.addEventListener("click",(event)=>{if(root.classList.contains("chatbot-hidden")){applyHiddenState(false);event.stopPropagation();return;}
+event.stopPropagation();panel.hidden?openPanel():closePanel();});if(dismissBtn){dismissBtn.addEventListener("click",(event)=>{event.stopPropagation();applyHiddenState(true);});}
+if(reopenBtn){reopenBtn.addEventListener("click",(event)=>{event.stopPropagation();applyHiddenState(false);openPanel();});}
+panel.addEventListener("click",(event)=>event.stopPropagation());document.addEventListener("click",(event)=>{if(panel.hidden||root.classList.contains("chatbot-hidden"))return;if(panel.contains(event.target)||bubble.contains(event.target))return;closePanel();});document.addEventListener("keydown",(event)=>{if(!panel.hidden&&event.key==="Escape"){closePanel();}});const sendQuestion=async(question)=>{if(!question)return;appendMessage(question,"user");const typing=addTypingIndicator();setBusy(true);try{const response=await fetch(API_URL,{method:"POST",headers:{"Content-Type":"application/json","X-CSRFToken":csrfToken,},body:JSON.stringify({message:question}),});const data=await response.json();typing.remove();if(!data.ok){appendMessage(data.error||"Lo siento, no pude responder eso ahora mismo.","bot");}else{const hint=getRoleHint(data.user_role);appendMessage(data.answer,"bot",{roleHint:hint});}}catch(error){typing.remove();appendMessage("Hubo un problema de conexión. Intenta nuevamente en un momento.","bot");}finally{setBusy(false);input?.focus();}};if(form){form.addEventListener("submit",(event)=>{event.preventDefault();const question=input.value.trim();if(!question)return;input.value="";sendQuestion(question);});}
+suggestionButtons.forEach((btn)=>{btn.addEventListener("click",()=>{const question=(btn.dataset.suggestionText||btn.textContent||"").trim();if(!question)return;input.value="";sendQuestion(question);});});})();
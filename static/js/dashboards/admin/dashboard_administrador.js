@@ -815,7 +815,7 @@ document.addEventListener('DOMContentLoaded', () => {
         <td>${sanitize(p.vendedor || 'N/D')}</td>
         <td>${sanitize(p.nombre || '')}</td>
         <td>${sanitize(p.tipo || p.categoria || '-')}</td>
-        <td>${p.imagen ? `<img src="${p.imagen}" alt="${sanitize(p.nombre || '')}" style="width:50px;height:50px;object-fit:cover;border-radius:6px">` : '<span style="color:#99aab5">Sin imagen</span>'}</td>
+        <td>${p.imagen ? `<img src="${p.imagen_miniatura || p.imagen}" alt="${sanitize(p.nombre || '')}" style="width:50px;height:50px;object-fit:cover;border-radius:6px">` : '<span style="color:#99aab5">Sin imagen</span>'}</td>
         <td>${sanitize((p.descripcion || '').slice(0, 80))}${(p.descripcion || '').length > 80 ? '...' : ''}</td>
         <td>${p.existencias ?? p.stock ?? 0}</td>
         <td>${p.critico ? 'Sí' : 'No'}</td>